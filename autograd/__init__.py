@@ -1,7 +1,27 @@
 from .autograd_matrix import AutogradMatrix
 from .value import Value
+from .dual import Dual
+from .functional import hessian, hvp, jacobian, jvp, matrix_jacobian, matrix_vjp, vjp
+from .tracing import TracedFunction, trace
+from .data import DataLoader
+from .profiler import profile
+from .grad_mode import is_grad_enabled, no_grad
 
 __all__ = [
     'AutogradMatrix',
+    'DataLoader',
+    'Dual',
+    'TracedFunction',
     'Value',
+    'hessian',
+    'hvp',
+    'is_grad_enabled',
+    'jacobian',
+    'jvp',
+    'matrix_jacobian',
+    'matrix_vjp',
+    'no_grad',
+    'profile',
+    'trace',
+    'vjp',
 ]
@@ -1,53 +1,163 @@
+from .graph import (
+    matrix_parents,
+    topological_order,
+)
 from .matrix import Matrix
+from .matrix.functions import buffer_typecode
 
 from .matrix import autograd_functions as F
 
+from array import array
+
 from typing import (
     List,
+    Optional,
+    Tuple,
     Union,
 )
 
 
-class AutogradMatrix(Matrix):
+# Parents of a node that was not computed by a function, shared so that
+# leaves and results built without a graph do not allocate a set each.
+_NO_PARENTS = frozenset()
 
-    def __init__(self, data: List[List[Union[int, float]]]):
 
-        super().__init__(data)
-        self._grad = Matrix.zeros(*self.shape)
-        self._calculate_grad = lambda: Matrix.ones(*self.shape)
-        self._previous_nodes = set()
+class AutogradMatrix(Matrix):
+    """
+    A Matrix that records the functions applied to it, so that gradients
+    can be propagated back to it.
+
+    Gradients are only propagated to matrices with ``requires_grad`` set.
+    The gradient buffer is allocated when the first gradient reaches the
+    matrix, or when ``grad`` is read. Functions of matrices that do not
+    require gradients, or applied inside ``no_grad``, do not record a graph.
+    """
+
+    requires_grad = True
+
+    def __init__(self, data: List[List[Union[int, float]]], dtype: str = 'float64', requires_grad: bool = True):
+        self.requires_grad = requires_grad
+        super().__init__(data, dtype)
+
+    @classmethod
+    def _from_trusted(cls, buffer: array, shape: Tuple[int, int], requires_grad: bool = True) -> 'AutogradMatrix':
+        matrix = cls.__new__(cls)
+        if not requires_grad:
+            matrix.requires_grad = False
+        matrix._setup(buffer, shape)
+        return matrix
+
+    def _setup(self, buffer: array, shape: Tuple[int, int]):
+        super()._setup(buffer, shape)
+        self._grad = None
+        self._function = None
+        self._inputs = ()
+        self._previous_nodes = _NO_PARENTS
+        self._topo_cache = None
 
     def backward(self):
-        self._grad += self._calculate_grad()
-
-    def start_backpropagation(self):
-        topo = []
-        visited = set()
-
-        def build_topo(v):
-            if v not in visited:
-                visited.add(v)
-                for child in v._previous_nodes:
-                    build_topo(child)
-                topo.append(v)
-
-        build_topo(self)
-
-        for node in reversed(topo):
+        """
+        Add this node's contribution to the gradients of the inputs it was
+        computed from, using the vector-Jacobian product of its function.
+        """
+        if self._function is None or self._grad is None:
+            return
+
+        x, y = self._inputs
+        x_grad, y_grad = self._function.vjp(x, y, self._grad, self)
+        if x.requires_grad:
+            x._accumulate_grad(x_grad)
+        if y_grad is not None and y.requires_grad:
+            y._accumulate_grad(y_grad)
+
+    def _accumulate_grad(self, grad: Matrix):
+        if self._grad is None:
+            # The first contribution is copied: it can be a buffer that is
+            # still used elsewhere, like the output gradient that Addition
+            # passes through unchanged.
+            self._grad = Matrix._from_trusted(array(buffer_typecode(self._buffer), grad.buffer), self.shape)
+        else:
+            self._grad += grad
+
+    def start_backpropagation(self, cache_order=False, retain_graph=True, grad: Optional[Matrix] = None):
+        """
+        Propagate gradients from this node back to every node it depends on.
+
+        :param cache_order: Keep the topological order on this node and reuse
+            it on later calls instead of traversing the graph again. Only use
+            it while the graph below this node is left unchanged.
+        :param retain_graph: When False, each node drops its function, its
+            inputs and, for intermediate nodes, its gradient as soon as its
+            contribution has been pushed back. Parts of the graph that are
+            no longer referenced are freed during the pass, and the graph
+            cannot be backpropagated again.
+        :param grad: Gradient of this node to propagate, a matrix of its
+            shape; ones by default. Backpropagating once per ``grad`` with
+            ``retain_graph`` gives vector-Jacobian products, see
+            ``autograd.functional.matrix_vjp``.
+        """
+        if not self.requires_grad:
+            raise RuntimeError('Cannot backpropagate from a matrix that does not require gradients.')
+        if grad is not None and grad.shape != self.shape:
+            raise ValueError(f'Expected a gradient of shape {self.shape}, got {grad.shape}.')
+
+        topo = self._topo_cache
+        if topo is None:
+            topo = topological_order(self, matrix_parents)
+            if cache_order and retain_graph:
+                self._topo_cache = topo
+
+        if grad is not None:
+            self._accumulate_grad(grad)
+        elif self._grad is None:
+            self._grad = Matrix.ones(*self.shape, dtype=self.dtype)
+        else:
+            self._grad += 1
+
+        if retain_graph:
+            for node in reversed(topo):
+                node.backward()
+            return
+
+        self._topo_cache = None
+        while topo:
+            node = topo.pop()
             node.backward()
+            if node._function is not None and node is not self:
+                node._grad = None
+            node.release_graph()
+
+    def release_graph(self):
+        """
+        Forget how this node was computed, making it a leaf.
+        """
+        self._function = None
+        self._inputs = ()
+        self._previous_nodes = _NO_PARENTS
+        self._topo_cache = None
+
+    def clear_order_cache(self):
+        self._topo_cache = None
 
     def reset_grad(self):
-        self._grad = Matrix.zeros(*self.shape)
+        if self._grad is not None:
+            self._grad.zero_()
 
     @property
-    def grad(self):
+    def grad(self) -> Optional[Matrix]:
+        """
+        Gradient accumulated so far, zeros if none has reached this matrix
+        yet; None when it does not require gradients.
+        """
+        if self._grad is None and self.requires_grad:
+            self._grad = Matrix.zeros(*self.shape, dtype=self.dtype)
         return self._grad
 
     def add_prev(self, *prev):
-        self._previous_nodes.update(prev)
-
-    def reset_grad(self):
-        self._grad = Matrix.ones(*self.shape)
+        if self._previous_nodes is _NO_PARENTS:
+            self._previous_nodes = set(prev)
+        else:
+            self._previous_nodes.update(prev)
 
     def __mul__(self, other):
         return F.elementwise_multiply(self, other)
@@ -58,6 +168,17 @@ class AutogradMatrix(Matrix):
     def __add__(self, other):
         return F.add(self, other)
 
+    # The augmented operators build a new graph node like their binary
+    # counterparts; only add_, sub_, mul_ and zero_ write into the buffer.
+    def __iadd__(self, other):
+        return self + other
+
+    def __isub__(self, other):
+        return self - other
+
+    def __imul__(self, other):
+        return self * other
+
     def __radd__(self, other):
         return self + other
 
@@ -79,5 +200,26 @@ class AutogradMatrix(Matrix):
     def exp(self) -> 'Matrix':
         return F.exp(self)
 
-    def sum(self):
-        return super().sum()
+    def sigmoid(self) -> 'Matrix':
+        return F.sigmoid(self)
+
+    def tanh(self) -> 'Matrix':
+        return F.tanh(self)
+
+    def relu(self) -> 'Matrix':
+        return F.relu(self)
+
+    def softmax(self) -> 'Matrix':
+        return F.softmax(self)
+
+    def sum(self, axis: Optional[int] = None) -> 'AutogradMatrix':
+        return F.Sum.apply(self, axis)
+
+    def mean(self, axis: Optional[int] = None) -> 'AutogradMatrix':
+        return F.Mean.apply(self, axis)
+
+    def max(self, axis: Optional[int] = None) -> 'AutogradMatrix':
+        return F.Max.apply(self, axis)
+
+    def logsumexp(self, axis: Optional[int] = None) -> 'AutogradMatrix':
+        return F.LogSumExp.apply(self, axis)
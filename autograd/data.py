@@ -0,0 +1,236 @@
+import csv
+import queue
+import sys
+import threading
+
+from array import array
+
+from autograd.autograd_matrix import AutogradMatrix
+from autograd.matrix.matrix import _typecode
+
+from typing import (
+    Callable,
+    Iterable,
+    Iterator,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+# Rows read from a binary file per system call.
+BINARY_CHUNK_ROWS = 1024
+
+
+def read_csv(path: str, columns: Optional[Sequence[int]] = None, skip_header: bool = False,
+             delimiter: str = ',') -> Iterator[array]:
+    """
+    Stream the rows of a CSV file of numbers, one at a time.
+
+    :param path: File to read
+    :param columns: Indices of the columns to keep, in order; all by default
+    :param skip_header: Skip the first line
+    :param delimiter: Field separator
+    :return: Generator of rows as ``array('d')``
+    """
+    with open(path, newline='') as file:
+        reader = csv.reader(file, delimiter=delimiter)
+        if skip_header:
+            next(reader, None)
+        for line, fields in enumerate(reader, 2 if skip_header else 1):
+            if not fields:
+                continue
+            if columns is not None:
+                fields = [fields[i] for i in columns]
+            try:
+                yield array('d', map(float, fields))
+            except ValueError:
+                raise ValueError(f'{path}, line {line}: expected numbers, got {fields}.') from None
+
+
+def read_binary(path: str, cols: int, offset: int = 0) -> Iterator[memoryview]:
+    """
+    Stream the rows of a file of little-endian float64 values stored row
+    after row, reading ``BINARY_CHUNK_ROWS`` rows at a time.
+
+    :param path: File to read
+    :param cols: Number of values per row
+    :param offset: Number of bytes to skip at the start of the file
+    :return: Generator of rows, each a read-only view of ``cols`` floats
+        that is only valid until the next row is requested
+    """
+    row_bytes = cols * 8
+    with open(path, 'rb') as file:
+        file.seek(offset)
+        while True:
+            chunk = file.read(row_bytes * BINARY_CHUNK_ROWS)
+            if not chunk:
+                return
+            if len(chunk) % row_bytes:
+                raise ValueError(f'{path} ends with an incomplete row.')
+            values = array('d')
+            values.frombytes(chunk)
+            if sys.byteorder == 'big':
+                values.byteswap()
+            view = memoryview(values)
+            for start in range(0, len(values), cols):
+                yield view[start:start + cols]
+
+
+def batch_rows(rows: Iterable[Sequence[float]], batch_size: int, target_columns: int = 0,
+               drop_last: bool = False,
+               dtype: str = 'float64') -> Iterator[Union[AutogradMatrix, Tuple[AutogradMatrix, AutogradMatrix]]]:
+    """
+    Group rows into mini-batches, copying each row straight into the
+    batch's matrix buffer.
+
+    :param rows: Rows of numbers, all of the same length
+    :param batch_size: Number of rows per batch
+    :param target_columns: When positive, the last ``target_columns``
+        values of every row go into a separate target matrix
+    :param drop_last: Drop a final batch smaller than ``batch_size``
+    :param dtype: Element type of the batches, 'float64' or 'float32'
+    :return: Generator of matrices, or of ``(features, targets)`` pairs
+        when ``target_columns`` is positive. They are data, so they do not
+        require gradients.
+    """
+    if batch_size <= 0:
+        raise ValueError('Batch size must be positive.')
+
+    typecode = _typecode(dtype)
+    cols = None
+    features, targets = array(typecode), array(typecode)
+    count = 0
+    for row in rows:
+        if cols is None:
+            cols = len(row)
+            if not 0 <= target_columns < cols:
+                raise ValueError('target_columns must leave at least one feature column.')
+            split = cols - target_columns
+        elif len(row) != cols:
+            raise ValueError(f'All rows must have the same length, got {len(row)} instead of {cols}.')
+
+        if isinstance(row, array) and row.typecode != typecode:
+            row = row.tolist()
+        if target_columns:
+            features.extend(row[:split])
+            targets.extend(row[split:])
+        else:
+            features.extend(row)
+        count += 1
+
+        if count == batch_size:
+            yield _make_batch(features, targets, count, split, target_columns)
+            features, targets = array(typecode), array(typecode)
+            count = 0
+
+    if count and not drop_last:
+        yield _make_batch(features, targets, count, split, target_columns)
+
+
+def _make_batch(features: array, targets: array, count: int, split: int, target_columns: int):
+    x = AutogradMatrix._from_trusted(features, (count, split), requires_grad=False)
+    if not target_columns:
+        return x
+    return x, AutogradMatrix._from_trusted(targets, (count, target_columns), requires_grad=False)
+
+
+_END = object()
+
+
+def prefetch(iterable: Iterable, depth: int = 1) -> Iterator:
+    """
+    Iterate over ``iterable`` on a background thread, keeping up to
+    ``depth`` items ready ahead of the consumer.
+
+    Reading and parsing the next batch then overlaps with the work done on
+    the current one. An exception raised while producing an item is raised
+    again in the consumer. Closing the returned generator stops the thread.
+
+    :param iterable: Items to produce
+    :param depth: Maximum number of items waiting to be consumed
+    :return: Generator of the items of ``iterable``
+    """
+    if depth <= 0:
+        raise ValueError('Prefetch depth must be positive.')
+
+    items = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+
+    def put(item) -> bool:
+        while not stop.is_set():
+            try:
+                items.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def produce():
+        try:
+            for item in iterable:
+                if not put((item, None)):
+                    return
+        except BaseException as error:
+            put((_END, error))
+            return
+        put((_END, None))
+
+    thread = threading.Thread(target=produce, name='autograd-prefetch', daemon=True)
+    thread.start()
+    try:
+        while True:
+            item, error = items.get()
+            if item is _END:
+                if error is not None:
+                    raise error
+                return
+            yield item
+    finally:
+        stop.set()
+        thread.join()
+
+
+class DataLoader:
+    """
+    Mini-batches streamed from a source of rows, read again on every
+    iteration so that each ``for`` loop over the loader is one epoch.
+
+    Only the batches being consumed or prefetched are held in memory, as
+    flat buffers of 8 bytes per value, or 4 with ``dtype='float32'``.
+    """
+
+    def __init__(self, rows: Callable[[], Iterable[Sequence[float]]], batch_size: int,
+                 target_columns: int = 0, drop_last: bool = False, prefetch: int = 1, dtype: str = 'float64'):
+        """
+        :param rows: Callable returning a fresh iterable of rows, such as
+            ``lambda: read_csv('train.csv')``
+        :param batch_size: Number of rows per batch
+        :param target_columns: Number of trailing columns returned as a
+            separate target matrix, see ``batch_rows``
+        :param drop_last: Drop a final batch smaller than ``batch_size``
+        :param prefetch: Number of batches prepared ahead on a background
+            thread; 0 disables prefetching
+        :param dtype: Element type of the batches, 'float64' or 'float32'
+        """
+        self._rows = rows
+        self._batch_size = batch_size
+        self._target_columns = target_columns
+        self._drop_last = drop_last
+        self._prefetch = prefetch
+        self._dtype = dtype
+
+    @classmethod
+    def from_csv(cls, path: str, batch_size: int, columns: Optional[Sequence[int]] = None,
+                 skip_header: bool = False, delimiter: str = ',', **kwargs) -> 'DataLoader':
+        return cls(lambda: read_csv(path, columns, skip_header, delimiter), batch_size, **kwargs)
+
+    @classmethod
+    def from_binary(cls, path: str, cols: int, batch_size: int, offset: int = 0, **kwargs) -> 'DataLoader':
+        return cls(lambda: read_binary(path, cols, offset), batch_size, **kwargs)
+
+    def __iter__(self) -> Iterator:
+        batches = batch_rows(self._rows(), self._batch_size, self._target_columns, self._drop_last, self._dtype)
+        if self._prefetch:
+            return prefetch(batches, self._prefetch)
+        return batches
@@ -0,0 +1,78 @@
+from autograd.functions import (
+    Addition,
+    BatchSum,
+    Multiplication,
+    Power,
+)
+from autograd.functions.batch import (
+    accumulate,
+    as_data,
+)
+
+
+class Dual:
+    """
+    A dual number for forward-mode differentiation.
+
+    ``primal`` holds the value and ``tangent`` its directional derivative.
+    Operations are the same BaseOperation subclasses used by Value; applying
+    one to a Dual computes both parts at once and records no graph.
+    """
+
+    __slots__ = ['primal', 'tangent']
+
+    def __init__(self, primal, tangent=0):
+        self.primal = as_data(primal)
+        self.tangent = as_data(tangent)
+
+    def __repr__(self):
+        return f'Dual({self.primal}, {self.tangent})'
+
+    def __add__(self, other):
+        return Addition.apply(self, other)
+
+    def __mul__(self, other):
+        return Multiplication.apply(self, other)
+
+    def __pow__(self, power):
+        return Power.apply(self, power)
+
+    def __neg__(self):
+        return self * -1
+
+    def __radd__(self, other):
+        return self + other
+
+    def __sub__(self, other):
+        return self + (-other)
+
+    def __rsub__(self, other):
+        return other + (-self)
+
+    def __rmul__(self, other):
+        return self * other
+
+    def __truediv__(self, other):
+        return self * other ** -1
+
+    def __rtruediv__(self, other):
+        return other * self ** -1
+
+    def sum(self):
+        return BatchSum.apply(self)
+
+
+def apply_dual(operation, lhs: Dual, rhs) -> Dual:
+    """
+    Apply an operation to dual numbers, propagating the tangents with the
+    operation's Jacobian-vector product.
+    """
+    if isinstance(rhs, Dual):
+        primal = operation.evaluate(lhs.primal, rhs.primal)
+        tangent = accumulate(
+            operation.jvp(lhs.tangent, lhs.primal, rhs.primal),
+            operation.jvp_rhs(rhs.tangent, lhs.primal, rhs.primal),
+        )
+        return Dual(primal, tangent)
+
+    return Dual(operation.evaluate(lhs.primal, rhs), operation.jvp(lhs.tangent, lhs.primal, rhs))
@@ -0,0 +1,412 @@
+from array import array
+
+from autograd.autograd_matrix import AutogradMatrix
+from autograd.dual import Dual
+from autograd.functions.batch import (
+    accumulate,
+    as_data,
+    is_batch,
+)
+from autograd.graph import (
+    matrix_parents,
+    topological_order,
+    value_parents,
+)
+from autograd.matrix import Matrix
+from autograd.matrix.functions import buffer_typecode
+from autograd.value import Value
+
+from typing import (
+    Callable,
+    Dict,
+    List,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+
+def jvp(f: Callable, x: Union[float, Sequence[float]], v, batched: bool = False) -> Tuple:
+    """
+    Evaluate ``f`` at ``x`` and its Jacobian-vector product along ``v`` in a
+    single forward pass, using dual numbers.
+
+    :param f: Function of one argument per input, built from Value-compatible
+        operations; it may return one result or a sequence of results
+    :param x: Input point, a number or a sequence of numbers
+    :param v: Direction, with the same structure as ``x``
+    :param batched: ``v`` is a list of directions. ``f`` is then called
+        once with Values and every direction is propagated through the
+        recorded graph in the same sweep, each node holding one tangent
+        per direction, so ``f`` must be built from Value operations.
+    :return: ``(outputs, tangents)`` with the same structure as the result
+        of ``f``; when batched, ``tangents`` is a list with one such
+        structure per direction
+    """
+    single_input = not isinstance(x, (list, tuple))
+    if single_input:
+        x = [x]
+        v = [[direction] for direction in v] if batched else [v]
+
+    if batched:
+        _check_seeds(v, len(x), 'directions', 'inputs')
+        inputs = [Value(primal) for primal in x]
+        outputs = f(*inputs)
+        single_output = not isinstance(outputs, (list, tuple))
+        outputs = _as_sequence(outputs)
+        tangents = _propagate_tangents(inputs, outputs, v)
+        values = [_data(output) for output in outputs]
+        if single_output:
+            return values[0], [tangent[0] for tangent in tangents]
+        return values, tangents
+
+    if len(x) != len(v):
+        raise ValueError('Inputs and tangents must have the same length.')
+
+    outputs = f(*[Dual(primal, tangent) for primal, tangent in zip(x, v)])
+
+    if not isinstance(outputs, (list, tuple)):
+        return _split(outputs)
+
+    primals, tangents = zip(*[_split(output) for output in outputs])
+    return list(primals), list(tangents)
+
+
+def _split(output) -> Tuple:
+    if isinstance(output, Dual):
+        return output.primal, output.tangent
+    return output, 0
+
+
+def vjp(f: Callable, x: Union[float, Sequence[float]], u, batched: bool = False) -> Tuple:
+    """
+    Evaluate ``f`` at ``x`` and its vector-Jacobian product with ``u``: one
+    forward pass records the graph and one reverse pass propagates ``u``
+    from the outputs back to the inputs.
+
+    :param f: Function of one argument per input, built from Value
+        operations; it may return one Value or a sequence of them
+    :param x: Input point, a number or a sequence of numbers
+    :param u: Cotangent, a number when ``f`` returns a single Value and
+        otherwise one number per output
+    :param batched: ``u`` is a list of cotangents, all propagated in the
+        same reverse pass: every node holds one gradient per cotangent.
+    :return: ``(outputs, gradients)``, the gradients with the same structure
+        as ``x``; when batched, a list with one such structure per cotangent
+    """
+    single_input = not isinstance(x, (list, tuple))
+    if single_input:
+        x = [x]
+
+    inputs = [Value(primal) for primal in x]
+    outputs = f(*inputs)
+    single_output = not isinstance(outputs, (list, tuple))
+    if single_output:
+        outputs = [outputs]
+        u = [[cotangent] for cotangent in u] if batched else [u]
+
+    if not batched:
+        if len(u) != len(outputs):
+            raise ValueError(f'Expected a cotangent for each of the {len(outputs)} outputs, got {len(u)}.')
+        u = [u]
+    _check_seeds(u, len(outputs), 'cotangents', 'outputs')
+    gradients = _gradients_per_seed(inputs, outputs, u)
+
+    values = [_data(output) for output in outputs]
+    values = values[0] if single_output else values
+    if single_input:
+        gradients = [gradient[0] for gradient in gradients]
+    return values, gradients if batched else gradients[0]
+
+
+def jacobian(f: Callable, x: Union[float, Sequence[float]]) -> List[List[float]]:
+    """
+    Compute the Jacobian of ``f`` at ``x`` from a single recording of its
+    graph: a reverse sweep propagating one cotangent per output when ``f``
+    has at most as many outputs as inputs, otherwise a forward sweep
+    propagating one tangent per input.
+
+    :param f: Function of one argument per input, built from Value
+        operations; it may return one Value or a sequence of them
+    :param x: Input point, a number or a sequence of numbers
+    :return: One row per output of ``f``, each with one derivative per input
+    """
+    if not isinstance(x, (list, tuple)):
+        x = [x]
+    if any(is_batch(as_data(primal)) for primal in x):
+        raise ValueError('The inputs of a Jacobian must be numbers, not batches.')
+
+    inputs = [Value(primal) for primal in x]
+    outputs = _as_sequence(f(*inputs))
+    rows, cols = len(outputs), len(inputs)
+
+    if rows <= cols:
+        return _gradients_per_seed(inputs, outputs, _identity(rows))
+
+    columns = _propagate_tangents(inputs, outputs, _identity(cols))
+    return [[columns[j][i] for j in range(cols)] for i in range(rows)]
+
+
+def _as_sequence(outputs) -> Sequence:
+    return outputs if isinstance(outputs, (list, tuple)) else [outputs]
+
+
+def _data(output):
+    return output.data if isinstance(output, Value) else output
+
+
+def _identity(size: int) -> List[List[float]]:
+    return [[1.0 if i == j else 0.0 for j in range(size)] for i in range(size)]
+
+
+def _check_seeds(vectors: Sequence[Sequence], size: int, name: str, of: str):
+    for vector in vectors:
+        if len(vector) != size:
+            raise ValueError(f'Each of the {name} must have one entry for each of the {size} {of}.')
+
+
+# Stands for a node whose parents are the outputs of a function, so that
+# a single traversal orders the graphs of all of them.
+_OUTPUTS = object()
+
+
+def _graph_order(outputs: Sequence) -> List[Value]:
+    """
+    :return: Nodes of the graphs of all outputs, each after its parents
+    """
+    roots = [output for output in outputs if isinstance(output, Value) and output.requires_grad]
+    order = topological_order(_OUTPUTS, lambda node: roots if node is _OUTPUTS else value_parents(node))
+    order.pop()
+    return order
+
+
+def _add_seeds(seeds: Dict[Value, List], node: Value, contributions: List):
+    total = seeds.get(node)
+    seeds[node] = contributions if total is None else [accumulate(t, c) for t, c in zip(total, contributions)]
+
+
+def _gradients_per_seed(inputs: Sequence[Value], outputs: Sequence, cotangents: Sequence[Sequence]) -> List[List]:
+    """
+    Propagate several cotangents back from the outputs in one reverse sweep.
+    Every node holds a list with one gradient per cotangent, kept apart from
+    the batch axis of its data, and the nodes' ``gradient`` attributes are
+    left untouched.
+
+    :param cotangents: One entry per output for each cotangent
+    :return: For each cotangent, the gradient of every input
+    """
+    count = len(cotangents)
+    gradients: Dict[Value, List] = {}
+    for i, output in enumerate(outputs):
+        if isinstance(output, Value) and output.requires_grad:
+            _add_seeds(gradients, output, [as_data(cotangent[i]) for cotangent in cotangents])
+
+    for node in reversed(_graph_order(outputs)):
+        gradient = gradients.get(node)
+        if gradient is None or node._op is None:
+            continue
+        op = node._op
+        lhs, rhs = node._args
+        if isinstance(rhs, Value):
+            if lhs.requires_grad:
+                _add_seeds(gradients, lhs, [op.vjp(g, lhs.data, rhs.data) for g in gradient])
+            if rhs.requires_grad:
+                _add_seeds(gradients, rhs, [op.vjp_rhs(g, lhs.data, rhs.data) for g in gradient])
+        else:
+            _add_seeds(gradients, lhs, [op.vjp(g, lhs.data, rhs) for g in gradient])
+
+    per_input = [gradients.get(node, [0] * count) for node in inputs]
+    return [[gradient[k] for gradient in per_input] for k in range(count)]
+
+
+def _propagate_tangents(inputs: Sequence[Value], outputs: Sequence, directions: Sequence[Sequence]) -> List[List]:
+    """
+    Propagate several directions forward from the inputs through the graph
+    recorded by the outputs, in one sweep. Every node holds a list with one
+    tangent per direction, kept apart from the batch axis of its data.
+
+    :param directions: One entry per input for each direction
+    :return: For each direction, the tangent of every output
+    """
+    count = len(directions)
+    tangents: Dict[Value, List] = {}
+    for j, node in enumerate(inputs):
+        _add_seeds(tangents, node, [as_data(direction[j]) for direction in directions])
+
+    for node in _graph_order(outputs):
+        if node._op is None:
+            continue
+        op = node._op
+        lhs, rhs = node._args
+        if isinstance(rhs, Value):
+            if lhs in tangents:
+                _add_seeds(tangents, node, [op.jvp(t, lhs.data, rhs.data) for t in tangents[lhs]])
+            if rhs in tangents:
+                _add_seeds(tangents, node, [op.jvp_rhs(t, lhs.data, rhs.data) for t in tangents[rhs]])
+        elif lhs in tangents:
+            _add_seeds(tangents, node, [op.jvp(t, lhs.data, rhs) for t in tangents[lhs]])
+
+    per_output = [tangents.get(output, [0] * count) if isinstance(output, Value) else [0] * count
+                  for output in outputs]
+    return [[tangent[k] for tangent in per_output] for k in range(count)]
+
+
+def matrix_vjp(f: Callable, x: Union[Matrix, Sequence[Matrix]], u, batched: bool = False) -> Tuple:
+    """
+    Evaluate a function of matrices at ``x`` and its vector-Jacobian
+    product with ``u``. The graph is recorded once and kept, and every
+    cotangent is propagated back through it by its own backward pass.
+
+    :param f: Function of one AutogradMatrix per input, returning an
+        AutogradMatrix
+    :param x: Input matrix or sequence of matrices; they are copied, so
+        their gradients are left untouched
+    :param u: Cotangent, a matrix of the shape of the output
+    :param batched: ``u`` is a list of cotangents
+    :return: ``(output, gradients)``, the gradients with the same structure
+        as ``x``; when batched, a list with one such structure per cotangent
+    """
+    single_input, inputs, output = _record_matrices(f, x)
+    products = _matrix_gradients_per_seed(inputs, output, u if batched else [u])
+    if single_input:
+        products = [gradients[0] for gradients in products]
+    return output, products if batched else products[0]
+
+
+def matrix_jacobian(f: Callable, x: Union[Matrix, Sequence[Matrix]]) -> Union[Matrix, List[Matrix]]:
+    """
+    Compute the Jacobian of a function of matrices, with one backward pass
+    per element of the output through a single recording of the graph.
+
+    :param f: Function of one AutogradMatrix per input, returning an
+        AutogradMatrix
+    :param x: Input matrix or sequence of matrices
+    :return: For each input, a matrix with one row per element of the
+        output and one column per element of the input, elements taken in
+        row-major order; a single matrix when ``x`` is a matrix
+    """
+    single_input, inputs, output = _record_matrices(f, x)
+    rows, cols = output.shape
+    seeds = []
+    for i in range(rows * cols):
+        seed = Matrix.zeros(rows, cols, dtype=output.dtype)
+        seed.buffer[i] = 1
+        seeds.append(seed)
+
+    products = _matrix_gradients_per_seed(inputs, output, seeds)
+    jacobians = []
+    for j, node in enumerate(inputs):
+        buffer = array(buffer_typecode(node.buffer))
+        for gradients in products:
+            buffer.extend(gradients[j].buffer)
+        jacobians.append(Matrix._from_trusted(buffer, (len(seeds), len(node.buffer))))
+    return jacobians[0] if single_input else jacobians
+
+
+def _record_matrices(f: Callable, x) -> Tuple:
+    single_input = isinstance(x, Matrix)
+    inputs = [AutogradMatrix._from_trusted(array(buffer_typecode(m.buffer), m.buffer), m.shape)
+              for m in ([x] if single_input else x)]
+    output = f(*inputs)
+    if not isinstance(output, AutogradMatrix):
+        raise TypeError('f must return an AutogradMatrix.')
+    return single_input, inputs, output
+
+
+def _matrix_gradients_per_seed(inputs: Sequence[AutogradMatrix], output: AutogradMatrix,
+                               cotangents: Sequence[Matrix]) -> List[List[Matrix]]:
+    """
+    :return: For each cotangent, a copy of the gradient of every input
+    """
+    nodes = topological_order(output, matrix_parents) if output.requires_grad else []
+    products = []
+    for cotangent in cotangents:
+        for node in nodes:
+            node.reset_grad()
+        for node in inputs:
+            node.reset_grad()
+        if output.requires_grad:
+            output.start_backpropagation(cache_order=True, grad=cotangent)
+        products.append([Matrix._from_trusted(array(buffer_typecode(node.grad.buffer), node.grad.buffer), node.shape)
+                         for node in inputs])
+    output.clear_order_cache()
+    return products
+
+
+def hvp(f: Callable, x: Union[float, Sequence[float]], v: Union[float, Sequence[float]]) -> Tuple:
+    """
+    Evaluate ``f`` at ``x`` and the product of its Hessian with ``v``,
+    exactly, by differentiating the backward pass: one forward pass, one
+    backward pass that builds the gradient as a graph, and one backward
+    pass through that graph.
+
+    :param f: Function of one argument per input, built from Value
+        operations and returning a single Value
+    :param x: Input point, a number or a sequence of numbers
+    :param v: Direction, with the same structure as ``x``
+    :return: ``(output, product)``, the product with the same structure as ``x``
+    """
+    single_input = not isinstance(x, (list, tuple))
+    if single_input:
+        x, v = [x], [v]
+    if len(x) != len(v):
+        raise ValueError('Inputs and directions must have the same length.')
+
+    output, inputs, gradients = _gradients(f, x)
+    terms = [g * direction for g, direction in zip(gradients, v) if _is_differentiable(g)]
+    product = [0] * len(inputs)
+    if terms:
+        directional = terms[0]
+        for term in terms[1:]:
+            directional = directional + term
+        product = _second_derivatives(directional, inputs)
+    return output, product[0] if single_input else product
+
+
+def hessian(f: Callable, x: Union[float, Sequence[float]]) -> Union[float, List[List[float]]]:
+    """
+    Compute the Hessian of ``f`` at ``x`` exactly. The gradient graph is
+    built once and backpropagated once per input, so this suits functions
+    of a few inputs.
+
+    :param f: Function of one argument per input, built from Value
+        operations and returning a single Value
+    :param x: Input point, a number or a sequence of numbers
+    :return: Second derivative for a single number, otherwise the Hessian
+        as a list of rows
+    """
+    single_input = not isinstance(x, (list, tuple))
+    if single_input:
+        x = [x]
+
+    _, inputs, gradients = _gradients(f, x)
+    rows = []
+    for g in gradients:
+        rows.append(_second_derivatives(g, inputs) if _is_differentiable(g) else [0] * len(inputs))
+    return rows[0][0] if single_input else rows
+
+
+def _gradients(f: Callable, x: Sequence[float]) -> Tuple:
+    inputs = [Value(primal) for primal in x]
+    output = f(*inputs)
+    if not isinstance(output, Value):
+        raise TypeError('f must return a Value.')
+    output.run_backpropagation(create_graph=True)
+    return output.data, inputs, [node.gradient for node in inputs]
+
+
+def _is_differentiable(gradient) -> bool:
+    # A gradient that does not depend on the inputs is a number or a
+    # constant Value, whose derivatives are all zero.
+    return isinstance(gradient, Value) and gradient.requires_grad
+
+
+def _second_derivatives(gradient: Value, inputs: List[Value]) -> List:
+    # The first backward pass left Value gradients on the nodes; start the
+    # second pass from zero everywhere it accumulates.
+    for node in topological_order(gradient, value_parents):
+        node.reset_gradient()
+    for node in inputs:
+        node.reset_gradient()
+    gradient.run_backpropagation()
+    return [node.gradient for node in inputs]
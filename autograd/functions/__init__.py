@@ -1,5 +1,7 @@
 from .operations import (
     Addition,
+    BatchSum,
+    Log,
     Multiplication,
     Power,
 )
@@ -23,6 +25,14 @@ def pow(lhs, rhs):
     return Power.apply(lhs, rhs)
 
 
+def log(x):
+    return Log.apply(x)
+
+
+def batch_sum(x):
+    return BatchSum.apply(x)
+
+
 def sigmoid(x):
     return Sigmoid.apply(x)
 
@@ -39,12 +49,16 @@ __all__ = [
     'Addition',
     'Multiplication',
     'Power',
+    'Log',
+    'BatchSum',
     'Sigmoid',
     'Tanh',
     'Relu',
     'add',
     'mul',
     'pow',
+    'log',
+    'batch_sum',
     'sigmoid',
     'tanh',
     'relu',
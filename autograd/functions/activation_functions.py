@@ -3,6 +3,7 @@ import math
 from .base import (
     BaseOperation,
 )
+from .batch import elementwise
 
 
 class Relu(BaseOperation):
@@ -15,6 +16,10 @@ class Relu(BaseOperation):
     def backward(lhs: float, rhs: float):
         return 1 if lhs > 0 else 0
 
+    @classmethod
+    def vjp_graph(cls, gradient, lhs, rhs):
+        return gradient * elementwise(cls.backward, lhs.data, rhs)
+
 
 class Sigmoid(BaseOperation):
 
@@ -26,6 +31,16 @@ class Sigmoid(BaseOperation):
     def backward(lhs: float, rhs: float):
         return (1 / (1 + math.exp(-lhs))) * (1 - (1 / (1 + math.exp(-lhs))))
 
+    @classmethod
+    def vjp_graph(cls, gradient, lhs, rhs):
+        s = cls.apply(lhs)
+        return gradient * (s * (1 - s))
+
+
+# Smallest derivative Tanh reports, so that saturated units still pass
+# some gradient back.
+TANH_EPSILON = 1e-10
+
 
 class Tanh(BaseOperation):
 
@@ -35,6 +50,14 @@ class Tanh(BaseOperation):
 
     @staticmethod
     def backward(lhs: float, rhs: float):
-        epsilon = 1e-10
         derivative = 1 - math.tanh(lhs) ** 2
-        return max(derivative, epsilon)  # Ensures derivative is never zero
+        return max(derivative, TANH_EPSILON)  # Ensures derivative is never zero
+
+    @classmethod
+    def vjp_graph(cls, gradient, lhs, rhs):
+        # The derivative of backward as a graph: 1 - t * t where it is above
+        # the clamp, and the constant TANH_EPSILON where it is clamped.
+        t = cls.apply(lhs)
+        unclamped = elementwise(lambda x: float(1 - math.tanh(x) ** 2 > TANH_EPSILON), lhs.data)
+        clamped = elementwise(lambda u: (1 - u) * TANH_EPSILON, unclamped)
+        return gradient * ((1 - t * t) * unclamped + clamped)
@@ -1,7 +1,25 @@
 import abc
+import operator
+import threading
+
+from autograd import grad_mode
+
+from .batch import (
+    elementwise,
+    unbroadcast,
+)
 
 from typing import Optional
 
+class _Tracing(threading.local):
+    # List that BaseOperation.apply appends (operation, lhs, rhs, output)
+    # records to while autograd.tracing.trace is recording a function in
+    # the current thread.
+    tape: Optional[list] = None
+
+
+_tracing = _Tracing()
+
 
 def rhs_required(func):
     def wrapper(lhs, rhs):
@@ -18,22 +36,126 @@ class BaseOperation(abc.ABC):
         from autograd import Value
 
         if not isinstance(lhs, Value):
+            from autograd.dual import Dual, apply_dual
+
+            if isinstance(lhs, Dual):
+                return apply_dual(cls, lhs, rhs)
             raise TypeError('Left hand side must be a Value instance.')
 
         if not isinstance(rhs, Value):
-            res = cls.forward(lhs.data, rhs)
-            output = Value(res)
-            lhs._calculate_gradient = lambda: cls.backward(lhs.data, rhs) * output.gradient
-            output.add_prev(lhs)
-            return output
-
-        res = cls.forward(lhs.data, rhs.data)
-        output = Value(res)
-        lhs._calculate_gradient = lambda: cls.backward(lhs.data, rhs.data) * output.gradient
-        rhs._calculate_gradient = lambda: cls.backward(rhs.data, lhs.data) * output.gradient
-        output.add_prev(lhs, rhs)
+            data = cls.evaluate(lhs.data, rhs)
+            parents = (lhs,) if lhs.requires_grad else ()
+        else:
+            data = cls.evaluate(lhs.data, rhs.data)
+            if lhs.requires_grad:
+                parents = (lhs, rhs) if rhs.requires_grad else (lhs,)
+            else:
+                parents = (rhs,) if rhs.requires_grad else ()
+
+        if parents and grad_mode._state.enabled:
+            output = Value(data)
+            output.add_prev(*parents)
+            output._op = cls
+            output._args = (lhs, rhs)
+        else:
+            output = Value(data, requires_grad=False)
+
+        tape = _tracing.tape
+        if tape is not None:
+            tape.append((cls, lhs, rhs, output))
         return output
 
+    @classmethod
+    def evaluate(cls, lhs, rhs):
+        """
+        Compute the operation's output, element by element for batches.
+
+        :param lhs: Left hand side data, a number or a batch
+        :param rhs: Right hand side data, a number, a batch or None
+        :return: Output data
+        """
+        return elementwise(cls.forward, lhs, rhs)
+
+    @classmethod
+    def vjp(cls, gradient, lhs, rhs):
+        """
+        Vector-Jacobian product of the operation with respect to ``lhs``.
+
+        :param gradient: Gradient of the operation's output
+        :param lhs: Data of the operand to differentiate against
+        :param rhs: Data of the other operand
+        :return: Contribution to the gradient of ``lhs``, summed over the
+            batch when ``lhs`` is a number used with a batch
+        """
+        return unbroadcast(elementwise(operator.mul, elementwise(cls.backward, lhs, rhs), gradient), lhs)
+
+    @classmethod
+    def vjp_rhs(cls, gradient, lhs, rhs):
+        """
+        Vector-Jacobian product of the operation with respect to ``rhs``.
+        The default swaps the operands of ``vjp``, which suits operations
+        whose derivative has the same form for both operands.
+
+        :param gradient: Gradient of the operation's output
+        :param lhs: Data of the left hand side
+        :param rhs: Data of the right hand side, the operand to differentiate against
+        :return: Contribution to the gradient of ``rhs``
+        """
+        return cls.vjp(gradient, rhs, lhs)
+
+    @classmethod
+    def vjp_graph(cls, gradient, lhs, rhs):
+        """
+        Vector-Jacobian product of the operation with respect to ``lhs``,
+        built from Value operations so that it can be differentiated again.
+        Used by ``run_backpropagation(create_graph=True)``.
+
+        :param gradient: Gradient of the operation's output, a Value
+        :param lhs: The operand to differentiate against, a Value
+        :param rhs: The other operand, a Value, a constant or None
+        :return: Contribution to the gradient of ``lhs``, a Value
+        """
+        raise NotImplementedError(f'{cls.__name__} cannot be differentiated twice.')
+
+    @classmethod
+    def vjp_graph_rhs(cls, gradient, lhs, rhs):
+        """
+        ``vjp_graph`` with respect to a Value right hand side, swapping the
+        operands unless overridden like ``vjp_rhs``.
+
+        :param gradient: Gradient of the operation's output, a Value
+        :param lhs: The left hand side, a Value
+        :param rhs: The right hand side, the Value to differentiate against
+        :return: Contribution to the gradient of ``rhs``, a Value
+        """
+        return cls.vjp_graph(gradient, rhs, lhs)
+
+    @classmethod
+    def jvp(cls, tangent, lhs, rhs):
+        """
+        Jacobian-vector product of the operation with respect to ``lhs``,
+        used by forward-mode differentiation.
+
+        :param tangent: Tangent of ``lhs``
+        :param lhs: Data of the operand the tangent belongs to
+        :param rhs: Data of the other operand
+        :return: Contribution to the tangent of the output
+        """
+        return elementwise(operator.mul, elementwise(cls.backward, lhs, rhs), tangent)
+
+    @classmethod
+    def jvp_rhs(cls, tangent, lhs, rhs):
+        """
+        Jacobian-vector product of the operation with respect to ``rhs``,
+        swapping the operands of ``jvp`` unless overridden like ``vjp_rhs``.
+
+        :param tangent: Tangent of ``rhs``
+        :param lhs: Data of the left hand side
+        :param rhs: Data of the right hand side, the operand the tangent belongs to
+        :return: Contribution to the tangent of the output
+        """
+        return cls.jvp(tangent, rhs, lhs)
+
     @staticmethod
     @abc.abstractmethod
     def forward(lhs: float, rhs: Optional[float]):
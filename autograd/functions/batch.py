@@ -0,0 +1,71 @@
+import math
+import operator
+
+from array import array
+from itertools import repeat
+
+from typing import (
+    Callable,
+    Union,
+)
+
+Data = Union[float, array]
+
+
+def is_batch(x) -> bool:
+    return type(x) is array
+
+
+def as_data(x) -> Data:
+    """
+    Convert lists and tuples of numbers to a batch; leave other data as is.
+    """
+    if isinstance(x, (list, tuple)):
+        return array('d', x)
+    return x
+
+
+def elementwise(func: Callable, *operands) -> Data:
+    """
+    Apply a scalar function element by element across batches.
+
+    Operands that are not batches are broadcast against the batch ones. If
+    no operand is a batch, ``func`` is simply called on the operands.
+
+    :param func: Scalar function taking one argument per operand
+    :param operands: Scalars, None or batches of the same size
+    :return: Result of ``func``, a batch if any operand is a batch
+    """
+    size = -1
+    for operand in operands:
+        if type(operand) is array:
+            if size == -1:
+                size = len(operand)
+            elif len(operand) != size:
+                raise ValueError('Batches must have the same size.')
+
+    if size == -1:
+        return func(*operands)
+
+    columns = [operand if type(operand) is array else repeat(operand, size) for operand in operands]
+    return array('d', map(func, *columns))
+
+
+def accumulate(total: Data, contribution: Data) -> Data:
+    """
+    Add a gradient contribution, broadcasting scalars against batches.
+    """
+    if type(total) is array or type(contribution) is array:
+        return elementwise(operator.add, total, contribution)
+    return total + contribution
+
+
+def unbroadcast(gradient: Data, data: Data) -> Data:
+    """
+    Give a gradient the shape of the operand it belongs to: a number used
+    with a batch is shared by every sample, so its gradient is the sum of
+    the per-sample contributions.
+    """
+    if type(gradient) is array and type(data) is not array:
+        return math.fsum(gradient)
+    return gradient
@@ -1,7 +1,17 @@
+import math
+import operator
+
+from array import array
+
 from .base import (
     BaseOperation,
     rhs_required,
 )
+from .batch import (
+    elementwise,
+    is_batch,
+    unbroadcast,
+)
 
 from typing import (
     Optional,
@@ -20,6 +30,10 @@ class Multiplication(BaseOperation):
     def backward(lhs: float, rhs: Optional[float]):
         return rhs
 
+    @classmethod
+    def vjp_graph(cls, gradient, lhs, rhs):
+        return gradient * rhs
+
 
 class Addition(BaseOperation):
 
@@ -33,6 +47,10 @@ class Addition(BaseOperation):
     def backward(lhs: float, rhs: Optional[float]):
         return 1
 
+    @classmethod
+    def vjp_graph(cls, gradient, lhs, rhs):
+        return gradient
+
 
 class Power(BaseOperation):
 
@@ -45,3 +63,81 @@ class Power(BaseOperation):
     @rhs_required
     def backward(lhs: float, rhs: Optional[float]):
         return rhs * lhs ** (rhs - 1)
+
+    @staticmethod
+    def exponent_backward(lhs: float, rhs: float):
+        """
+        Derivative of ``lhs ** rhs`` with respect to the exponent, which is
+        only defined for a positive base; it tends to 0 at a zero base.
+        """
+        if lhs > 0:
+            return lhs ** rhs * math.log(lhs)
+        return 0.0 if lhs == 0 else math.nan
+
+    @classmethod
+    def vjp_rhs(cls, gradient, lhs, rhs):
+        return unbroadcast(elementwise(operator.mul, elementwise(cls.exponent_backward, lhs, rhs), gradient), rhs)
+
+    @classmethod
+    def jvp_rhs(cls, tangent, lhs, rhs):
+        return elementwise(operator.mul, elementwise(cls.exponent_backward, lhs, rhs), tangent)
+
+    @classmethod
+    def vjp_graph(cls, gradient, lhs, rhs):
+        return gradient * (lhs ** (rhs - 1) * rhs)
+
+    @classmethod
+    def vjp_graph_rhs(cls, gradient, lhs, rhs):
+        return gradient * (cls.apply(lhs, rhs) * Log.apply(lhs))
+
+
+class Log(BaseOperation):
+
+    @staticmethod
+    def forward(lhs: float, rhs: Optional[float]):
+        # Like Power.exponent_backward, a zero or negative input gives a
+        # float result instead of raising.
+        if lhs > 0:
+            return math.log(lhs)
+        return -math.inf if lhs == 0 else math.nan
+
+    @staticmethod
+    def backward(lhs: float, rhs: Optional[float]):
+        return 1 / lhs
+
+    @classmethod
+    def vjp_graph(cls, gradient, lhs, rhs):
+        return gradient * lhs ** -1
+
+
+class BatchSum(BaseOperation):
+
+    @classmethod
+    def evaluate(cls, lhs, rhs):
+        return math.fsum(lhs) if is_batch(lhs) else lhs
+
+    @classmethod
+    def vjp(cls, gradient, lhs, rhs):
+        if is_batch(lhs):
+            return array('d', [gradient]) * len(lhs)
+        return gradient
+
+    @classmethod
+    def vjp_graph(cls, gradient, lhs, rhs):
+        if is_batch(lhs.data):
+            return gradient * (array('d', [1.0]) * len(lhs.data))
+        return gradient
+
+    @classmethod
+    def jvp(cls, tangent, lhs, rhs):
+        if not is_batch(lhs):
+            return tangent
+        return math.fsum(tangent) if is_batch(tangent) else tangent * len(lhs)
+
+    @staticmethod
+    def forward(lhs: float, rhs: Optional[float]):
+        return lhs
+
+    @staticmethod
+    def backward(lhs: float, rhs: Optional[float]):
+        return 1
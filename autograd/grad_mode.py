@@ -0,0 +1,38 @@
+import threading
+
+from contextlib import contextmanager
+
+from typing import Iterator
+
+
+class _GradMode(threading.local):
+    # Read by BaseOperation.apply and BaseFunction.apply; when False they
+    # return results without recording how they were computed. Every
+    # thread starts with the class default.
+    enabled = True
+
+
+_state = _GradMode()
+
+
+def is_grad_enabled() -> bool:
+    return _state.enabled
+
+
+@contextmanager
+def no_grad() -> Iterator[None]:
+    """
+    Disable graph construction inside the ``with`` block, or inside a
+    function decorated with ``@no_grad()``.
+
+    Operations on Values and AutogradMatrices then only compute their
+    result: the outputs have ``requires_grad`` set to False, record no
+    parents and, for matrices, hold no gradient buffer. The setting only
+    applies to the thread that enters the block.
+    """
+    previous = _state.enabled
+    _state.enabled = False
+    try:
+        yield
+    finally:
+        _state.enabled = previous
@@ -0,0 +1,41 @@
+from operator import attrgetter
+
+from typing import (
+    Callable,
+    Iterable,
+    List,
+)
+
+
+def topological_order(root, parents: Callable[[object], Iterable]) -> List:
+    """
+    Order the nodes of a computation graph so that every node comes after
+    all of its parents.
+
+    Uses an explicit stack instead of recursion, so the depth of the graph
+    is not limited by the interpreter's recursion limit.
+
+    :param root: Node the traversal starts from
+    :param parents: Function returning the parents of a node
+    :return: Nodes reachable from ``root``, with ``root`` last
+    """
+    order = []
+    visited = {root}
+    stack = [(root, iter(parents(root)))]
+
+    while stack:
+        node, remaining = stack[-1]
+        for parent in remaining:
+            if parent not in visited:
+                visited.add(parent)
+                stack.append((parent, iter(parents(parent))))
+                break
+        else:
+            stack.pop()
+            order.append(node)
+
+    return order
+
+
+value_parents = attrgetter('_prev')
+matrix_parents = attrgetter('_previous_nodes')
@@ -1,5 +1,45 @@
-from .matrix import Matrix
+from .backends import (
+    Backend,
+    NumpyBackend,
+    PythonBackend,
+    available_backends,
+    get_backend,
+    register_backend,
+    set_backend,
+    use_backend,
+)
+from .lazy_matrix import LazyMatrix, lazy
+from .matrix import Matrix, MatrixRow
+from .parallel import (
+    disable_parallel_matmul,
+    enable_parallel_matmul,
+    use_parallel_matmul,
+)
+from .serialization import (
+    load_matrix,
+    load_parameters,
+    save_matrix,
+    save_parameters,
+)
 
 __all__ = [
+    'Backend',
+    'LazyMatrix',
     'Matrix',
+    'MatrixRow',
+    'NumpyBackend',
+    'PythonBackend',
+    'available_backends',
+    'disable_parallel_matmul',
+    'enable_parallel_matmul',
+    'get_backend',
+    'lazy',
+    'load_matrix',
+    'load_parameters',
+    'register_backend',
+    'save_matrix',
+    'save_parameters',
+    'set_backend',
+    'use_backend',
+    'use_parallel_matmul',
 ]
@@ -1,5 +1,11 @@
 import abc
 
+from array import array
+
+from autograd import grad_mode
+
+from .backends import get_backend
+from .functions import buffer_typecode
 from .matrix import Matrix
 
 
@@ -27,7 +33,87 @@ def exp(x):
     return Exp.apply(x)
 
 
+def sigmoid(x):
+    return Sigmoid.apply(x)
+
+
+def tanh(x):
+    return Tanh.apply(x)
+
+
+def relu(x):
+    return Relu.apply(x)
+
+
+def softmax(x):
+    return Softmax.apply(x)
+
+
+def affine(x, a, b):
+    return Affine.apply(x, (a, b))
+
+
+def mse_loss(x, target):
+    return MeanSquaredError.apply(x, target)
+
+
+def cross_entropy(logits, target):
+    return CrossEntropy.apply(logits, target)
+
+
+def _expand(grad, shape):
+    """
+    Broadcast the gradient of a reduction back to the input's shape.
+    """
+    if grad.shape == shape:
+        return grad
+    return Matrix.zeros(*shape, dtype=grad.dtype) + grad
+
+
+def _is_node(x):
+    from autograd import AutogradMatrix
+
+    return isinstance(x, AutogradMatrix)
+
+
+def _plain(x):
+    return Matrix._from_trusted(x.buffer, x.shape)
+
+
+def _scalar(value, x):
+    """
+    :return: 1x1 matrix holding ``value``, with the element type of ``x``
+    """
+    return Matrix._from_trusted(array(buffer_typecode(x.buffer), [value]), (1, 1))
+
+
+def _unbroadcast(grad, shape):
+    """
+    Sum a gradient over the axes along which an operand of ``shape`` was
+    broadcast, giving it the operand's shape back.
+    """
+    rows, cols = grad.shape
+    buffer = grad.buffer
+    if shape[0] == 1 and rows != 1:
+        buffer = get_backend().sum_axis(buffer, rows, cols, 0)
+        rows = 1
+    if shape[1] == 1 and cols != 1:
+        buffer = get_backend().sum_axis(buffer, rows, cols, 1)
+        cols = 1
+    if buffer is grad.buffer:
+        return grad
+    return Matrix._from_trusted(buffer, (rows, cols))
+
+
 class BaseFunction(abc.ABC):
+    """
+    A differentiable function of an AutogradMatrix and an optional second
+    operand: another AutogradMatrix, or a constant (a number, a plain
+    Matrix, None or any other value the function accepts).
+
+    ``forward`` and ``backward`` work on plain Matrix views of the operands'
+    buffers, so they never record graph nodes or copy data.
+    """
 
     commutative: bool
 
@@ -38,20 +124,44 @@ class BaseFunction(abc.ABC):
         if not isinstance(x, AutogradMatrix):
             raise TypeError('Left hand side must be an AutogradMatrix instance.')
 
-        if y is None or isinstance(y, int) or isinstance(y, float):
-            res = cls.forward(x.data, y)
-            output = AutogradMatrix(res.data)
-            x._calculate_grad = lambda: cls.backward(x.data, y, output.grad)
-            output.add_prev(x)
-            return output
-
-        res = cls.forward(x.data, y.data)
-        output = AutogradMatrix(res.data)
-        x._calculate_grad = lambda: cls.backward(x.data, y.data, output.grad)
-        y._calculate_grad = lambda: cls.backward(y.data, x.data, output.grad)
-        output.add_prev(x, y)
+        if isinstance(y, AutogradMatrix) and not y.requires_grad:
+            # No gradient flows to y, so it is passed on as a constant.
+            y = _plain(y)
+
+        if isinstance(y, AutogradMatrix):
+            res = cls.forward(_plain(x), _plain(y))
+            parents = (x, y) if x.requires_grad else (y,)
+        else:
+            res = cls.forward(_plain(x), y)
+            parents = (x,) if x.requires_grad else ()
+
+        if not parents or not grad_mode._state.enabled:
+            return AutogradMatrix._from_trusted(res.buffer, res.shape, requires_grad=False)
+
+        output = AutogradMatrix._from_trusted(res.buffer, res.shape)
+        output.add_prev(*parents)
+        output._function = cls
+        output._inputs = (x, y)
         return output
 
+    @classmethod
+    def vjp(cls, x, y, output_grad, output):
+        """
+        Vector-Jacobian products of the function with respect to its inputs.
+
+        :param x: Left hand side input
+        :param y: Right hand side input, an AutogradMatrix or a constant
+        :param output_grad: Gradient of the function's output
+        :param output: The function's output
+        :return: Gradients of ``x`` and ``y``; the latter is None unless
+            ``y`` is an AutogradMatrix
+        """
+        if _is_node(y):
+            x, y = _plain(x), _plain(y)
+            x_grad = _unbroadcast(cls.backward(x, y, output_grad), x.shape)
+            return x_grad, _unbroadcast(cls.backward(y, x, output_grad), y.shape)
+        return _unbroadcast(cls.backward(_plain(x), y, output_grad), x.shape), None
+
     @staticmethod
     def forward(x, y=None):
         pass
@@ -67,13 +177,11 @@ class Addition(BaseFunction):
 
     @staticmethod
     def forward(x, y=None):
-        if isinstance(y, int) or isinstance(y, float):
-            return Matrix(x) + (Matrix.ones(*Matrix(x).shape) * y)
-        return Matrix(x) + Matrix(y)
+        return x + y
 
     @staticmethod
     def backward(x, y, output_grad):
-        return output_grad * Matrix.ones(len(x), len(x[0]))
+        return output_grad
 
 
 class Multiplication(BaseFunction):
@@ -82,84 +190,285 @@ class Multiplication(BaseFunction):
 
     @staticmethod
     def forward(x, y):
-        if isinstance(y, int) or isinstance(y, float):
-            return Matrix(x) * (Matrix.ones(*Matrix(x).shape) * y)
-        return Matrix(x) * Matrix(y)
+        return x * y
 
     @staticmethod
     def backward(x, y, output_grad):
-        return Matrix(y) * output_grad
+        return output_grad * y
 
 
 class MatrixMultiply(BaseFunction):
 
     commutative = False
 
-    @classmethod
-    def apply(cls, x, y):
-        from autograd import AutogradMatrix
-
-        if not isinstance(x, AutogradMatrix) and not isinstance(y, AutogradMatrix):
+    @staticmethod
+    def forward(x, y):
+        if y is None or isinstance(y, int) or isinstance(y, float):
             raise TypeError('Both left and right hand sides must be an AutogradMatrix instance.')
+        return x @ y
 
-        res = Matrix(x.data) @ Matrix(y.data)
-        output = AutogradMatrix(res.data)
-        x._calculate_grad = lambda: output.grad @ y.T
-        y._calculate_grad = lambda: x.T @ output.grad
-        output.add_prev(x, y)
-        return output
+    @classmethod
+    def vjp(cls, x, y, output_grad, output):
+        x_grad = output_grad @ _plain(y).T if x.requires_grad else None
+        if not _is_node(y):
+            return x_grad, None
+        return x_grad, _plain(x).T @ output_grad
 
 
 class Power(BaseFunction):
 
     commutative = False
 
-    @classmethod
-    def apply(cls, x, y):
-        from autograd import AutogradMatrix
-
-        if not isinstance(x, AutogradMatrix):
-            raise TypeError('Left hand side must be an AutogradMatrix instance.')
-
+    @staticmethod
+    def forward(x, y):
         if not isinstance(y, int) and not isinstance(y, float):
             raise TypeError('Right hand side must be an int or float.')
+        return x ** y
 
-        res = Matrix(x.data) ** y
-        output = AutogradMatrix(res.data)
-        x._calculate_grad = lambda: (y * (x ** (y - 1))) * output.grad
-        output.add_prev(x)
-        return output
+    @classmethod
+    def vjp(cls, x, y, output_grad, output):
+        return (y * (_plain(x) ** (y - 1))) * output_grad, None
 
 
 class Division(BaseFunction):
 
     commutative = False
 
+    @staticmethod
+    def forward(x, y):
+        if not isinstance(y, int) and not isinstance(y, float) and not isinstance(y, Matrix):
+            raise TypeError('Right hand side must be an int, a float or a matrix.')
+        return x / y
+
     @classmethod
-    def apply(cls, x, y):
-        from autograd import AutogradMatrix
+    def vjp(cls, x, y, output_grad, output):
+        if isinstance(y, int) or isinstance(y, float):
+            return (1/y) * output_grad, None
+        grad = output_grad / _plain(y)
+        if not _is_node(y):
+            return _unbroadcast(grad, x.shape), None
+        return _unbroadcast(grad, x.shape), _unbroadcast(grad * _plain(output) * -1, y.shape)
 
-        if not isinstance(x, AutogradMatrix):
-            raise TypeError('Left hand side must be an AutogradMatrix instance.')
 
-        if not isinstance(y, int) and not isinstance(y, float):
-            raise TypeError('Right hand side must be an int or float.')
+class Exp(BaseFunction):
 
-        res = Matrix(x.data) / y
-        output = AutogradMatrix(res.data)
-        x._calculate_grad = lambda: (1/y) * output.grad
-        output.add_prev(x)
-        return output
+    commutative = False
+
+    @staticmethod
+    def forward(x, y=None):
+        return x.exp()
 
+    @staticmethod
+    def backward(x, y, output_grad):
+        return output_grad * x.exp()
 
-class Exp(BaseFunction):
+
+class Sum(BaseFunction):
+    """
+    Sum over every element (a 1x1 result) or along an axis, given as ``y``.
+    """
 
     commutative = False
 
     @staticmethod
     def forward(x, y=None):
-        return Matrix(x).exp()
+        if y is None:
+            return _scalar(x.sum(), x)
+        return x.sum(y)
+
+    @classmethod
+    def vjp(cls, x, y, output_grad, output):
+        return _expand(output_grad, x.shape), None
+
+
+class Mean(BaseFunction):
+    """
+    Mean over every element (a 1x1 result) or along an axis, given as ``y``.
+    """
+
+    commutative = False
 
     @staticmethod
-    def backward(x, y, output_grad):
-        return output_grad * Matrix(x).exp()
+    def forward(x, y=None):
+        if y is None:
+            return _scalar(x.mean(), x)
+        return x.mean(y)
+
+    @classmethod
+    def vjp(cls, x, y, output_grad, output):
+        rows, cols = x.shape
+        count = rows * cols // (output.shape[0] * output.shape[1])
+        return _expand(output_grad * (1 / count), x.shape), None
+
+
+class Max(BaseFunction):
+    """
+    Maximum over every element (a 1x1 result) or along an axis, given as
+    ``y``. The gradient is split evenly between tied maxima.
+    """
+
+    commutative = False
+
+    @staticmethod
+    def forward(x, y=None):
+        if y is None:
+            return _scalar(x.max(), x)
+        return x.max(y)
+
+    @classmethod
+    def vjp(cls, x, y, output_grad, output):
+        rows, cols = x.shape
+        grad = get_backend().max_axis_backward(x.buffer, output.buffer, output_grad.buffer, rows, cols, y)
+        return Matrix._from_trusted(grad, x.shape), None
+
+
+class LogSumExp(BaseFunction):
+    """
+    ``log(sum(exp(x)))`` over every element (a 1x1 result) or along an
+    axis, given as ``y``.
+    """
+
+    commutative = False
+
+    @staticmethod
+    def forward(x, y=None):
+        if y is None:
+            return _scalar(x.logsumexp(), x)
+        return x.logsumexp(y)
+
+    @classmethod
+    def vjp(cls, x, y, output_grad, output):
+        return (_plain(x) - _plain(output)).exp() * output_grad, None
+
+
+class Sigmoid(BaseFunction):
+
+    commutative = False
+
+    @staticmethod
+    def forward(x, y=None):
+        return x.sigmoid()
+
+    @classmethod
+    def vjp(cls, x, y, output_grad, output):
+        return Matrix._from_trusted(get_backend().sigmoid_backward(output.buffer, output_grad.buffer), x.shape), None
+
+
+class Tanh(BaseFunction):
+
+    commutative = False
+
+    @staticmethod
+    def forward(x, y=None):
+        return x.tanh()
+
+    @classmethod
+    def vjp(cls, x, y, output_grad, output):
+        return Matrix._from_trusted(get_backend().tanh_backward(output.buffer, output_grad.buffer), x.shape), None
+
+
+class Relu(BaseFunction):
+
+    commutative = False
+
+    @staticmethod
+    def forward(x, y=None):
+        return x.relu()
+
+    @classmethod
+    def vjp(cls, x, y, output_grad, output):
+        return Matrix._from_trusted(get_backend().relu_backward(x.buffer, output_grad.buffer), x.shape), None
+
+
+class Softmax(BaseFunction):
+    """
+    Softmax over every row.
+    """
+
+    commutative = False
+
+    @staticmethod
+    def forward(x, y=None):
+        return x.softmax()
+
+    @classmethod
+    def vjp(cls, x, y, output_grad, output):
+        rows, cols = x.shape
+        grad = get_backend().softmax_backward(output.buffer, output_grad.buffer, rows, cols)
+        return Matrix._from_trusted(grad, x.shape), None
+
+
+class Affine(BaseFunction):
+    """
+    ``a * x + b`` for scalars ``a`` and ``b``, passed as ``y = (a, b)``.
+    """
+
+    commutative = False
+
+    @staticmethod
+    def forward(x, y):
+        a, b = y
+        return Matrix._from_trusted(get_backend().affine(x.buffer, a, b), x.shape)
+
+    @classmethod
+    def vjp(cls, x, y, output_grad, output):
+        return output_grad * y[0], None
+
+
+def _check_target(x, target):
+    if not isinstance(target, Matrix):
+        raise TypeError('Target must be a Matrix instance.')
+    if x.shape != target.shape:
+        raise ValueError('Input and target must have the same shape.')
+
+
+class MeanSquaredError(BaseFunction):
+    """
+    Mean of the squared differences between an input and a target, as a
+    1x1 matrix.
+    """
+
+    commutative = False
+
+    @staticmethod
+    def forward(x, y):
+        _check_target(x, y)
+        rows, cols = x.shape
+        loss = get_backend().squared_error(x.buffer, y.buffer) / (rows * cols)
+        return _scalar(loss, x)
+
+    @classmethod
+    def vjp(cls, x, y, output_grad, output):
+        rows, cols = x.shape
+        scale = 2 * output_grad[0, 0] / (rows * cols)
+        x_grad = Matrix._from_trusted(get_backend().squared_error_backward(x.buffer, y.buffer, scale), x.shape)
+        if not _is_node(y):
+            return x_grad, None
+        return x_grad, -x_grad
+
+
+class CrossEntropy(BaseFunction):
+    """
+    Softmax cross-entropy between row-wise logits and target distributions
+    (one-hot or probabilities), averaged over rows, as a 1x1 matrix.
+    """
+
+    commutative = False
+
+    @staticmethod
+    def forward(x, y):
+        _check_target(x, y)
+        rows, cols = x.shape
+        loss = get_backend().softmax_cross_entropy(x.buffer, y.buffer, rows, cols) / rows
+        return _scalar(loss, x)
+
+    @classmethod
+    def vjp(cls, x, y, output_grad, output):
+        rows, cols = x.shape
+        scale = output_grad[0, 0] / rows
+        grad = get_backend().softmax_cross_entropy_backward(x.buffer, y.buffer, rows, cols, scale)
+        x_grad = Matrix._from_trusted(grad, x.shape)
+        if not _is_node(y):
+            return x_grad, None
+        log_p = Matrix._from_trusted(get_backend().log_softmax(x.buffer, rows, cols), x.shape)
+        return x_grad, log_p * -scale
@@ -0,0 +1,507 @@
+import abc
+import threading
+
+from array import array
+from contextlib import contextmanager
+from functools import lru_cache
+
+from . import functions
+
+from typing import (
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class Backend(abc.ABC):
+    """
+    A set of matrix kernels working on flat row-major ``array`` buffers of
+    float64 ('d') or float32 ('f') elements.
+
+    Matrix dispatches every computation through the active backend, so a
+    backend only has to accept and return flat buffers.
+    """
+
+    name: str
+
+    @abc.abstractmethod
+    def add(self, x: array, y: array) -> array:
+        pass
+
+    @abc.abstractmethod
+    def subtract(self, x: array, y: array) -> array:
+        pass
+
+    @abc.abstractmethod
+    def elementwise_multiply(self, x: array, y: array) -> array:
+        pass
+
+    @abc.abstractmethod
+    def multiply(self, x: array, y: array, rows: int, inner: int, cols: int) -> array:
+        pass
+
+    @abc.abstractmethod
+    def divide(self, x: array, y: array) -> array:
+        pass
+
+    @abc.abstractmethod
+    def scalar_multiply(self, x: array, y: float) -> array:
+        pass
+
+    @abc.abstractmethod
+    def scalar_power(self, x: array, y: float) -> array:
+        pass
+
+    @abc.abstractmethod
+    def scalar_add(self, x: array, y: float) -> array:
+        pass
+
+    @abc.abstractmethod
+    def exp(self, x: array) -> array:
+        pass
+
+    @abc.abstractmethod
+    def transpose(self, x: array, rows: int, cols: int) -> array:
+        pass
+
+    @abc.abstractmethod
+    def sum_elements(self, x: array) -> float:
+        pass
+
+    @abc.abstractmethod
+    def sum_axis(self, x: array, rows: int, cols: int, axis: Optional[int]) -> array:
+        pass
+
+    @abc.abstractmethod
+    def max_axis(self, x: array, rows: int, cols: int, axis: Optional[int]) -> array:
+        pass
+
+    @abc.abstractmethod
+    def max_axis_backward(self, x: array, out: array, grad: array, rows: int, cols: int,
+                          axis: Optional[int]) -> array:
+        pass
+
+    @abc.abstractmethod
+    def logsumexp_axis(self, x: array, rows: int, cols: int, axis: Optional[int]) -> array:
+        pass
+
+    @abc.abstractmethod
+    def broadcast_binary(self, op: str, x: array, x_shape: Tuple[int, int], y: array,
+                         y_shape: Tuple[int, int]) -> array:
+        pass
+
+    @abc.abstractmethod
+    def sigmoid(self, x: array) -> array:
+        pass
+
+    @abc.abstractmethod
+    def sigmoid_backward(self, out: array, grad: array) -> array:
+        pass
+
+    @abc.abstractmethod
+    def tanh(self, x: array) -> array:
+        pass
+
+    @abc.abstractmethod
+    def tanh_backward(self, out: array, grad: array) -> array:
+        pass
+
+    @abc.abstractmethod
+    def relu(self, x: array) -> array:
+        pass
+
+    @abc.abstractmethod
+    def relu_backward(self, x: array, grad: array) -> array:
+        pass
+
+    @abc.abstractmethod
+    def affine(self, x: array, a: float, b: float) -> array:
+        pass
+
+    @abc.abstractmethod
+    def softmax(self, x: array, rows: int, cols: int) -> array:
+        pass
+
+    @abc.abstractmethod
+    def softmax_backward(self, out: array, grad: array, rows: int, cols: int) -> array:
+        pass
+
+    @abc.abstractmethod
+    def log_softmax(self, x: array, rows: int, cols: int) -> array:
+        pass
+
+    @abc.abstractmethod
+    def squared_error(self, x: array, y: array) -> float:
+        pass
+
+    @abc.abstractmethod
+    def squared_error_backward(self, x: array, y: array, scale: float) -> array:
+        pass
+
+    @abc.abstractmethod
+    def softmax_cross_entropy(self, x: array, y: array, rows: int, cols: int) -> float:
+        pass
+
+    @abc.abstractmethod
+    def softmax_cross_entropy_backward(self, x: array, y: array, rows: int, cols: int, scale: float) -> array:
+        pass
+
+    @abc.abstractmethod
+    def fused_elementwise(self, expression: str, buffers: Sequence[array], constants: Sequence[float]) -> array:
+        pass
+
+    @abc.abstractmethod
+    def add_inplace(self, x: array, y: array):
+        pass
+
+    @abc.abstractmethod
+    def subtract_inplace(self, x: array, y: array):
+        pass
+
+    @abc.abstractmethod
+    def elementwise_multiply_inplace(self, x: array, y: array):
+        pass
+
+    @abc.abstractmethod
+    def scalar_add_inplace(self, x: array, y: float):
+        pass
+
+    @abc.abstractmethod
+    def scalar_multiply_inplace(self, x: array, y: float):
+        pass
+
+    @abc.abstractmethod
+    def fill_inplace(self, x: array, y: float):
+        pass
+
+    @abc.abstractmethod
+    def matrix_of_zeros(self, rows: int, cols: int, typecode: str = 'd') -> array:
+        pass
+
+    @abc.abstractmethod
+    def matrix_of_ones(self, rows: int, cols: int, typecode: str = 'd') -> array:
+        pass
+
+    @abc.abstractmethod
+    def identity_matrix(self, size: int, typecode: str = 'd') -> array:
+        pass
+
+
+class PythonBackend(Backend):
+    """
+    Reference backend built on the pure-Python kernels in ``functions``.
+    """
+
+    name = 'python'
+
+    add = staticmethod(functions.add)
+    subtract = staticmethod(functions.subtract)
+    elementwise_multiply = staticmethod(functions.elementwise_multiply)
+    multiply = staticmethod(functions.multiply)
+    divide = staticmethod(functions.divide)
+    scalar_multiply = staticmethod(functions.scalar_multiply)
+    scalar_power = staticmethod(functions.scalar_power)
+    scalar_add = staticmethod(functions.scalar_add)
+    exp = staticmethod(functions.exp)
+    transpose = staticmethod(functions.transpose)
+    sum_elements = staticmethod(functions.sum_elements)
+    sum_axis = staticmethod(functions.sum_axis)
+    max_axis = staticmethod(functions.max_axis)
+    max_axis_backward = staticmethod(functions.max_axis_backward)
+    logsumexp_axis = staticmethod(functions.logsumexp_axis)
+    broadcast_binary = staticmethod(functions.broadcast_binary)
+    sigmoid = staticmethod(functions.sigmoid)
+    sigmoid_backward = staticmethod(functions.sigmoid_backward)
+    tanh = staticmethod(functions.tanh)
+    tanh_backward = staticmethod(functions.tanh_backward)
+    relu = staticmethod(functions.relu)
+    relu_backward = staticmethod(functions.relu_backward)
+    affine = staticmethod(functions.affine)
+    softmax = staticmethod(functions.softmax)
+    softmax_backward = staticmethod(functions.softmax_backward)
+    log_softmax = staticmethod(functions.log_softmax)
+    squared_error = staticmethod(functions.squared_error)
+    squared_error_backward = staticmethod(functions.squared_error_backward)
+    softmax_cross_entropy = staticmethod(functions.softmax_cross_entropy)
+    softmax_cross_entropy_backward = staticmethod(functions.softmax_cross_entropy_backward)
+    fused_elementwise = staticmethod(functions.fused_elementwise)
+    add_inplace = staticmethod(functions.add_inplace)
+    subtract_inplace = staticmethod(functions.subtract_inplace)
+    elementwise_multiply_inplace = staticmethod(functions.elementwise_multiply_inplace)
+    scalar_add_inplace = staticmethod(functions.scalar_add_inplace)
+    scalar_multiply_inplace = staticmethod(functions.scalar_multiply_inplace)
+    fill_inplace = staticmethod(functions.fill_inplace)
+    matrix_of_zeros = staticmethod(functions.matrix_of_zeros)
+    matrix_of_ones = staticmethod(functions.matrix_of_ones)
+    identity_matrix = staticmethod(functions.identity_matrix)
+
+
+def _as_ndarray(x: array):
+    return numpy.frombuffer(x, dtype=numpy.float32 if functions.buffer_typecode(x) == 'f' else numpy.float64)
+
+
+def _to_buffer(x) -> array:
+    if getattr(x, 'dtype', None) == numpy.float32:
+        out = array('f')
+    else:
+        out = array('d')
+        x = numpy.asarray(x, dtype=numpy.float64)
+    out.frombytes(numpy.ascontiguousarray(x).tobytes())
+    return out
+
+
+def _log_softmax(x):
+    shifted = x - x.max(axis=1, keepdims=True)
+    return shifted - numpy.log(numpy.exp(shifted).sum(axis=1, keepdims=True))
+
+
+def _sigmoid(x):
+    return 0.5 * (1 + numpy.tanh(0.5 * x))
+
+
+@lru_cache(maxsize=256)
+def _compile_fused(expression: str, buffers: int, constants: int) -> Callable:
+    namespace = {
+        'exp': numpy.exp,
+        'tanh': numpy.tanh,
+        'sigmoid': _sigmoid,
+        'relu': lambda x: numpy.maximum(x, 0.0),
+    }
+    arguments = [f'x{i}' for i in range(buffers)] + [f'c{i}' for i in range(constants)]
+    return eval(f"lambda {', '.join(arguments)}: {expression}", namespace)
+
+
+class NumpyBackend(Backend):
+    """
+    Vectorized backend; views the matrix buffers as NumPy arrays without copying.
+    """
+
+    name = 'numpy'
+
+    def __init__(self):
+        if numpy is None:
+            raise ImportError('The numpy backend requires NumPy to be installed.')
+
+    def add(self, x: array, y: array) -> array:
+        return _to_buffer(_as_ndarray(x) + _as_ndarray(y))
+
+    def subtract(self, x: array, y: array) -> array:
+        return _to_buffer(_as_ndarray(x) - _as_ndarray(y))
+
+    def elementwise_multiply(self, x: array, y: array) -> array:
+        return _to_buffer(_as_ndarray(x) * _as_ndarray(y))
+
+    def multiply(self, x: array, y: array, rows: int, inner: int, cols: int) -> array:
+        return _to_buffer(_as_ndarray(x).reshape(rows, inner) @ _as_ndarray(y).reshape(inner, cols))
+
+    def divide(self, x: array, y: array) -> array:
+        return _to_buffer(_as_ndarray(x) / _as_ndarray(y))
+
+    def scalar_multiply(self, x: array, y: float) -> array:
+        return _to_buffer(_as_ndarray(x) * y)
+
+    def scalar_power(self, x: array, y: float) -> array:
+        return _to_buffer(_as_ndarray(x) ** y)
+
+    def scalar_add(self, x: array, y: float) -> array:
+        return _to_buffer(_as_ndarray(x) + y)
+
+    def exp(self, x: array) -> array:
+        return _to_buffer(numpy.exp(_as_ndarray(x)))
+
+    def transpose(self, x: array, rows: int, cols: int) -> array:
+        return _to_buffer(_as_ndarray(x).reshape(rows, cols).T)
+
+    def sum_elements(self, x: array) -> float:
+        return float(_as_ndarray(x).sum())
+
+    def sum_axis(self, x: array, rows: int, cols: int, axis: Optional[int]) -> array:
+        return _to_buffer(_as_ndarray(x).reshape(rows, cols).sum(axis=axis))
+
+    def max_axis(self, x: array, rows: int, cols: int, axis: Optional[int]) -> array:
+        return _to_buffer(_as_ndarray(x).reshape(rows, cols).max(axis=axis))
+
+    def max_axis_backward(self, x: array, out: array, grad: array, rows: int, cols: int,
+                          axis: Optional[int]) -> array:
+        keepdims = (1, 1) if axis is None else ((1, cols) if axis == 0 else (rows, 1))
+        ties = _as_ndarray(x).reshape(rows, cols) == _as_ndarray(out).reshape(keepdims)
+        counts = ties.sum(axis=axis, keepdims=True)
+        return _to_buffer(ties * (_as_ndarray(grad).reshape(keepdims) / counts))
+
+    def logsumexp_axis(self, x: array, rows: int, cols: int, axis: Optional[int]) -> array:
+        x = _as_ndarray(x).reshape(rows, cols)
+        m = x.max(axis=axis, keepdims=True)
+        m = numpy.where(numpy.isfinite(m), m, 0.0)
+        return _to_buffer(m + numpy.log(numpy.exp(x - m).sum(axis=axis, keepdims=True)))
+
+    def broadcast_binary(self, op: str, x: array, x_shape: Tuple[int, int], y: array,
+                         y_shape: Tuple[int, int]) -> array:
+        return _to_buffer(getattr(numpy, op)(_as_ndarray(x).reshape(x_shape), _as_ndarray(y).reshape(y_shape)))
+
+    def sigmoid(self, x: array) -> array:
+        return _to_buffer(_sigmoid(_as_ndarray(x)))
+
+    def sigmoid_backward(self, out: array, grad: array) -> array:
+        s = _as_ndarray(out)
+        return _to_buffer(_as_ndarray(grad) * s * (1 - s))
+
+    def tanh(self, x: array) -> array:
+        return _to_buffer(numpy.tanh(_as_ndarray(x)))
+
+    def tanh_backward(self, out: array, grad: array) -> array:
+        t = _as_ndarray(out)
+        return _to_buffer(_as_ndarray(grad) * (1 - t * t))
+
+    def relu(self, x: array) -> array:
+        return _to_buffer(numpy.maximum(_as_ndarray(x), 0.0))
+
+    def relu_backward(self, x: array, grad: array) -> array:
+        return _to_buffer(numpy.where(_as_ndarray(x) > 0, _as_ndarray(grad), 0.0))
+
+    def affine(self, x: array, a: float, b: float) -> array:
+        return _to_buffer(a * _as_ndarray(x) + b)
+
+    def softmax(self, x: array, rows: int, cols: int) -> array:
+        return _to_buffer(numpy.exp(_log_softmax(_as_ndarray(x).reshape(rows, cols))))
+
+    def softmax_backward(self, out: array, grad: array, rows: int, cols: int) -> array:
+        p, g = _as_ndarray(out).reshape(rows, cols), _as_ndarray(grad).reshape(rows, cols)
+        return _to_buffer(p * (g - (p * g).sum(axis=1, keepdims=True)))
+
+    def log_softmax(self, x: array, rows: int, cols: int) -> array:
+        return _to_buffer(_log_softmax(_as_ndarray(x).reshape(rows, cols)))
+
+    def squared_error(self, x: array, y: array) -> float:
+        d = _as_ndarray(x) - _as_ndarray(y)
+        return float(d @ d)
+
+    def squared_error_backward(self, x: array, y: array, scale: float) -> array:
+        return _to_buffer((_as_ndarray(x) - _as_ndarray(y)) * scale)
+
+    def softmax_cross_entropy(self, x: array, y: array, rows: int, cols: int) -> float:
+        log_p = _log_softmax(_as_ndarray(x).reshape(rows, cols))
+        return float(-(_as_ndarray(y).reshape(rows, cols) * log_p).sum())
+
+    def softmax_cross_entropy_backward(self, x: array, y: array, rows: int, cols: int, scale: float) -> array:
+        p = numpy.exp(_log_softmax(_as_ndarray(x).reshape(rows, cols)))
+        t = _as_ndarray(y).reshape(rows, cols)
+        return _to_buffer((p * t.sum(axis=1, keepdims=True) - t) * scale)
+
+    def fused_elementwise(self, expression: str, buffers: Sequence[array], constants: Sequence[float]) -> array:
+        kernel = _compile_fused(expression, len(buffers), len(constants))
+        return _to_buffer(kernel(*map(_as_ndarray, buffers), *constants))
+
+    def add_inplace(self, x: array, y: array):
+        numpy.add(_as_ndarray(x), _as_ndarray(y), out=_as_ndarray(x))
+
+    def subtract_inplace(self, x: array, y: array):
+        numpy.subtract(_as_ndarray(x), _as_ndarray(y), out=_as_ndarray(x))
+
+    def elementwise_multiply_inplace(self, x: array, y: array):
+        numpy.multiply(_as_ndarray(x), _as_ndarray(y), out=_as_ndarray(x))
+
+    def scalar_add_inplace(self, x: array, y: float):
+        numpy.add(_as_ndarray(x), y, out=_as_ndarray(x))
+
+    def scalar_multiply_inplace(self, x: array, y: float):
+        numpy.multiply(_as_ndarray(x), y, out=_as_ndarray(x))
+
+    def fill_inplace(self, x: array, y: float):
+        _as_ndarray(x).fill(y)
+
+    def matrix_of_zeros(self, rows: int, cols: int, typecode: str = 'd') -> array:
+        return functions.matrix_of_zeros(rows, cols, typecode)
+
+    def matrix_of_ones(self, rows: int, cols: int, typecode: str = 'd') -> array:
+        return functions.matrix_of_ones(rows, cols, typecode)
+
+    def identity_matrix(self, size: int, typecode: str = 'd') -> array:
+        return functions.identity_matrix(size, typecode)
+
+
+_backends: Dict[str, Backend] = {}
+# Backend of every thread that is not inside use_backend.
+_default_backend: Backend
+
+
+class _ThreadBackend(threading.local):
+    # Backend selected by use_backend in the current thread, if any.
+    backend: Optional[Backend] = None
+
+
+_thread = _ThreadBackend()
+
+
+def register_backend(backend: Backend):
+    """
+    Make a backend selectable by its name.
+
+    :param backend: Backend instance to register
+    """
+    if not isinstance(backend, Backend):
+        raise TypeError('Backend must be a Backend instance.')
+    _backends[backend.name] = backend
+
+
+def available_backends() -> List[str]:
+    return list(_backends)
+
+
+def get_backend() -> Backend:
+    """
+    Return the backend that Matrix operations in the calling thread
+    currently dispatch to.
+    """
+    return _thread.backend or _default_backend
+
+
+def _registered(name: str) -> Backend:
+    if name not in _backends:
+        raise ValueError(f'Unknown backend {name!r}, available: {available_backends()}.')
+    return _backends[name]
+
+
+def set_backend(name: str):
+    """
+    Select the backend used by all subsequent Matrix operations, in every
+    thread that is not inside ``use_backend``.
+
+    :param name: Name of a registered backend
+    """
+    global _default_backend
+
+    _default_backend = _registered(name)
+
+
+@contextmanager
+def use_backend(name: str) -> Iterator[Backend]:
+    """
+    Select a backend for the duration of a ``with`` block, in the calling
+    thread only.
+
+    :param name: Name of a registered backend
+    """
+    backend = _registered(name)
+    previous = _thread.backend
+    _thread.backend = backend
+    try:
+        yield backend
+    finally:
+        _thread.backend = previous
+
+
+register_backend(PythonBackend())
+if numpy is not None:
+    register_backend(NumpyBackend())
+
+set_backend('python')
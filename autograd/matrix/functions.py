@@ -1,143 +1,648 @@
 import math
+import operator
 
-from typing import List
+from array import array
+from functools import lru_cache
+from itertools import repeat
+from typing import (
+    Callable,
+    Iterable,
+    Optional,
+    Sequence,
+    Tuple,
+)
 
+MATMUL_BLOCK_ROWS = 64
 
-def add(x: List[List[float]], y: List[List[float]]) -> List[List[float]]:
+
+def buffer_typecode(x: array) -> str:
+    """
+    Element type of a matrix buffer: 'd' for float64, 'f' for float32.
+    """
+    return x.typecode if isinstance(x, array) else x.format
+
+
+def result_typecode(*buffers: array) -> str:
+    """
+    Element type of a result computed from matrix buffers: float32 only
+    when every operand is float32, float64 otherwise.
     """
-    Add two matrices (lists of lists) together.
+    for x in buffers:
+        if buffer_typecode(x) != 'f':
+            return 'd'
+    return 'f'
+
+
+def add(x: array, y: array) -> array:
+    """
+    Add two matrices (flat row-major buffers) together.
 
     :param x: First matrix
     :param y: Second matrix
     :return: Sum of matrices
     """
-    return [[x[i][j] + y[i][j] for j in range(len(x[0]))] for i in range(len(x))]
+    return array(result_typecode(x, y), map(operator.add, x, y))
 
 
-def subtract(x: List[List[float]], y: List[List[float]]) -> List[List[float]]:
+def subtract(x: array, y: array) -> array:
     """
-    Subtract one matrix (list of lists) from another.
+    Subtract one matrix (flat row-major buffer) from another.
 
     :param x: First matrix
     :param y: Second matrix
     :return: Difference of matrices
     """
-    return [[x[i][j] - y[i][j] for j in range(len(x[0]))] for i in range(len(x))]
+    return array(result_typecode(x, y), map(operator.sub, x, y))
 
 
-def elementwise_multiply(x: List[List[float]], y: List[List[float]]) -> List[List[float]]:
+def elementwise_multiply(x: array, y: array) -> array:
     """
-    Multiply two matrices (lists of lists) element-wise.
+    Multiply two matrices (flat row-major buffers) element-wise.
 
     :param x: First matrix
     :param y: Second matrix
     :return: Element-wise product of matrices
     """
-    return [[x[i][j] * y[i][j] for j in range(len(x[0]))] for i in range(len(x))]
+    return array(result_typecode(x, y), map(operator.mul, x, y))
 
 
-def multiply(x: List[List[float]], y: List[List[float]]) -> List[List[float]]:
+def multiply(x: array, y: array, rows: int, inner: int, cols: int) -> array:
     """
-    Multiply two matrices (lists of lists) together.
-
-    :param x: First matrix
-    :param y: Second matrix
-    :return: Product of matrices
+    Multiply two matrices (flat row-major buffers) together.
+
+    The right operand is transposed once so every output element is a dot
+    product of two contiguous arrays. Output rows are produced in blocks of
+    ``MATMUL_BLOCK_ROWS`` to bound the size of the temporary lists.
+
+    :param x: First matrix, of shape (rows, inner)
+    :param y: Second matrix, of shape (inner, cols)
+    :param rows: Number of rows of the first matrix
+    :param inner: Number of columns of the first matrix
+    :param cols: Number of columns of the second matrix
+    :return: Product of matrices, of shape (rows, cols)
     """
-    return [[sum(x[i][k] * y[k][j] for k in range(len(y))) for j in range(len(y[0]))] for i in range(len(x))]
+    mul = operator.mul
+    columns = [y[j::cols] for j in range(cols)]
+    out = array(result_typecode(x, y))
+    for start in range(0, rows, MATMUL_BLOCK_ROWS):
+        block = [x[i * inner:(i + 1) * inner] for i in range(start, min(start + MATMUL_BLOCK_ROWS, rows))]
+        out.extend([sum(map(mul, row, column)) for row in block for column in columns])
+    return out
 
 
-def divide(x: List[List[float]], y: List[List[float]]) -> List[List[float]]:
+def divide(x: array, y: array) -> array:
     """
-    Divide one matrix (list of lists) by another.
+    Divide one matrix (flat row-major buffer) by another.
 
     :param x: First matrix
     :param y: Second matrix
     :return: Quotient of matrices
     """
-    return [[x[i][j] / y[i][j] for j in range(len(x[0]))] for i in range(len(x))]
+    return array(result_typecode(x, y), map(operator.truediv, x, y))
 
 
-def scalar_multiply(x: List[List[float]], y: float) -> List[List[float]]:
+def scalar_multiply(x: array, y: float) -> array:
     """
-    Multiply a matrix (list of lists) by a scalar.
+    Multiply a matrix (flat row-major buffer) by a scalar.
 
     :param x: Matrix
     :param y: Scalar
     :return: Product of matrix and scalar
     """
-    return [[x[i][j] * y for j in range(len(x[0]))] for i in range(len(x))]
+    return array(buffer_typecode(x), [v * y for v in x])
 
 
-def scalar_power(x: List[List[float]], y: float) -> List[List[float]]:
+def scalar_power(x: array, y: float) -> array:
     """
-    Raise a matrix (list of lists) to a scalar power.
+    Raise a matrix (flat row-major buffer) to a scalar power.
 
     :param x: Matrix
     :param y: Scalar
     :return: Matrix raised to scalar power
     """
-    return [[x[i][j] ** y for j in range(len(x[0]))] for i in range(len(x))]
+    return array(buffer_typecode(x), [v ** y for v in x])
 
 
-def scalar_add(x: List[List[float]], y: float) -> List[List[float]]:
+def scalar_add(x: array, y: float) -> array:
     """
-    Add a scalar to a matrix (list of lists).
+    Add a scalar to a matrix (flat row-major buffer).
 
     :param x: Matrix
     :param y: Scalar
     :return: Sum of matrix and scalar
     """
-    return [[x[i][j] + y for j in range(len(x[0]))] for i in range(len(x))]
+    return array(buffer_typecode(x), [v + y for v in x])
 
 
-def exp(x: List[List[float]]) -> List[List[float]]:
+def exp(x: array) -> array:
     """
-    Compute the exponential of a matrix (list of lists).
+    Compute the exponential of a matrix (flat row-major buffer).
 
     :param x: Matrix
     :return: Exponential of matrix
     """
-    return [[math.exp(x[i][j]) for j in range(len(x[0]))] for i in range(len(x))]
+    return array(buffer_typecode(x), map(math.exp, x))
 
 
-def transpose(x: List[List[float]]) -> List[List[float]]:
+def transpose(x: array, rows: int, cols: int) -> array:
     """
-    Transpose a matrix (list of lists).
+    Transpose a matrix (flat row-major buffer).
 
-    :param x: Matrix to transpose
-    :return: Transpose of matrix
+    :param x: Matrix to transpose, of shape (rows, cols)
+    :param rows: Number of rows
+    :param cols: Number of columns
+    :return: Transpose of matrix, of shape (cols, rows)
     """
-    return [[x[j][i] for j in range(len(x))] for i in range(len(x[0]))]
+    out = array(buffer_typecode(x))
+    for j in range(cols):
+        out.extend(x[j::cols])
+    return out
 
 
-def matrix_of_zeros(rows: int, cols: int) -> List[List[float]]:
+def matrix_of_zeros(rows: int, cols: int, typecode: str = 'd') -> array:
     """
-    Create a matrix (list of lists) of zeros.
+    Create a matrix (flat row-major buffer) of zeros.
 
     :param rows: Number of rows
     :param cols: Number of columns
+    :param typecode: 'd' for float64 elements, 'f' for float32
     :return: Matrix of zeros
     """
-    return [[0 for _ in range(cols)] for _ in range(rows)]
+    return array(typecode, [0.0]) * (rows * cols)
 
 
-def matrix_of_ones(rows: int, cols: int) -> List[List[float]]:
+def matrix_of_ones(rows: int, cols: int, typecode: str = 'd') -> array:
     """
-    Create a matrix (list of lists) of ones.
+    Create a matrix (flat row-major buffer) of ones.
 
     :param rows: Number of rows
     :param cols: Number of columns
+    :param typecode: 'd' for float64 elements, 'f' for float32
     :return: Matrix of ones
     """
-    return [[1 for _ in range(cols)] for _ in range(rows)]
+    return array(typecode, [1.0]) * (rows * cols)
 
 
-def identity_matrix(size: int) -> List[List[float]]:
+def identity_matrix(size: int, typecode: str = 'd') -> array:
     """
-    Create an identity matrix (list of lists).
+    Create an identity matrix (flat row-major buffer).
 
     :param size: Number of rows and columns
+    :param typecode: 'd' for float64 elements, 'f' for float32
     :return: Identity matrix
     """
-    return [[1 if i == j else 0 for j in range(size)] for i in range(size)]
+    out = matrix_of_zeros(size, size, typecode)
+    out[::size + 1] = array(typecode, [1.0]) * size
+    return out
+
+
+def sum_elements(x: array) -> float:
+    """
+    Sum all the elements of a matrix (flat row-major buffer).
+
+    :param x: Matrix
+    :return: Sum of all elements
+    """
+    return sum(x)
+
+
+def _lanes(x: array, rows: int, cols: int, axis: Optional[int]) -> Iterable[array]:
+    if axis is None:
+        return [x]
+    if axis == 0:
+        return [x[j::cols] for j in range(cols)]
+    return [x[i:i + cols] for i in range(0, rows * cols, cols)]
+
+
+def sum_axis(x: array, rows: int, cols: int, axis: Optional[int]) -> array:
+    """
+    Sum a matrix (flat row-major buffer) along one axis.
+
+    :param x: Matrix, of shape (rows, cols)
+    :param rows: Number of rows
+    :param cols: Number of columns
+    :param axis: 0 to sum over rows, giving a (1, cols) matrix; 1 to sum
+        over columns, giving a (rows, 1) matrix; None to sum everything,
+        giving a (1, 1) matrix
+    :return: Sums along ``axis``
+    """
+    return array(buffer_typecode(x), map(sum, _lanes(x, rows, cols, axis)))
+
+
+def max_axis(x: array, rows: int, cols: int, axis: Optional[int]) -> array:
+    """
+    Maximum of a matrix (flat row-major buffer) along one axis.
+
+    :param x: Matrix, of shape (rows, cols)
+    :param rows: Number of rows
+    :param cols: Number of columns
+    :param axis: 0, 1 or None, as for ``sum_axis``
+    :return: Maxima along ``axis``
+    """
+    return array(buffer_typecode(x), map(max, _lanes(x, rows, cols, axis)))
+
+
+def max_axis_backward(x: array, out: array, grad: array, rows: int, cols: int, axis: Optional[int]) -> array:
+    """
+    Gradient of ``max_axis`` given its input, output and output gradient.
+
+    The output gradient goes to the elements equal to the maximum, split
+    evenly between them when there are ties.
+
+    :param x: Input matrix, of shape (rows, cols)
+    :param out: Maxima along ``axis``
+    :param grad: Gradient of the maxima
+    :param rows: Number of rows
+    :param cols: Number of columns
+    :param axis: 0, 1 or None, as for ``sum_axis``
+    :return: Gradient of the input
+    """
+    if axis is None:
+        lane_of = [0] * (rows * cols)
+    elif axis == 0:
+        lane_of = list(range(cols)) * rows
+    else:
+        lane_of = [i for i in range(rows) for _ in range(cols)]
+
+    ties = [0] * len(out)
+    for v, k in zip(x, lane_of):
+        if v == out[k]:
+            ties[k] += 1
+    return array(buffer_typecode(x), [grad[k] / ties[k] if v == out[k] else 0.0 for v, k in zip(x, lane_of)])
+
+
+def _logsumexp(values: Iterable[float]) -> float:
+    # Streaming log-sum-exp: the running sum is kept relative to the running
+    # maximum and rescaled whenever a larger element shows up.
+    m, s = -math.inf, 0.0
+    for v in values:
+        if v == -math.inf:
+            continue
+        if v <= m:
+            s += math.exp(v - m)
+        else:
+            s = s * math.exp(m - v) + 1.0
+            m = v
+    return m + math.log(s) if s else -math.inf
+
+
+def logsumexp_axis(x: array, rows: int, cols: int, axis: Optional[int]) -> array:
+    """
+    Compute log(sum(exp(x))) of a matrix (flat row-major buffer) along one
+    axis, in a single pass and without overflowing for large elements.
+
+    :param x: Matrix, of shape (rows, cols)
+    :param rows: Number of rows
+    :param cols: Number of columns
+    :param axis: 0, 1 or None, as for ``sum_axis``
+    :return: Log-sum-exp along ``axis``
+    """
+    return array(buffer_typecode(x), map(_logsumexp, _lanes(x, rows, cols, axis)))
+
+
+_BROADCAST_OPERATORS = {
+    'add': operator.add,
+    'subtract': operator.sub,
+    'multiply': operator.mul,
+    'divide': operator.truediv,
+}
+
+
+def broadcast_binary(op: str, x: array, x_shape: Tuple[int, int], y: array, y_shape: Tuple[int, int]) -> array:
+    """
+    Apply an element-wise operation to two matrices (flat row-major buffers)
+    whose shapes broadcast together.
+
+    An axis of size one is repeated along the other operand's axis while
+    iterating; the expanded operand is never built.
+
+    :param op: One of 'add', 'subtract', 'multiply' or 'divide'
+    :param x: Left hand side matrix, of shape x_shape
+    :param x_shape: (rows, cols) of x
+    :param y: Right hand side matrix, of shape y_shape
+    :param y_shape: (rows, cols) of y
+    :return: Result, of shape (max(rows), max(cols))
+    """
+    f = _BROADCAST_OPERATORS[op]
+    (x_rows, x_cols), (y_rows, y_cols) = x_shape, y_shape
+    rows, cols = max(x_rows, y_rows), max(x_cols, y_cols)
+    out = array(result_typecode(x, y))
+    for i in range(rows):
+        xi = i * x_cols if x_rows > 1 else 0
+        yi = i * y_cols if y_rows > 1 else 0
+        a = x[xi:xi + cols] if x_cols == cols else repeat(x[xi], cols)
+        b = y[yi:yi + cols] if y_cols == cols else repeat(y[yi], cols)
+        out.extend(map(f, a, b))
+    return out
+
+
+def add_inplace(x: array, y: array):
+    """
+    Add a matrix (flat row-major buffer) into another, in place.
+
+    :param x: Matrix updated in place
+    :param y: Matrix to add
+    """
+    for i in range(len(x)):
+        x[i] += y[i]
+
+
+def subtract_inplace(x: array, y: array):
+    """
+    Subtract a matrix (flat row-major buffer) from another, in place.
+
+    :param x: Matrix updated in place
+    :param y: Matrix to subtract
+    """
+    for i in range(len(x)):
+        x[i] -= y[i]
+
+
+def elementwise_multiply_inplace(x: array, y: array):
+    """
+    Multiply a matrix (flat row-major buffer) element-wise by another, in place.
+
+    :param x: Matrix updated in place
+    :param y: Matrix to multiply by
+    """
+    for i in range(len(x)):
+        x[i] *= y[i]
+
+
+def scalar_add_inplace(x: array, y: float):
+    """
+    Add a scalar to a matrix (flat row-major buffer), in place.
+
+    :param x: Matrix updated in place
+    :param y: Scalar
+    """
+    for i in range(len(x)):
+        x[i] += y
+
+
+def scalar_multiply_inplace(x: array, y: float):
+    """
+    Multiply a matrix (flat row-major buffer) by a scalar, in place.
+
+    :param x: Matrix updated in place
+    :param y: Scalar
+    """
+    for i in range(len(x)):
+        x[i] *= y
+
+
+def fill_inplace(x: array, y: float):
+    """
+    Set every element of a matrix (flat row-major buffer) to a scalar.
+
+    :param x: Matrix updated in place
+    :param y: Scalar
+    """
+    for i in range(len(x)):
+        x[i] = y
+
+
+def _sigmoid(v: float) -> float:
+    if v >= 0:
+        return 1 / (1 + math.exp(-v))
+    e = math.exp(v)
+    return e / (1 + e)
+
+
+def sigmoid(x: array) -> array:
+    """
+    Compute the logistic sigmoid of a matrix (flat row-major buffer).
+
+    :param x: Matrix
+    :return: Sigmoid of matrix
+    """
+    return array(buffer_typecode(x), map(_sigmoid, x))
+
+
+def sigmoid_backward(out: array, grad: array) -> array:
+    """
+    Gradient of the sigmoid given its output and the output gradient.
+
+    :param out: Sigmoid of the input
+    :param grad: Gradient of the output
+    :return: Gradient of the input
+    """
+    return array(buffer_typecode(out), [g * s * (1 - s) for s, g in zip(out, grad)])
+
+
+def tanh(x: array) -> array:
+    """
+    Compute the hyperbolic tangent of a matrix (flat row-major buffer).
+
+    :param x: Matrix
+    :return: Hyperbolic tangent of matrix
+    """
+    return array(buffer_typecode(x), map(math.tanh, x))
+
+
+def tanh_backward(out: array, grad: array) -> array:
+    """
+    Gradient of the hyperbolic tangent given its output and the output gradient.
+
+    :param out: Hyperbolic tangent of the input
+    :param grad: Gradient of the output
+    :return: Gradient of the input
+    """
+    return array(buffer_typecode(out), [g * (1 - t * t) for t, g in zip(out, grad)])
+
+
+def relu(x: array) -> array:
+    """
+    Compute the rectified linear unit of a matrix (flat row-major buffer).
+
+    :param x: Matrix
+    :return: Element-wise max(x, 0)
+    """
+    return array(buffer_typecode(x), [v if v > 0 else 0.0 for v in x])
+
+
+def relu_backward(x: array, grad: array) -> array:
+    """
+    Gradient of the rectified linear unit given its input and the output gradient.
+
+    :param x: Input of the relu
+    :param grad: Gradient of the output
+    :return: Gradient of the input
+    """
+    return array(buffer_typecode(x), [g if v > 0 else 0.0 for v, g in zip(x, grad)])
+
+
+def affine(x: array, a: float, b: float) -> array:
+    """
+    Compute a * x + b for a matrix (flat row-major buffer) and two scalars.
+
+    :param x: Matrix
+    :param a: Scale
+    :param b: Shift
+    :return: Scaled and shifted matrix
+    """
+    return array(buffer_typecode(x), [a * v + b for v in x])
+
+
+def softmax(x: array, rows: int, cols: int) -> array:
+    """
+    Compute the softmax of every row of a matrix (flat row-major buffer).
+
+    :param x: Matrix, of shape (rows, cols)
+    :param rows: Number of rows
+    :param cols: Number of columns
+    :return: Row-wise softmax of matrix
+    """
+    out = array(buffer_typecode(x))
+    for i in range(0, rows * cols, cols):
+        row = x[i:i + cols]
+        m = max(row)
+        e = [math.exp(v - m) for v in row]
+        s = sum(e)
+        out.extend([v / s for v in e])
+    return out
+
+
+def softmax_backward(out: array, grad: array, rows: int, cols: int) -> array:
+    """
+    Gradient of the row-wise softmax given its output and the output gradient.
+
+    :param out: Softmax of the input, of shape (rows, cols)
+    :param grad: Gradient of the output
+    :param rows: Number of rows
+    :param cols: Number of columns
+    :return: Gradient of the input
+    """
+    result = array(buffer_typecode(out))
+    for i in range(0, rows * cols, cols):
+        p, g = out[i:i + cols], grad[i:i + cols]
+        dot = sum(map(operator.mul, p, g))
+        result.extend([pi * (gi - dot) for pi, gi in zip(p, g)])
+    return result
+
+
+def log_softmax(x: array, rows: int, cols: int) -> array:
+    """
+    Compute the logarithm of the softmax of every row of a matrix (flat
+    row-major buffer).
+
+    :param x: Matrix, of shape (rows, cols)
+    :param rows: Number of rows
+    :param cols: Number of columns
+    :return: Row-wise log-softmax of matrix
+    """
+    out = array(buffer_typecode(x))
+    for i in range(0, rows * cols, cols):
+        row = x[i:i + cols]
+        m = max(row)
+        lse = m + math.log(sum([math.exp(v - m) for v in row]))
+        out.extend([v - lse for v in row])
+    return out
+
+
+def squared_error(x: array, y: array) -> float:
+    """
+    Sum of the squared differences of two matrices (flat row-major buffers).
+
+    :param x: First matrix
+    :param y: Second matrix
+    :return: Sum of (x - y) ** 2
+    """
+    return sum([(a - b) * (a - b) for a, b in zip(x, y)])
+
+
+def squared_error_backward(x: array, y: array, scale: float) -> array:
+    """
+    Gradient of a scaled squared error with respect to its first operand.
+
+    :param x: First matrix
+    :param y: Second matrix
+    :param scale: Factor applied to (x - y)
+    :return: scale * (x - y)
+    """
+    return array(buffer_typecode(x), [(a - b) * scale for a, b in zip(x, y)])
+
+
+def softmax_cross_entropy(x: array, y: array, rows: int, cols: int) -> float:
+    """
+    Cross-entropy between target distributions and the row-wise softmax of
+    logits, summed over rows.
+
+    :param x: Logits, of shape (rows, cols)
+    :param y: Targets (one-hot or probabilities), of shape (rows, cols)
+    :param rows: Number of rows
+    :param cols: Number of columns
+    :return: Sum over rows of -sum(y * log(softmax(x)))
+    """
+    loss = 0.0
+    for i in range(0, rows * cols, cols):
+        row = x[i:i + cols]
+        m = max(row)
+        lse = m + math.log(sum([math.exp(v - m) for v in row]))
+        loss += sum([t * (lse - v) for v, t in zip(row, y[i:i + cols])])
+    return loss
+
+
+def softmax_cross_entropy_backward(x: array, y: array, rows: int, cols: int, scale: float) -> array:
+    """
+    Gradient of a scaled softmax cross-entropy with respect to the logits.
+
+    :param x: Logits, of shape (rows, cols)
+    :param y: Targets, of shape (rows, cols)
+    :param rows: Number of rows
+    :param cols: Number of columns
+    :param scale: Factor applied to the gradient
+    :return: scale * (softmax(x) * sum(y) - y), row by row
+    """
+    out = array(buffer_typecode(x))
+    for i in range(0, rows * cols, cols):
+        row, target = x[i:i + cols], y[i:i + cols]
+        m = max(row)
+        e = [math.exp(v - m) for v in row]
+        total = sum(target) / sum(e)
+        out.extend([(v * total - t) * scale for v, t in zip(e, target)])
+    return out
+
+
+def _relu(v: float) -> float:
+    return v if v > 0 else 0.0
+
+
+_FUSED_NAMESPACE = {
+    'array': array,
+    'exp': math.exp,
+    'tanh': math.tanh,
+    'sigmoid': _sigmoid,
+    'relu': _relu,
+}
+
+
+@lru_cache(maxsize=256)
+def _compile_fused(expression: str, buffers: int, constants: int, typecode: str) -> Callable:
+    elements = ', '.join(f'x{i}' for i in range(buffers))
+    if buffers == 1:
+        loop = 'x0 in b0'
+    else:
+        loop = f'{elements} in zip({", ".join(f"b{i}" for i in range(buffers))})'
+    arguments = [f'b{i}' for i in range(buffers)] + [f'c{i}' for i in range(constants)]
+    source = f"lambda {', '.join(arguments)}: array('{typecode}', [{expression} for {loop}])"
+    return eval(source, _FUSED_NAMESPACE)
+
+
+def fused_elementwise(expression: str, buffers: Sequence[array], constants: Sequence[float]) -> array:
+    """
+    Evaluate an element-wise expression over matrices (flat row-major
+    buffers of the same size) in a single loop.
+
+    The expression refers to the current element of the i-th buffer as
+    ``xi`` and to the i-th constant as ``ci``, and may call ``exp``,
+    ``tanh``, ``sigmoid`` and ``relu``. The loop is compiled once per
+    distinct expression.
+
+    :param expression: Python expression computing one output element
+    :param buffers: Matrices read by the expression
+    :param constants: Scalars read by the expression
+    :return: Matrix holding the expression evaluated at every element
+    """
+    kernel = _compile_fused(expression, len(buffers), len(constants), result_typecode(*buffers))
+    return kernel(*buffers, *constants)
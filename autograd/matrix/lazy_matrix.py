@@ -0,0 +1,222 @@
+import operator
+
+from array import array
+
+from .backends import get_backend
+from .matrix import Matrix
+
+from typing import (
+    Dict,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+
+# Pending element-wise nodes deeper than this are evaluated before a new
+# node is stacked on top of them, which bounds the size of a fused loop.
+MAX_FUSED_DEPTH = 32
+
+_EAGER = {
+    'add': operator.add,
+    'sub': operator.sub,
+    'mul': operator.mul,
+    'div': operator.truediv,
+}
+
+_TEMPLATES = {
+    'add': '({} + {})',
+    'sub': '({} - {})',
+    'mul': '({} * {})',
+    'div': '({} / {})',
+    'pow': '({} ** {})',
+    'neg': '(-{})',
+    'exp': 'exp({})',
+    'tanh': 'tanh({})',
+    'sigmoid': 'sigmoid({})',
+    'relu': 'relu({})',
+}
+
+
+def lazy(matrix: Matrix) -> 'LazyMatrix':
+    """
+    Start a lazy expression from a matrix.
+
+    The returned LazyMatrix shares the buffer of ``matrix``; pending
+    expressions read it when they are evaluated, not when they are built.
+
+    :param matrix: Matrix to wrap
+    :return: LazyMatrix holding the elements of ``matrix``
+    """
+    if isinstance(matrix, LazyMatrix):
+        return matrix
+    return LazyMatrix._from_trusted(matrix.buffer, matrix.shape)
+
+
+class LazyMatrix(Matrix):
+    """
+    A matrix whose element-wise arithmetic is evaluated on demand.
+
+    ``+``, ``-``, ``*``, ``/``, scalar ``**``, ``exp``, ``tanh``,
+    ``sigmoid`` and ``relu`` record an expression node instead of computing
+    a new buffer. The first access that needs the elements (``data``,
+    ``sum``, indexing, matrix multiplication, ...) evaluates every pending
+    node below it in a single fused loop and keeps the result; no
+    intermediate matrices are created. Nodes used more than once in an
+    expression are computed once per element.
+    """
+
+    def _setup(self, buffer: Optional[array], shape: Tuple[int, int]):
+        self._value = buffer
+        self._shape = shape
+        self._op = None
+        self._operands = ()
+        self._depth = 0
+
+    @classmethod
+    def _node(cls, op: str, operands: tuple, shape: Tuple[int, int]) -> 'LazyMatrix':
+        depth = max([operand._depth for operand in operands if isinstance(operand, LazyMatrix)])
+        if depth >= MAX_FUSED_DEPTH:
+            for operand in operands:
+                if isinstance(operand, LazyMatrix):
+                    operand.evaluate()
+            depth = 0
+
+        node = cls.__new__(cls)
+        node._setup(None, shape)
+        node._op = op
+        node._operands = operands
+        node._depth = depth + 1
+        return node
+
+    @property
+    def _buffer(self) -> array:
+        if self._op is not None:
+            self._value = _evaluate(self)
+            self._op = None
+            self._operands = ()
+            self._depth = 0
+        return self._value
+
+    @property
+    def dtype(self) -> str:
+        if self._op is None:
+            return super().dtype
+        dtypes = [operand.dtype for operand in self._operands if isinstance(operand, LazyMatrix)]
+        return 'float32' if all(dtype == 'float32' for dtype in dtypes) else 'float64'
+
+    @property
+    def evaluated(self) -> bool:
+        return self._op is None
+
+    def evaluate(self) -> 'LazyMatrix':
+        """
+        Compute the pending expression now.
+
+        :return: This matrix
+        """
+        self._buffer
+        return self
+
+    def _elementwise(self, op: str, other: Union[int, float, Matrix], reflected: bool = False) -> 'LazyMatrix':
+        if isinstance(other, float) or isinstance(other, int):
+            operand = other
+        elif self._shape != other.shape:
+            # Broadcasting steps are not fused; they are computed eagerly and
+            # the expression continues from their result.
+            x, y = Matrix._from_trusted(self._buffer, self._shape), Matrix._from_trusted(other.buffer, other.shape)
+            return lazy(_EAGER[op](y, x) if reflected else _EAGER[op](x, y))
+        else:
+            operand = lazy(other)
+        operands = (operand, self) if reflected else (self, operand)
+        return LazyMatrix._node(op, operands, self._shape)
+
+    def __add__(self, other: Union[int, float, Matrix]) -> 'LazyMatrix':
+        return self._elementwise('add', other)
+
+    def __radd__(self, other: Union[int, float, Matrix]) -> 'LazyMatrix':
+        return self._elementwise('add', other, reflected=True)
+
+    def __sub__(self, other: Union[int, float, Matrix]) -> 'LazyMatrix':
+        return self._elementwise('sub', other)
+
+    def __rsub__(self, other: Union[int, float, Matrix]) -> 'LazyMatrix':
+        return self._elementwise('sub', other, reflected=True)
+
+    def __mul__(self, other: Union[int, float, Matrix]) -> 'LazyMatrix':
+        return self._elementwise('mul', other)
+
+    def __rmul__(self, other: Union[int, float, Matrix]) -> 'LazyMatrix':
+        return self._elementwise('mul', other, reflected=True)
+
+    def __truediv__(self, other: Union[int, float, Matrix]) -> 'LazyMatrix':
+        return self._elementwise('div', other)
+
+    def __rtruediv__(self, other: Union[int, float, Matrix]) -> 'LazyMatrix':
+        return self._elementwise('div', other, reflected=True)
+
+    def __pow__(self, power: float) -> 'LazyMatrix':
+        return self._elementwise('pow', power)
+
+    def __neg__(self) -> 'LazyMatrix':
+        return LazyMatrix._node('neg', (self,), self._shape)
+
+    def exp(self) -> 'LazyMatrix':
+        return LazyMatrix._node('exp', (self,), self._shape)
+
+    def tanh(self) -> 'LazyMatrix':
+        return LazyMatrix._node('tanh', (self,), self._shape)
+
+    def sigmoid(self) -> 'LazyMatrix':
+        return LazyMatrix._node('sigmoid', (self,), self._shape)
+
+    def relu(self) -> 'LazyMatrix':
+        return LazyMatrix._node('relu', (self,), self._shape)
+
+
+def _count_uses(root: LazyMatrix) -> Dict[int, int]:
+    uses: Dict[int, int] = {}
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        for operand in node._operands:
+            if isinstance(operand, LazyMatrix) and operand._op is not None:
+                key = id(operand)
+                uses[key] = uses.get(key, 0) + 1
+                if uses[key] == 1:
+                    stack.append(operand)
+    return uses
+
+
+def _evaluate(root: LazyMatrix) -> array:
+    uses = _count_uses(root)
+    buffers: List[array] = []
+    buffer_names: Dict[int, str] = {}
+    constants: List[float] = []
+    temporaries: Dict[int, str] = {}
+
+    def emit(node: Union[int, float, LazyMatrix]) -> str:
+        if not isinstance(node, LazyMatrix):
+            constants.append(node)
+            return f'c{len(constants) - 1}'
+
+        if node._op is None:
+            buffer = node._value
+            name = buffer_names.get(id(buffer))
+            if name is None:
+                name = buffer_names[id(buffer)] = f'x{len(buffers)}'
+                buffers.append(buffer)
+            return name
+
+        key = id(node)
+        if key in temporaries:
+            return temporaries[key]
+
+        code = _TEMPLATES[node._op].format(*[emit(operand) for operand in node._operands])
+        if uses.get(key, 0) > 1:
+            name = temporaries[key] = f't{len(temporaries)}'
+            return f'({name} := {code})'
+        return code
+
+    expression = emit(root)
+    return get_backend().fused_elementwise(expression, buffers, constants)
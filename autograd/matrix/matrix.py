@@ -1,95 +1,231 @@
-from .functions import (
-    multiply,
-    transpose,
-    add,
-    elementwise_multiply,
-    matrix_of_zeros,
-    matrix_of_ones,
-    identity_matrix,
-    scalar_multiply,
-    scalar_power,
-    scalar_add,
-    exp,
-)
+from array import array
+from itertools import chain
+
+from .backends import get_backend
+from .functions import buffer_typecode
+from .parallel import parallel_multiply, should_parallelize
 
 from typing import (
+    Iterator,
     List,
+    Optional,
+    Sequence,
+    Tuple,
     Union,
 )
 
 
-def cast_list_items_to_float(x: List[List[Union[int, float]]]) -> List[List[float]]:
-    return [[float(x[i][j]) for j in range(len(x[0]))] for i in range(len(x))]
+DTYPES = {
+    'float64': 'd',
+    'float32': 'f',
+}
+
+
+def _typecode(dtype: str) -> str:
+    try:
+        return DTYPES[dtype]
+    except KeyError:
+        raise ValueError(f"Unsupported dtype {dtype!r}, expected 'float32' or 'float64'.") from None
+
+
+def _check_shape(rows: int, cols: int):
+    if rows <= 0 or cols <= 0:
+        raise ValueError('Matrix must have at least one row and one column.')
+
+
+def _normalize_index(index: int, size: int) -> int:
+    if index < 0:
+        index += size
+    if not 0 <= index < size:
+        raise IndexError('Matrix index out of range.')
+    return index
+
+
+class MatrixRow:
+    """
+    A view of a single row of a Matrix.
+
+    Reads and writes go straight to the matrix buffer, so ``m[i][j] = v``
+    updates ``m`` in place.
+    """
+
+    __slots__ = ['_buffer', '_offset', '_size']
+
+    def __init__(self, buffer: array, offset: int, size: int):
+        self._buffer = buffer
+        self._offset = offset
+        self._size = size
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self) -> Iterator[float]:
+        return iter(self._buffer[self._offset:self._offset + self._size])
+
+    def __getitem__(self, key: int) -> float:
+        return self._buffer[self._offset + _normalize_index(key, self._size)]
+
+    def __setitem__(self, key: int, value: float):
+        self._buffer[self._offset + _normalize_index(key, self._size)] = value
+
+    def __eq__(self, other) -> bool:
+        return list(self) == list(other)
+
+    def tolist(self) -> List[float]:
+        return self._buffer[self._offset:self._offset + self._size].tolist()
+
+    def __repr__(self) -> str:
+        return repr(self.tolist())
 
 
 class Matrix:
+    """
+    A two dimensional matrix of floats.
 
-    def __init__(self, data: List[List[Union[int, float]]]):
+    Elements are stored row-major in a single contiguous ``array`` buffer
+    of float64 (``dtype='float64'``, the default) or float32
+    (``dtype='float32'``) values; ``shape`` and ``strides`` describe how it
+    maps onto rows and columns. Operations keep the element type of their
+    operands, and give float64 when float32 and float64 operands are mixed.
+    """
+
+    def __init__(self, data: Sequence[Sequence[Union[int, float]]], dtype: str = 'float64'):
         if len(data) == 0 or len(data[0]) == 0:
             raise ValueError('Matrix must have at least one row and one column.')
 
         if not all(len(row) == len(data[0]) for row in data):
             raise ValueError('All rows must have the same length.')
 
-        self._data: List[List[float]] = cast_list_items_to_float(data)
-        self._shape = (len(data), len(data[0]))
+        self._setup(array(_typecode(dtype), chain.from_iterable(data)), (len(data), len(data[0])))
+
+    def _setup(self, buffer: array, shape: Tuple[int, int]):
+        self._buffer = buffer
+        self._shape = shape
+
+    @classmethod
+    def from_buffer(cls, buffer: Sequence[Union[int, float]], shape: Tuple[int, int],
+                    dtype: str = 'float64') -> 'Matrix':
+        """
+        Build a matrix from a flat row-major sequence of numbers.
+
+        :param buffer: Elements in row-major order
+        :param shape: (rows, cols) of the resulting matrix
+        :param dtype: 'float64' or 'float32'
+        :return: Matrix holding a copy of ``buffer``
+        """
+        rows, cols = shape
+        _check_shape(rows, cols)
+
+        buffer = array(_typecode(dtype), buffer)
+        if len(buffer) != rows * cols:
+            raise ValueError('Buffer size does not match the matrix shape.')
+
+        return cls._from_trusted(buffer, (rows, cols))
+
+    @classmethod
+    def _from_trusted(cls, buffer: array, shape: Tuple[int, int]) -> 'Matrix':
+        """
+        Wrap a buffer produced by the library without validating or copying it.
+
+        The caller guarantees that ``buffer`` is an ``array('d')`` or
+        ``array('f')``, or a memoryview of such values like a memory-mapped
+        file, holding exactly
+        ``rows * cols`` elements and that it is not shared with another
+        matrix unless that sharing is intended.
+        """
+        matrix = cls.__new__(cls)
+        matrix._setup(buffer, shape)
+        return matrix
 
     @property
     def shape(self) -> tuple:
         return self._shape
 
+    @property
+    def dtype(self) -> str:
+        return 'float32' if buffer_typecode(self._buffer) == 'f' else 'float64'
+
+    def astype(self, dtype: str) -> 'Matrix':
+        """
+        Copy this matrix with elements of another type.
+
+        :param dtype: 'float64' or 'float32'
+        :return: New matrix of the same class, holding converted elements
+        """
+        return self._from_trusted(array(_typecode(dtype), self._buffer), self._shape)
+
+    @property
+    def strides(self) -> tuple:
+        return self._shape[1], 1
+
+    @property
+    def buffer(self) -> array:
+        return self._buffer
+
     @property
     def data(self) -> List[List[float]]:
-        return self._data
+        rows, cols = self._shape
+        return [self._buffer[i * cols:(i + 1) * cols].tolist() for i in range(rows)]
 
     def __repr__(self) -> str:
-        return f'Matrix({self._data})'
+        return f'Matrix({self.data})'
 
     def __str__(self):
-        return '\n'.join(str(row) for row in self._data)
+        return '\n'.join(str(row) for row in self.data)
 
-    def __getitem__(self, key: Union[int, tuple]) -> Union[float, List]:
+    def __getitem__(self, key: Union[int, tuple]) -> Union[float, MatrixRow]:
+        rows, cols = self._shape
         if isinstance(key, int):
-            return self._data[key]
+            return MatrixRow(self._buffer, _normalize_index(key, rows) * cols, cols)
         elif isinstance(key, tuple):
-            return self._data[key[0]][key[1]]
+            return self._buffer[_normalize_index(key[0], rows) * cols + _normalize_index(key[1], cols)]
         else:
             raise TypeError('Invalid key type.')
 
-    def __setitem__(self, key: Union[int, tuple], value: Union[float, List]):
+    def __setitem__(self, key: Union[int, tuple], value: Union[float, Sequence[float]]):
+        rows, cols = self._shape
         if isinstance(key, int):
-            self._data[key] = value
+            if len(value) != cols:
+                raise ValueError('All rows must have the same length.')
+            offset = _normalize_index(key, rows) * cols
+            self._buffer[offset:offset + cols] = array(buffer_typecode(self._buffer), value)
         elif isinstance(key, tuple):
-            self._data[key[0]][key[1]] = value
+            self._buffer[_normalize_index(key[0], rows) * cols + _normalize_index(key[1], cols)] = value
         else:
             raise TypeError('Invalid key type.')
 
     def __add__(self, other: Union[int, float, 'Matrix']) -> 'Matrix':
         if isinstance(other, float) or isinstance(other, int):
-            return Matrix(scalar_add(self._data, other))
-        return Matrix(add(self._data, other._data))
+            return Matrix._from_trusted(get_backend().scalar_add(self._buffer, other), self._shape)
+        if self._shape != other.shape:
+            return self._broadcast('add', other)
+        return Matrix._from_trusted(get_backend().add(self._buffer, other._buffer), self._shape)
 
     def __radd__(self, other):
         return self + other
 
     def __sub__(self, other: Union[float, int, 'Matrix']) -> 'Matrix':
         if isinstance(other, float) or isinstance(other, int):
-            return Matrix(scalar_add(self._data, other * -1))
-        return Matrix(add(self._data, scalar_multiply(other._data, -1)))
+            return Matrix._from_trusted(get_backend().scalar_add(self._buffer, other * -1), self._shape)
+        if self._shape != other.shape:
+            return self._broadcast('subtract', other)
+        return Matrix._from_trusted(get_backend().subtract(self._buffer, other._buffer), self._shape)
 
-    def __rsub__(self, other: 'Matrix') -> 'Matrix':
-        return other - self
+    def __rsub__(self, other: Union[float, int]) -> 'Matrix':
+        return (-self) + other
 
     def __mul__(self, other: Union[float, int, 'Matrix']) -> 'Matrix':
         if isinstance(other, float) or isinstance(other, int):
-            return Matrix(scalar_multiply(self._data, other))
-        return Matrix(elementwise_multiply(self._data, other._data))
+            return Matrix._from_trusted(get_backend().scalar_multiply(self._buffer, other), self._shape)
+        if self._shape != other.shape:
+            return self._broadcast('multiply', other)
+        return Matrix._from_trusted(get_backend().elementwise_multiply(self._buffer, other._buffer), self._shape)
 
     def __rmul__(self, other: float) -> 'Matrix':
         return self * other
 
     def __pow__(self, power: float) -> 'Matrix':
-        return Matrix(scalar_power(self._data, power))
+        return Matrix._from_trusted(get_backend().scalar_power(self._buffer, power), self._shape)
 
     def __neg__(self):
         return self * -1
@@ -97,37 +233,188 @@ class Matrix:
     def __truediv__(self, other: Union[float, int, 'Matrix']) -> 'Matrix':
         if isinstance(other, float) or isinstance(other, int):
             return self * (other ** -1)
-        return self * (other ** -1)
+        if self._shape != other.shape:
+            return self._broadcast('divide', other)
+        return Matrix._from_trusted(get_backend().divide(self._buffer, other._buffer), self._shape)
+
+    def _broadcast(self, op: str, other: 'Matrix') -> 'Matrix':
+        """
+        Apply an element-wise operation to matrices of different shapes.
+
+        Like NumPy, an axis of size one on either side is stretched to match
+        the other side, so a (1, cols) row vector or a (rows, 1) column
+        vector combines with a (rows, cols) matrix.
+        """
+        (rows, cols), (other_rows, other_cols) = self._shape, other.shape
+        if rows != other_rows and 1 not in (rows, other_rows) or cols != other_cols and 1 not in (cols, other_cols):
+            raise ValueError(f'Matrices of shapes {self._shape} and {other.shape} cannot be broadcast together.')
+        buffer = get_backend().broadcast_binary(op, self._buffer, self._shape, other._buffer, other.shape)
+        return Matrix._from_trusted(buffer, (max(rows, other_rows), max(cols, other_cols)))
+
+    def _check_same_shape(self, other: 'Matrix'):
+        if self._shape != other.shape:
+            raise ValueError('Matrices must have the same shape.')
+
+    def add_(self, other: Union[float, int, 'Matrix']) -> 'Matrix':
+        """
+        Add ``other`` to this matrix in place, reusing its buffer.
+        """
+        if isinstance(other, float) or isinstance(other, int):
+            get_backend().scalar_add_inplace(self._buffer, other)
+        else:
+            self._check_same_shape(other)
+            get_backend().add_inplace(self._buffer, other._buffer)
+        return self
+
+    def sub_(self, other: Union[float, int, 'Matrix']) -> 'Matrix':
+        """
+        Subtract ``other`` from this matrix in place, reusing its buffer.
+        """
+        if isinstance(other, float) or isinstance(other, int):
+            get_backend().scalar_add_inplace(self._buffer, other * -1)
+        else:
+            self._check_same_shape(other)
+            get_backend().subtract_inplace(self._buffer, other._buffer)
+        return self
+
+    def mul_(self, other: Union[float, int, 'Matrix']) -> 'Matrix':
+        """
+        Multiply this matrix element-wise by ``other`` in place, reusing its buffer.
+        """
+        if isinstance(other, float) or isinstance(other, int):
+            get_backend().scalar_multiply_inplace(self._buffer, other)
+        else:
+            self._check_same_shape(other)
+            get_backend().elementwise_multiply_inplace(self._buffer, other._buffer)
+        return self
+
+    def zero_(self) -> 'Matrix':
+        """
+        Set every element to zero in place.
+        """
+        get_backend().fill_inplace(self._buffer, 0.0)
+        return self
+
+    def __iadd__(self, other: Union[float, int, 'Matrix']) -> 'Matrix':
+        return self.add_(other)
+
+    def __isub__(self, other: Union[float, int, 'Matrix']) -> 'Matrix':
+        return self.sub_(other)
+
+    def __imul__(self, other: Union[float, int, 'Matrix']) -> 'Matrix':
+        return self.mul_(other)
 
     def mm(self, other: 'Matrix') -> 'Matrix':
         if self.shape[1] != other.shape[0]:
             raise ValueError('Matrices cannot be multiplied.')
-        return Matrix(multiply(self._data, other._data))
+        rows, inner = self._shape
+        cols = other.shape[1]
+        if should_parallelize(rows, inner, cols):
+            product = parallel_multiply(self._buffer, other._buffer, rows, inner, cols)
+        else:
+            product = get_backend().multiply(self._buffer, other._buffer, rows, inner, cols)
+        return Matrix._from_trusted(product, (rows, cols))
 
     def __matmul__(self, other: 'Matrix') -> 'Matrix':
         return self.mm(other)
 
     def transpose(self) -> 'Matrix':
-        return Matrix(transpose(self._data))
+        rows, cols = self._shape
+        return Matrix._from_trusted(get_backend().transpose(self._buffer, rows, cols), (cols, rows))
 
     @property
     def T(self) -> 'Matrix':
         return self.transpose()
 
     def exp(self) -> 'Matrix':
-        return Matrix(exp(self._data))
+        return Matrix._from_trusted(get_backend().exp(self._buffer), self._shape)
+
+    def sigmoid(self) -> 'Matrix':
+        return Matrix._from_trusted(get_backend().sigmoid(self._buffer), self._shape)
+
+    def tanh(self) -> 'Matrix':
+        return Matrix._from_trusted(get_backend().tanh(self._buffer), self._shape)
 
-    def sum(self) -> float:
-        return sum(sum(row) for row in self._data)
+    def relu(self) -> 'Matrix':
+        return Matrix._from_trusted(get_backend().relu(self._buffer), self._shape)
+
+    def softmax(self) -> 'Matrix':
+        rows, cols = self._shape
+        return Matrix._from_trusted(get_backend().softmax(self._buffer, rows, cols), self._shape)
+
+    def _reduce(self, kernel: str, axis: Optional[int]) -> 'Matrix':
+        rows, cols = self._shape
+        if axis is None:
+            shape = (1, 1)
+        elif axis == 0:
+            shape = (1, cols)
+        elif axis == 1:
+            shape = (rows, 1)
+        else:
+            raise ValueError('axis must be None, 0 or 1.')
+        return Matrix._from_trusted(getattr(get_backend(), kernel)(self._buffer, rows, cols, axis), shape)
+
+    def sum(self, axis: Optional[int] = None) -> Union[float, 'Matrix']:
+        """
+        Sum the elements, over everything or along one axis.
+
+        :param axis: None for a float; 0 to sum over rows, giving a
+            (1, cols) matrix; 1 to sum over columns, giving a (rows, 1) matrix
+        :return: Sum of the elements
+        """
+        if axis is None:
+            return get_backend().sum_elements(self._buffer)
+        return self._reduce('sum_axis', axis)
+
+    def mean(self, axis: Optional[int] = None) -> Union[float, 'Matrix']:
+        """
+        Average the elements, over everything or along one axis.
+
+        :param axis: None, 0 or 1, as for ``sum``
+        :return: Mean of the elements
+        """
+        rows, cols = self._shape
+        if axis is None:
+            return self.sum() / (rows * cols)
+        return self.sum(axis) * (1 / (rows if axis == 0 else cols))
+
+    def max(self, axis: Optional[int] = None) -> Union[float, 'Matrix']:
+        """
+        Largest element, over everything or along one axis.
+
+        :param axis: None, 0 or 1, as for ``sum``
+        :return: Maximum of the elements
+        """
+        result = self._reduce('max_axis', axis)
+        return result.buffer[0] if axis is None else result
+
+    def logsumexp(self, axis: Optional[int] = None) -> Union[float, 'Matrix']:
+        """
+        ``log(sum(exp(x)))``, over everything or along one axis, computed
+        without overflowing for large elements.
+
+        :param axis: None, 0 or 1, as for ``sum``
+        :return: Log-sum-exp of the elements
+        """
+        result = self._reduce('logsumexp_axis', axis)
+        return result.buffer[0] if axis is None else result
+
+    def __float__(self) -> float:
+        if self._shape != (1, 1):
+            raise TypeError('Only a 1x1 matrix can be converted to a float.')
+        return self._buffer[0]
 
     @classmethod
-    def zeros(cls, rows: int, cols: int) -> 'Matrix':
-        return Matrix(matrix_of_zeros(rows, cols))
+    def zeros(cls, rows: int, cols: int, dtype: str = 'float64') -> 'Matrix':
+        _check_shape(rows, cols)
+        return Matrix._from_trusted(get_backend().matrix_of_zeros(rows, cols, _typecode(dtype)), (rows, cols))
 
     @classmethod
-    def ones(cls, rows: int, cols: int) -> 'Matrix':
-        return Matrix(matrix_of_ones(rows, cols))
+    def ones(cls, rows: int, cols: int, dtype: str = 'float64') -> 'Matrix':
+        _check_shape(rows, cols)
+        return Matrix._from_trusted(get_backend().matrix_of_ones(rows, cols, _typecode(dtype)), (rows, cols))
 
     @classmethod
-    def identity(cls, size: int) -> 'Matrix':
-        return Matrix(identity_matrix(size))
+    def identity(cls, size: int, dtype: str = 'float64') -> 'Matrix':
+        _check_shape(size, size)
+        return Matrix._from_trusted(get_backend().identity_matrix(size, _typecode(dtype)), (size, size))
@@ -0,0 +1,180 @@
+import atexit
+import os
+import pickle
+import struct
+
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from multiprocessing import shared_memory
+
+from .backends import Backend, get_backend
+from .functions import buffer_typecode, result_typecode
+
+from typing import (
+    Dict,
+    Iterator,
+    Optional,
+)
+
+PARALLEL_MATMUL_THRESHOLD = 128 ** 3
+
+_enabled = False
+_workers: Optional[int] = None
+_threshold = PARALLEL_MATMUL_THRESHOLD
+_executor: Optional[ProcessPoolExecutor] = None
+# Backends checked for being picklable since the pool was created, with
+# the reason when one cannot be sent to the workers.
+_sendable: Dict[Backend, Optional[str]] = {}
+
+
+def enable_parallel_matmul(workers: Optional[int] = None, threshold: Optional[int] = None):
+    """
+    Compute large matrix products on a pool of worker processes.
+
+    :param workers: Number of worker processes, defaults to the number of CPUs
+    :param threshold: Minimum number of multiply-adds (rows * inner * cols)
+        for a product to be split across processes
+    """
+    global _enabled, _workers, _threshold
+
+    if workers is not None and workers < 1:
+        raise ValueError('Number of workers must be positive.')
+
+    if workers != _workers:
+        _shutdown_executor()
+
+    _enabled = True
+    _workers = workers
+    _threshold = PARALLEL_MATMUL_THRESHOLD if threshold is None else threshold
+
+
+def disable_parallel_matmul():
+    """
+    Go back to computing every matrix product in the calling process.
+    """
+    global _enabled
+
+    _enabled = False
+
+
+@contextmanager
+def use_parallel_matmul(workers: Optional[int] = None, threshold: Optional[int] = None) -> Iterator[None]:
+    """
+    Enable parallel matrix products for the duration of a ``with`` block.
+    """
+    previous = _enabled, _workers, _threshold
+    enable_parallel_matmul(workers, threshold)
+    try:
+        yield
+    finally:
+        enabled, workers, threshold = previous
+        enable_parallel_matmul(workers, threshold)
+        if not enabled:
+            disable_parallel_matmul()
+
+
+def should_parallelize(rows: int, inner: int, cols: int) -> bool:
+    return _enabled and rows > 1 and rows * inner * cols >= _threshold
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=_workers)
+    return _executor
+
+
+def _shutdown_executor():
+    global _executor
+
+    if _executor is not None:
+        _executor.shutdown()
+        _executor = None
+    _sendable.clear()
+
+
+atexit.register(_shutdown_executor)
+
+
+def _multiply_rows(backend: Backend, x_block: bytes, x_typecode: str, shm_name: str, y_typecode: str,
+                   rows: int, inner: int, cols: int) -> bytes:
+    x = array(x_typecode)
+    x.frombytes(x_block)
+
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        # The right operand is read in place; the views must be released
+        # before the shared memory block can be closed.
+        with shm.buf[:inner * cols * struct.calcsize(y_typecode)] as raw, raw.cast(y_typecode) as y:
+            return backend.multiply(x, y, rows, inner, cols).tobytes()
+    finally:
+        shm.close()
+
+
+def _check_sendable(backend: Backend):
+    """
+    Raise a TypeError if the backend cannot be pickled to be sent to the
+    workers. Each backend is only pickled the first time it is checked.
+    """
+    if backend not in _sendable:
+        try:
+            pickle.dumps(backend)
+            _sendable[backend] = None
+        except Exception as error:
+            _sendable[backend] = str(error)
+
+    error = _sendable[backend]
+    if error is not None:
+        raise TypeError(f'Backend {backend.name!r} cannot be sent to worker processes, '
+                        f'disable parallel matmul or use a picklable backend: {error}')
+
+
+def parallel_multiply(x: array, y: array, rows: int, inner: int, cols: int) -> array:
+    """
+    Multiply two matrices (flat row-major buffers) on the worker pool.
+
+    The left operand is split into row blocks, one task per block; the
+    right operand is placed in shared memory once and read in place by
+    every task. The current backend object is sent along with each task,
+    so a backend registered only in this process works with every start
+    method.
+
+    :param x: First matrix, of shape (rows, inner)
+    :param y: Second matrix, of shape (inner, cols)
+    :param rows: Number of rows of the first matrix
+    :param inner: Number of columns of the first matrix
+    :param cols: Number of columns of the second matrix
+    :return: Product of matrices, of shape (rows, cols)
+    """
+    executor = _get_executor()
+    workers = _workers or os.cpu_count() or 1
+    block_rows = -(-rows // workers)
+    backend = get_backend()
+    _check_sendable(backend)
+
+    shm = shared_memory.SharedMemory(create=True, size=len(y) * y.itemsize)
+    try:
+        shm.buf[:len(y) * y.itemsize] = memoryview(y).cast('B')
+        futures = [
+            executor.submit(
+                _multiply_rows,
+                backend,
+                x[start * inner:min(start + block_rows, rows) * inner].tobytes(),
+                buffer_typecode(x),
+                shm.name,
+                buffer_typecode(y),
+                min(block_rows, rows - start),
+                inner,
+                cols,
+            )
+            for start in range(0, rows, block_rows)
+        ]
+        out = array(result_typecode(x, y))
+        for future in futures:
+            out.frombytes(future.result())
+    finally:
+        shm.close()
+        shm.unlink()
+    return out
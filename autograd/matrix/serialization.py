@@ -0,0 +1,215 @@
+import mmap
+import struct
+import sys
+
+from array import array
+
+from .functions import buffer_typecode
+from .matrix import Matrix, _check_shape
+
+from typing import (
+    BinaryIO,
+    Dict,
+    Mapping,
+    Optional,
+    Tuple,
+    Type,
+)
+
+# A matrix file is a 24 byte header followed by the elements, row-major,
+# as little-endian doubles (typecode 'd') or floats (typecode 'f'):
+#
+#   magic (4s) | version (B) | typecode (c) | padding (2x) | rows (Q) | cols (Q)
+#
+# A parameter file is a 12 byte header, then one entry per matrix: the
+# length of its UTF-8 name (I), the name padded with zeros to a multiple of
+# 8 bytes, and the matrix in the format above, its elements padded with
+# zeros to a multiple of 8 bytes. Every block of elements starts at a
+# multiple of 8 bytes, so it can be viewed in place once mapped.
+#
+#   magic (4s) | version (B) | padding (3x) | count (I)
+MATRIX_MAGIC = b'ADMX'
+PARAMETERS_MAGIC = b'ADPS'
+FORMAT_VERSION = 1
+
+_MATRIX_HEADER = struct.Struct('<4sBc2xQQ')
+_PARAMETERS_HEADER = struct.Struct('<4sB3xI')
+_NAME_LENGTH = struct.Struct('<I')
+
+_MMAP_ACCESS = {
+    'r': mmap.ACCESS_READ,
+    'r+': mmap.ACCESS_WRITE,
+    'c': mmap.ACCESS_COPY,
+}
+
+
+def save_matrix(matrix: Matrix, path: str):
+    """
+    Write a matrix to a file in the binary matrix format.
+
+    :param matrix: Matrix to save
+    :param path: Destination file, overwritten if it exists
+    """
+    with open(path, 'wb') as file:
+        _write_matrix(file, matrix)
+
+
+def load_matrix(path: str, mmap_mode: Optional[str] = None, matrix_type: Type[Matrix] = Matrix) -> Matrix:
+    """
+    Read a matrix saved with ``save_matrix``.
+
+    :param path: File to read
+    :param mmap_mode: None to read the elements into memory; otherwise the
+        matrix is a view of the memory-mapped file, read on demand: 'r'
+        for a read-only view, 'r+' for a view whose changes are written to
+        the file, 'c' for a copy-on-write view whose changes stay in memory
+    :param matrix_type: Class of the returned matrix, such as AutogradMatrix
+    :return: The saved matrix
+    """
+    view = _map(path, mmap_mode)
+    if view is not None:
+        return _view_matrix(view, 0, path, matrix_type)[0]
+
+    with open(path, 'rb') as file:
+        return _read_matrix(file, path, matrix_type)
+
+
+def save_parameters(parameters: Mapping[str, Matrix], path: str):
+    """
+    Write named matrices, such as the parameters of a model, to one file.
+
+    :param parameters: Matrices by name
+    :param path: Destination file, overwritten if it exists
+    """
+    with open(path, 'wb') as file:
+        file.write(_PARAMETERS_HEADER.pack(PARAMETERS_MAGIC, FORMAT_VERSION, len(parameters)))
+        for name, matrix in parameters.items():
+            encoded = name.encode('utf-8')
+            file.write(_NAME_LENGTH.pack(len(encoded)))
+            file.write(encoded + bytes(_padding(_NAME_LENGTH.size + len(encoded))))
+            _write_matrix(file, matrix)
+
+
+def load_parameters(path: str, mmap_mode: Optional[str] = None,
+                    matrix_type: Type[Matrix] = Matrix) -> Dict[str, Matrix]:
+    """
+    Read named matrices saved with ``save_parameters``.
+
+    :param path: File to read
+    :param mmap_mode: None, 'r', 'r+' or 'c', as for ``load_matrix``
+    :param matrix_type: Class of the returned matrices, such as AutogradMatrix
+    :return: Matrices by name, in the order they were saved
+    """
+    view = _map(path, mmap_mode)
+    if view is not None:
+        count = _read_parameters_header(view[:_PARAMETERS_HEADER.size].tobytes(), path)
+        offset = _PARAMETERS_HEADER.size
+        parameters = {}
+        for _ in range(count):
+            name, offset = _read_name(view[offset:offset + _NAME_LENGTH.size].tobytes(), view, offset, path)
+            parameters[name], offset = _view_matrix(view, offset, path, matrix_type)
+        return parameters
+
+    with open(path, 'rb') as file:
+        count = _read_parameters_header(file.read(_PARAMETERS_HEADER.size), path)
+        parameters = {}
+        for _ in range(count):
+            length, = _NAME_LENGTH.unpack(_read_exactly(file, _NAME_LENGTH.size, path))
+            encoded = _read_exactly(file, length + _padding(_NAME_LENGTH.size + length), path)
+            parameters[encoded[:length].decode('utf-8')] = _read_matrix(file, path, matrix_type)
+        return parameters
+
+
+def _padding(size: int) -> int:
+    return -size % 8
+
+
+def _write_matrix(file: BinaryIO, matrix: Matrix):
+    rows, cols = matrix.shape
+    buffer = matrix.buffer
+    typecode = buffer_typecode(buffer)
+    file.write(_MATRIX_HEADER.pack(MATRIX_MAGIC, FORMAT_VERSION, typecode.encode('ascii'), rows, cols))
+    if sys.byteorder == 'big':
+        buffer = array(typecode, buffer)
+        buffer.byteswap()
+    file.write(buffer)
+    file.write(bytes(_padding(rows * cols * struct.calcsize(typecode))))
+
+
+def _read_exactly(file: BinaryIO, size: int, path: str) -> bytes:
+    data = file.read(size)
+    if len(data) != size:
+        raise ValueError(f'{path} is truncated.')
+    return data
+
+
+def _read_matrix_header(header: bytes, path: str) -> Tuple[str, int, int]:
+    if len(header) != _MATRIX_HEADER.size:
+        raise ValueError(f'{path} is truncated.')
+    magic, version, typecode, rows, cols = _MATRIX_HEADER.unpack(header)
+    if magic != MATRIX_MAGIC:
+        raise ValueError(f'{path} does not hold a matrix.')
+    if version != FORMAT_VERSION:
+        raise ValueError(f'{path} uses format version {version}, only version {FORMAT_VERSION} is supported.')
+    if typecode not in (b'd', b'f'):
+        raise ValueError(f'{path} holds elements of unsupported type {typecode!r}.')
+    _check_shape(rows, cols)
+    return typecode.decode('ascii'), rows, cols
+
+
+def _read_parameters_header(header: bytes, path: str) -> int:
+    if len(header) != _PARAMETERS_HEADER.size:
+        raise ValueError(f'{path} is truncated.')
+    magic, version, count = _PARAMETERS_HEADER.unpack(header)
+    if magic != PARAMETERS_MAGIC:
+        raise ValueError(f'{path} does not hold a parameter set.')
+    if version != FORMAT_VERSION:
+        raise ValueError(f'{path} uses format version {version}, only version {FORMAT_VERSION} is supported.')
+    return count
+
+
+def _read_name(length_bytes: bytes, view: memoryview, offset: int, path: str) -> Tuple[str, int]:
+    if len(length_bytes) != _NAME_LENGTH.size:
+        raise ValueError(f'{path} is truncated.')
+    length, = _NAME_LENGTH.unpack(length_bytes)
+    start = offset + _NAME_LENGTH.size
+    if start + length > len(view):
+        raise ValueError(f'{path} is truncated.')
+    name = view[start:start + length].tobytes().decode('utf-8')
+    return name, start + length + _padding(_NAME_LENGTH.size + length)
+
+
+def _read_matrix(file: BinaryIO, path: str, matrix_type: Type[Matrix]) -> Matrix:
+    typecode, rows, cols = _read_matrix_header(file.read(_MATRIX_HEADER.size), path)
+    buffer = array(typecode)
+    try:
+        buffer.fromfile(file, rows * cols)
+    except EOFError:
+        raise ValueError(f'{path} is truncated.') from None
+    file.read(_padding(rows * cols * buffer.itemsize))
+    if sys.byteorder == 'big':
+        buffer.byteswap()
+    return matrix_type._from_trusted(buffer, (rows, cols))
+
+
+def _map(path: str, mmap_mode: Optional[str]) -> Optional[memoryview]:
+    if mmap_mode is None:
+        return None
+    if mmap_mode not in _MMAP_ACCESS:
+        raise ValueError(f"mmap_mode must be None, 'r', 'r+' or 'c', got {mmap_mode!r}.")
+    if sys.byteorder == 'big':
+        # The file holds little-endian values, which cannot be viewed in
+        # place here; read them into memory instead.
+        return None
+    with open(path, 'r+b' if mmap_mode == 'r+' else 'rb') as file:
+        return memoryview(mmap.mmap(file.fileno(), 0, access=_MMAP_ACCESS[mmap_mode]))
+
+
+def _view_matrix(view: memoryview, offset: int, path: str, matrix_type: Type[Matrix]) -> Tuple[Matrix, int]:
+    start = offset + _MATRIX_HEADER.size
+    typecode, rows, cols = _read_matrix_header(view[offset:start].tobytes(), path)
+    size = rows * cols * struct.calcsize(typecode)
+    end = start + size
+    if end > len(view):
+        raise ValueError(f'{path} is truncated.')
+    return matrix_type._from_trusted(view[start:end].cast(typecode), (rows, cols)), end + _padding(size)
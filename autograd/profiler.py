@@ -0,0 +1,234 @@
+import json
+import os
+import threading
+import time
+
+from contextlib import contextmanager
+
+from autograd.autograd_matrix import AutogradMatrix
+from autograd.functions.base import BaseOperation
+from autograd.matrix.autograd_functions import BaseFunction
+from autograd.value import Value
+
+from typing import (
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+)
+
+# The profiler that is currently recording, if any.
+_active: Optional['Profiler'] = None
+
+
+class OpStats:
+    """
+    Totals recorded for one operation or function class.
+    """
+
+    __slots__ = ['name', 'calls', 'forward_time', 'backward_calls', 'backward_time', 'bytes', 'shapes']
+
+    def __init__(self, name: str):
+        self.name = name
+        self.calls = 0
+        self.forward_time = 0.0
+        self.backward_calls = 0
+        self.backward_time = 0.0
+        self.bytes = 0
+        self.shapes: Dict[Tuple[int, ...], int] = {}
+
+    @property
+    def total_time(self) -> float:
+        return self.forward_time + self.backward_time
+
+    def __repr__(self):
+        return (f'OpStats({self.name}, calls={self.calls}, forward_time={self.forward_time:.6f}, '
+                f'backward_calls={self.backward_calls}, backward_time={self.backward_time:.6f}, bytes={self.bytes})')
+
+
+def _output_info(output) -> Tuple[Tuple[int, ...], int]:
+    """
+    :return: Shape of an operation's output and the number of bytes held by
+        its data and, for matrices, its gradient buffer
+    """
+    if isinstance(output, AutogradMatrix):
+        size = memoryview(output.buffer).nbytes
+        if output._grad is not None:
+            size += memoryview(output._grad.buffer).nbytes
+        return output.shape, size
+    if isinstance(output, Value):
+        data = output.data
+        if isinstance(data, (int, float)):
+            return (), 8
+        try:
+            return (len(data),), memoryview(data).nbytes
+        except TypeError:
+            # Other numbers, such as Fraction or Decimal, have no buffer
+            # whose size could be measured.
+            return (), 0
+    return (), 0
+
+
+class Profiler:
+    """
+    Records the time spent in every operation applied and every node
+    backpropagated while it is active, see ``profile``.
+
+    ``stats`` holds the totals per operation class and ``events`` every
+    call as ``(name, phase, start, duration, thread_id, shape)``, with
+    times in seconds since the profiler started.
+    """
+
+    def __init__(self):
+        self.stats: Dict[str, OpStats] = {}
+        self.events: List[tuple] = []
+        self._start = 0.0
+        self._originals = []
+
+    def _op_stats(self, cls) -> OpStats:
+        stats = self.stats.get(cls.__name__)
+        if stats is None:
+            stats = self.stats[cls.__name__] = OpStats(cls.__name__)
+        return stats
+
+    def _record_forward(self, cls, start: float, end: float, output):
+        shape, size = _output_info(output)
+        stats = self._op_stats(cls)
+        stats.calls += 1
+        stats.forward_time += end - start
+        stats.bytes += size
+        stats.shapes[shape] = stats.shapes.get(shape, 0) + 1
+        self.events.append((cls.__name__, 'forward', start - self._start, end - start, threading.get_ident(), shape))
+
+    def _record_backward(self, cls, start: float, end: float, shape: Tuple[int, ...]):
+        stats = self._op_stats(cls)
+        stats.backward_calls += 1
+        stats.backward_time += end - start
+        self.events.append((cls.__name__, 'backward', start - self._start, end - start, threading.get_ident(), shape))
+
+    def _install(self):
+        """
+        Replace the entry points of the graph with timed versions. Nothing
+        is changed outside of ``profile``, so profiling costs nothing while
+        it is not active.
+        """
+        profiler = self
+        perf_counter = time.perf_counter
+
+        def timed_apply(original):
+            def apply(cls, *args, **kwargs):
+                start = perf_counter()
+                output = original(cls, *args, **kwargs)
+                profiler._record_forward(cls, start, perf_counter(), output)
+                return output
+            return classmethod(apply)
+
+        def timed_value_backward(original):
+            def backward(node, *args, **kwargs):
+                op = node._op
+                if op is None:
+                    return original(node, *args, **kwargs)
+                start = perf_counter()
+                original(node, *args, **kwargs)
+                profiler._record_backward(op, start, perf_counter(), _output_info(node)[0])
+            return backward
+
+        def timed_matrix_backward(original):
+            def backward(node, *args, **kwargs):
+                function = node._function
+                if function is None:
+                    return original(node, *args, **kwargs)
+                start = perf_counter()
+                original(node, *args, **kwargs)
+                profiler._record_backward(function, start, perf_counter(), node.shape)
+            return backward
+
+        patches = [
+            (BaseOperation, 'apply', timed_apply(BaseOperation.__dict__['apply'].__func__)),
+            (BaseFunction, 'apply', timed_apply(BaseFunction.__dict__['apply'].__func__)),
+            (Value, 'backward', timed_value_backward(Value.__dict__['backward'])),
+            (AutogradMatrix, 'backward', timed_matrix_backward(AutogradMatrix.__dict__['backward'])),
+        ]
+        for owner, name, replacement in patches:
+            self._originals.append((owner, name, owner.__dict__[name]))
+            setattr(owner, name, replacement)
+
+    def _uninstall(self):
+        while self._originals:
+            owner, name, original = self._originals.pop()
+            setattr(owner, name, original)
+
+    def summary(self, sort_by: str = 'total_time') -> str:
+        """
+        :param sort_by: OpStats attribute to sort the rows by, largest first
+        :return: Table of the totals per operation class
+        """
+        header = f"{'Operation':<20} {'Calls':>8} {'Forward ms':>11} {'Backward':>9} {'Backward ms':>12} " \
+                 f"{'Total ms':>10} {'KiB':>10}  Shapes"
+        lines = [header, '-' * len(header)]
+        for stats in sorted(self.stats.values(), key=lambda s: getattr(s, sort_by), reverse=True):
+            common = sorted(stats.shapes.items(), key=lambda item: item[1], reverse=True)
+            shapes = ', '.join('x'.join(map(str, shape)) or 'scalar' for shape, _ in common[:3])
+            if len(common) > 3:
+                shapes += ', ...'
+            lines.append(f'{stats.name:<20} {stats.calls:>8} {stats.forward_time * 1e3:>11.3f} '
+                         f'{stats.backward_calls:>9} {stats.backward_time * 1e3:>12.3f} '
+                         f'{stats.total_time * 1e3:>10.3f} {stats.bytes / 1024:>10.1f}  {shapes}')
+        return '\n'.join(lines)
+
+    def chrome_trace(self) -> Dict:
+        """
+        :return: The recorded events in the Chrome trace event format, as
+            read by chrome://tracing and Perfetto
+        """
+        pid = os.getpid()
+        return {
+            'traceEvents': [
+                {
+                    'name': name,
+                    'cat': phase,
+                    'ph': 'X',
+                    'ts': start * 1e6,
+                    'dur': duration * 1e6,
+                    'pid': pid,
+                    'tid': thread_id,
+                    'args': {'shape': list(shape)},
+                }
+                for name, phase, start, duration, thread_id, shape in self.events
+            ],
+            'displayTimeUnit': 'ms',
+        }
+
+    def export_chrome_trace(self, path: str):
+        with open(path, 'w') as file:
+            json.dump(self.chrome_trace(), file)
+
+
+@contextmanager
+def profile() -> Iterator[Profiler]:
+    """
+    Profile the operations applied and the nodes backpropagated inside the
+    ``with`` block, in every thread.
+
+    While the block runs, ``BaseOperation.apply``, ``BaseFunction.apply``
+    and the ``backward`` methods of ``Value`` and ``AutogradMatrix`` are
+    replaced with versions that time each call; they are restored when the
+    block exits. Only one profiler can be active at a time.
+
+    :return: The Profiler holding the recorded statistics and events
+    """
+    global _active
+
+    if _active is not None:
+        raise RuntimeError('A profiler is already active.')
+
+    profiler = Profiler()
+    profiler._install()
+    _active = profiler
+    profiler._start = time.perf_counter()
+    try:
+        yield profiler
+    finally:
+        profiler._uninstall()
+        _active = None
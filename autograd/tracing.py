@@ -0,0 +1,167 @@
+from autograd.functions import base
+from autograd.functions.batch import (
+    accumulate,
+    as_data,
+)
+from autograd.value import Value
+
+from typing import (
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Union,
+)
+
+
+class TracedFunction:
+    """
+    A function over Values recorded once into a flat instruction tape.
+
+    Each instruction is ``(evaluate, vjp, vjp_rhs, lhs, rhs, constant, out)``
+    where ``lhs``, ``rhs`` and ``out`` are slot indices; ``rhs`` is None
+    when the operation's right hand side was a plain number, held in
+    ``constant``. Replaying only evaluates the recorded operations on
+    floats; no Value objects or closures are created.
+    """
+
+    def __init__(self, instructions: List[tuple], slots: List, input_slots: List[int],
+                 output_slots: List[int], single_output: bool):
+        self._instructions = instructions
+        self._slots = slots
+        self._input_slots = input_slots
+        self._output_slots = output_slots
+        self._single_output = single_output
+        self._values: Optional[List] = None
+
+    def __len__(self) -> int:
+        return len(self._instructions)
+
+    def __call__(self, *inputs: float) -> Union[float, List[float]]:
+        return self.forward(*inputs)
+
+    def forward(self, *inputs: float) -> Union[float, List[float]]:
+        """
+        Evaluate the recorded function on new input data.
+
+        :param inputs: One number per input of the traced function
+        :return: Output data, a list when the traced function returned several Values
+        """
+        if len(inputs) != len(self._input_slots):
+            raise ValueError(f'Expected {len(self._input_slots)} inputs, got {len(inputs)}.')
+
+        values = self._slots[:]
+        for slot, data in zip(self._input_slots, inputs):
+            values[slot] = as_data(data)
+
+        for evaluate, _, _, lhs, rhs, constant, out in self._instructions:
+            values[out] = evaluate(values[lhs], constant if rhs is None else values[rhs])
+
+        self._values = values
+        if self._single_output:
+            return values[self._output_slots[0]]
+        return [values[slot] for slot in self._output_slots]
+
+    def backward(self, *output_gradients: float) -> List[float]:
+        """
+        Propagate gradients through the last forward replay.
+
+        :param output_gradients: Gradient of each output, all ones by default
+        :return: Gradient of each input of the traced function
+        """
+        values = self._values
+        if values is None:
+            raise RuntimeError('forward must be called before backward.')
+
+        if not output_gradients:
+            output_gradients = (1,) * len(self._output_slots)
+        elif len(output_gradients) != len(self._output_slots):
+            raise ValueError(f'Expected {len(self._output_slots)} output gradients, got {len(output_gradients)}.')
+
+        gradients = [0] * len(values)
+        for slot, gradient in zip(self._output_slots, output_gradients):
+            gradients[slot] = accumulate(gradients[slot], gradient)
+
+        for _, vjp, vjp_rhs, lhs, rhs, constant, out in reversed(self._instructions):
+            gradient = gradients[out]
+            if rhs is None:
+                gradients[lhs] = accumulate(gradients[lhs], vjp(gradient, values[lhs], constant))
+            else:
+                gradients[lhs] = accumulate(gradients[lhs], vjp(gradient, values[lhs], values[rhs]))
+                gradients[rhs] = accumulate(gradients[rhs], vjp_rhs(gradient, values[lhs], values[rhs]))
+
+        return [gradients[slot] for slot in self._input_slots]
+
+
+def trace(f: Callable, *example_inputs: float) -> TracedFunction:
+    """
+    Record ``f`` once and return a TracedFunction that replays it.
+
+    ``f`` is called with one Value per example input and must return a
+    Value or a sequence of Values. Like any tracer, only the path taken for
+    the example inputs is recorded: Python control flow that depends on
+    the data is frozen. Only operations run by the calling thread are
+    recorded.
+
+    :param f: Function of Values to record
+    :param example_inputs: Numbers used for the recording run
+    :return: Replayable function
+    """
+    if base._tracing.tape is not None:
+        raise RuntimeError('Tracing is already in progress.')
+
+    inputs = [Value(data) for data in example_inputs]
+    records = []
+    base._tracing.tape = records
+    try:
+        outputs = f(*inputs)
+    finally:
+        base._tracing.tape = None
+
+    single_output = isinstance(outputs, Value)
+    if single_output:
+        outputs = [outputs]
+    elif not all(isinstance(output, Value) for output in outputs):
+        raise TypeError('Traced function must return a Value or a sequence of Values.')
+
+    records = _live_records(records, outputs)
+
+    slots: List = []
+    slot_of: Dict[int, int] = {}
+
+    def slot_for(value: Value) -> int:
+        key = id(value)
+        if key not in slot_of:
+            slot_of[key] = len(slots)
+            slots.append(value.data)
+        return slot_of[key]
+
+    input_slots = [slot_for(value) for value in inputs]
+
+    instructions = []
+    for operation, lhs, rhs, output in records:
+        lhs_slot = slot_for(lhs)
+        if isinstance(rhs, Value):
+            rhs_slot, constant = slot_for(rhs), None
+        else:
+            rhs_slot, constant = None, rhs
+        instructions.append((operation.evaluate, operation.vjp, operation.vjp_rhs, lhs_slot, rhs_slot, constant,
+                             slot_for(output)))
+
+    output_slots = [slot_for(value) for value in outputs]
+    return TracedFunction(instructions, slots, input_slots, output_slots, single_output)
+
+
+def _live_records(records: List[tuple], outputs: Sequence[Value]) -> List[tuple]:
+    live = set(id(output) for output in outputs)
+    kept = []
+    for record in reversed(records):
+        _, lhs, rhs, output = record
+        if id(output) in live:
+            kept.append(record)
+            live.add(id(lhs))
+            if isinstance(rhs, Value):
+                live.add(id(rhs))
+    kept.reverse()
+    return kept
@@ -1,44 +1,142 @@
 from autograd.functions import (
     Addition,
+    BatchSum,
     Multiplication,
     Power,
 )
+from autograd.functions.batch import (
+    accumulate,
+    as_data,
+    is_batch,
+)
+from autograd.graph import (
+    topological_order,
+    value_parents,
+)
+
+# Parents of a Value that was not computed by an operation, shared so that
+# leaves and results built without a graph do not allocate a set each.
+_NO_PARENTS = frozenset()
 
 
 class Value:
+    """
+    A node of a scalar computation graph.
 
-    __slots__ = ['data', 'gradient', '_calculate_gradient', '_prev']
+    ``data`` is a number, or a batch (``array('d')``, lists are converted)
+    in which case every operation is applied element by element and the
+    gradient is a batch as well.
 
-    def __init__(self, data):
-        self.data = data
-        self.gradient = 0
-        self._prev = set()
-        self._calculate_gradient = lambda: 1
+    Gradients are only propagated to Values with ``requires_grad`` set;
+    operations on Values that do not require gradients, or run inside
+    ``no_grad``, do not record a graph.
+    """
 
-    def backward(self):
-        self.gradient += self._calculate_gradient()
+    __slots__ = ['data', 'gradient', 'requires_grad', '_op', '_args', '_prev', '_topo_cache']
 
-    def reset_gradient(self):
+    def __init__(self, data, requires_grad=True):
+        self.data = as_data(data)
         self.gradient = 0
+        self.requires_grad = requires_grad
+        self._op = None
+        self._args = ()
+        self._prev = _NO_PARENTS
+        self._topo_cache = None
+
+    def backward(self, create_graph=False):
+        """
+        Add this node's contribution to the gradients of the operands it was
+        computed from, using the vector-Jacobian product of its operation.
+
+        :param create_graph: Compute the contributions with Value operations,
+            so that the gradients are Values that can be differentiated
+        """
+        if self._op is None:
+            return
+
+        lhs, rhs = self._args
+        if create_graph:
+            if lhs.requires_grad:
+                lhs.gradient = _accumulate_graph(lhs.gradient, lhs, self._op.vjp_graph(self.gradient, lhs, rhs))
+            if isinstance(rhs, Value) and rhs.requires_grad:
+                rhs.gradient = _accumulate_graph(rhs.gradient, rhs, self._op.vjp_graph_rhs(self.gradient, lhs, rhs))
+            return
+
+        if isinstance(rhs, Value):
+            if lhs.requires_grad:
+                lhs.gradient = accumulate(lhs.gradient, self._op.vjp(self.gradient, lhs.data, rhs.data))
+            if rhs.requires_grad:
+                rhs.gradient = accumulate(rhs.gradient, self._op.vjp_rhs(self.gradient, lhs.data, rhs.data))
+        else:
+            lhs.gradient = accumulate(lhs.gradient, self._op.vjp(self.gradient, lhs.data, rhs))
 
-    def run_backpropagation(self):
-        topo = []
-        visited = set()
+    def reset_gradient(self):
+        self.gradient = 0
 
-        def build_topo(v):
-            if v not in visited:
-                visited.add(v)
-                for child in v._prev:
-                    build_topo(child)
-                topo.append(v)
+    def run_backpropagation(self, cache_order=False, retain_graph=True, create_graph=False):
+        """
+        Propagate gradients from this node back to every node it depends on.
+
+        :param cache_order: Keep the topological order on this node and reuse
+            it on later calls instead of traversing the graph again. Only use
+            it while the graph below this node is left unchanged.
+        :param retain_graph: When False, each node drops its operation and
+            operands as soon as its contribution has been pushed back, so
+            parts of the graph that are no longer referenced are freed
+            during the pass. The graph cannot be backpropagated again.
+        :param create_graph: Build the backward pass itself as a graph: every
+            gradient becomes a Value computed from the nodes of this graph,
+            and backpropagating from a gradient gives second derivatives.
+            Reset the gradients of the nodes involved before doing so, as
+            the second pass accumulates into them. Requires ``retain_graph``.
+        """
+        if not self.requires_grad:
+            raise RuntimeError('Cannot backpropagate from a Value that does not require gradients.')
+        if create_graph and not retain_graph:
+            raise ValueError('create_graph requires retain_graph, the gradients refer to the graph.')
+
+        topo = self._topo_cache
+        if topo is None:
+            topo = topological_order(self, value_parents)
+            if cache_order and retain_graph:
+                self._topo_cache = topo
+
+        if create_graph:
+            self.gradient = _accumulate_graph(self.gradient, self, Value(1, requires_grad=False))
+            for node in reversed(topo):
+                node.backward(create_graph=True)
+            return
+
+        self.gradient = accumulate(self.gradient, 1)
+
+        if retain_graph:
+            for node in reversed(topo):
+                node.backward()
+            return
+
+        self._topo_cache = None
+        while topo:
+            node = topo.pop()
+            node.backward()
+            node.release_graph()
 
-        build_topo(self)
+    def release_graph(self):
+        """
+        Forget how this node was computed, making it a leaf.
+        """
+        self._op = None
+        self._args = ()
+        self._prev = _NO_PARENTS
+        self._topo_cache = None
 
-        for node in reversed(topo):
-            node.backward()
+    def clear_order_cache(self):
+        self._topo_cache = None
 
     def add_prev(self, *prev):
-        self._prev.update(prev)
+        if self._prev is _NO_PARENTS:
+            self._prev = set(prev)
+        else:
+            self._prev.update(prev)
 
     def __repr__(self):
         return f'Value({self.data})'
@@ -75,3 +173,24 @@ class Value:
 
     def __rtruediv__(self, other):
         return other * self ** -1
+
+    def sum(self):
+        """
+        Sum a batch into a single number; the gradient is broadcast back.
+        """
+        return BatchSum.apply(self)
+
+
+def _accumulate_graph(total, node: Value, contribution: Value) -> Value:
+    """
+    Add a gradient contribution as a Value operation, so that the sum is
+    part of the graph. A batch contribution to a node holding a single
+    number is summed first, as in ``BaseOperation.vjp``.
+    """
+    if is_batch(contribution.data) and not is_batch(node.data):
+        contribution = contribution.sum()
+    if isinstance(total, Value):
+        return total + contribution
+    if not is_batch(total) and total == 0:
+        return contribution
+    return contribution + total
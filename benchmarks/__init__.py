@@ -0,0 +1,4 @@
+"""
+Benchmarks of the matrix kernels, the scalar graph and a small training
+loop. Run them with ``python -m benchmarks``.
+"""
@@ -0,0 +1,58 @@
+import argparse
+import sys
+
+from autograd.matrix import available_backends, use_backend
+
+from . import cases  # noqa: F401 registers the benchmarks
+from .harness import (
+    DEFAULT_THRESHOLD,
+    compare,
+    load_results,
+    print_comparison,
+    print_result,
+    registered_benchmarks,
+    run,
+    save_results,
+)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description='Run the autograd benchmarks.')
+    parser.add_argument('patterns', nargs='*', metavar='PATTERN',
+                        help="run only the benchmarks whose name matches, such as 'matrix.*'")
+    parser.add_argument('--list', action='store_true', help='list the benchmarks and their parameters, then exit')
+    parser.add_argument('--quick', action='store_true', help='only run the smallest size of every benchmark')
+    parser.add_argument('--repeat', type=int, default=5, help='measurements per case (default: 5)')
+    parser.add_argument('--backend', default='python', choices=available_backends(),
+                        help='matrix backend to run on (default: python)')
+    parser.add_argument('--output', metavar='PATH', help='write the results to PATH as JSON')
+    parser.add_argument('--baseline', metavar='PATH', help='compare with results saved by an earlier --output')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='relative slowdown reported as a regression (default: %(default)s)')
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for bench in registered_benchmarks():
+            params = ', '.join(f'{name}={values}' for name, values in bench.params.items())
+            print(f'{bench.name:<24} {params}')
+        return 0
+
+    with use_backend(args.backend):
+        results = run(args.patterns, args.repeat, args.quick, report=None if args.baseline else print_result)
+        if args.output:
+            save_results(results, args.output)
+
+    if not args.baseline:
+        return 0
+
+    rows = compare(results, load_results(args.baseline), args.threshold)
+    print_comparison(rows)
+    regressions = [row['id'] for row in rows if row['status'] == 'regression']
+    if regressions:
+        print(f'{len(regressions)} regression(s) above {args.threshold:.0%}.', file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,146 @@
+"""
+The benchmark cases. Importing this module registers them with the harness.
+
+Inputs are drawn from a seeded generator so that every run times the same
+work.
+"""
+import random
+
+from autograd import AutogradMatrix, Value
+from autograd.functions import tanh
+from autograd.graph import topological_order, value_parents
+from autograd.matrix import Matrix, lazy
+from autograd.matrix import autograd_functions as F
+
+from .harness import benchmark
+
+
+def random_matrix(rows: int, cols: int, seed: int = 0, matrix_type=Matrix, scale: float = 1.0) -> Matrix:
+    generator = random.Random(seed)
+    return matrix_type.from_buffer([generator.uniform(-scale, scale) for _ in range(rows * cols)], (rows, cols))
+
+
+@benchmark('matrix.matmul', n=[32, 64, 128])
+def matmul(n):
+    a, b = random_matrix(n, n, 0), random_matrix(n, n, 1)
+    return lambda: a @ b
+
+
+@benchmark('matrix.elementwise', op=['add', 'multiply', 'exp', 'tanh', 'add_broadcast'], n=[128, 256, 512])
+def elementwise(op, n):
+    a, b = random_matrix(n, n, 0), random_matrix(n, n, 1)
+    row = random_matrix(1, n, 2)
+    return {
+        'add': lambda: a + b,
+        'multiply': lambda: a * b,
+        'exp': lambda: a.exp(),
+        'tanh': lambda: a.tanh(),
+        'add_broadcast': lambda: a + row,
+    }[op]
+
+
+@benchmark('matrix.expression', mode=['eager', 'lazy'], n=[128, 256, 512])
+def expression(mode, n):
+    a, b = random_matrix(n, n, 0), random_matrix(n, n, 1)
+    if mode == 'lazy':
+        return lambda: ((lazy(a) * b + 1).tanh() * 0.5 - b / 2).evaluate()
+    return lambda: (a * b + 1).tanh() * 0.5 - b / 2
+
+
+@benchmark('matrix.reduction', op=['sum_rows', 'max_rows', 'logsumexp_rows'], n=[128, 256, 512])
+def reduction(op, n):
+    a = random_matrix(n, n, 0)
+    return {
+        'sum_rows': lambda: a.sum(axis=1),
+        'max_rows': lambda: a.max(axis=1),
+        'logsumexp_rows': lambda: a.logsumexp(axis=1),
+    }[op]
+
+
+def value_chain(depth: int) -> Value:
+    x = Value(0.5)
+    y = x
+    for _ in range(depth):
+        y = tanh(y * 0.9 + 0.1)
+    return y
+
+
+def value_fan_in(width: int) -> Value:
+    leaves = [Value(i / width) for i in range(width)]
+    total = 0
+    for leaf in leaves:
+        total = total + leaf * leaf
+    return total
+
+
+@benchmark('value.build_graph', shape=['deep', 'wide'], nodes=[1000, 10000])
+def build_graph(shape, nodes):
+    if shape == 'deep':
+        return lambda: value_chain(nodes // 3)
+    return lambda: value_fan_in(nodes // 2)
+
+
+@benchmark('value.backward', shape=['deep', 'wide'], nodes=[1000, 10000])
+def backward(shape, nodes):
+    out = value_chain(nodes // 3) if shape == 'deep' else value_fan_in(nodes // 2)
+    graph = topological_order(out, value_parents)
+
+    def clean_backward():
+        # Gradients accumulate on a retained graph; start every repetition
+        # from zero so that each one is a single backward pass.
+        for node in graph:
+            node.reset_gradient()
+        out.run_backpropagation(cache_order=True)
+
+    return clean_backward
+
+
+@benchmark('autograd_matrix.apply', n=[4, 64])
+def apply(n):
+    a = random_matrix(n, n, 0, AutogradMatrix)
+    b = random_matrix(n, n, 1, AutogradMatrix)
+    return lambda: F.add(a, b)
+
+
+class MLP:
+    """
+    A two-layer perceptron trained with plain gradient descent.
+    """
+
+    def __init__(self, inputs: int, hidden: int, outputs: int, learning_rate: float = 0.1):
+        self.w1 = random_matrix(inputs, hidden, 10, AutogradMatrix, inputs ** -0.5)
+        self.b1 = AutogradMatrix.from_buffer([0.0] * hidden, (1, hidden))
+        self.w2 = random_matrix(hidden, outputs, 11, AutogradMatrix, hidden ** -0.5)
+        self.b2 = AutogradMatrix.from_buffer([0.0] * outputs, (1, outputs))
+        self.learning_rate = learning_rate
+
+    def parameters(self):
+        return [self.w1, self.b1, self.w2, self.b2]
+
+    def loss(self, x: AutogradMatrix, target: Matrix) -> AutogradMatrix:
+        hidden = F.tanh(x @ self.w1 + self.b1)
+        return F.cross_entropy(hidden @ self.w2 + self.b2, target)
+
+    def step(self, x: AutogradMatrix, target: Matrix) -> float:
+        loss = self.loss(x, target)
+        loss.start_backpropagation(retain_graph=False)
+        for parameter in self.parameters():
+            parameter.sub_(parameter.grad * self.learning_rate)
+            parameter.reset_grad()
+        return float(loss)
+
+
+def one_hot(labels, classes: int) -> Matrix:
+    return Matrix.from_buffer([1.0 if label == c else 0.0 for label in labels for c in range(classes)],
+                              (len(labels), classes))
+
+
+@benchmark('training.mlp_step', batch=[32, 128], hidden=[32, 128])
+def mlp_step(batch, hidden):
+    inputs, classes = 16, 4
+    features = random_matrix(batch, inputs, 20)
+    x = AutogradMatrix._from_trusted(features.buffer, features.shape, requires_grad=False)
+    generator = random.Random(21)
+    target = one_hot([generator.randrange(classes) for _ in range(batch)], classes)
+    model = MLP(inputs, hidden, classes)
+    return lambda: model.step(x, target)
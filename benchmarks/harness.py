@@ -0,0 +1,219 @@
+import fnmatch
+import itertools
+import json
+import platform
+import statistics
+import time
+import timeit
+
+from typing import (
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+)
+
+# Relative slowdown of the median time above which a case is reported as
+# a regression, and speed-up below which it is reported as an improvement.
+DEFAULT_THRESHOLD = 0.1
+
+# Minimum time taken by one measurement; fast cases run in a loop until it
+# is reached so that timer resolution does not dominate.
+MIN_MEASUREMENT_TIME = 0.05
+
+
+class Benchmark:
+    """
+    A named benchmark run once for every combination of its parameters.
+
+    ``setup`` is called with one value of each parameter as keyword
+    arguments, builds its inputs outside the timed region and returns the
+    callable to time.
+    """
+
+    def __init__(self, name: str, setup: Callable[..., Callable[[], object]], params: Mapping[str, Sequence]):
+        self.name = name
+        self.setup = setup
+        self.params = dict(params)
+
+    def cases(self, quick: bool = False) -> Iterator[Dict]:
+        """
+        :param quick: Only use the first, smallest value of every size
+            parameter, that is every parameter whose values are numbers
+        :return: Generator of keyword arguments, one per case
+        """
+        names = list(self.params)
+        values = [self.params[name][:1] if quick and _is_size(self.params[name]) else self.params[name]
+                  for name in names]
+        for combination in itertools.product(*values):
+            yield dict(zip(names, combination))
+
+
+def _is_size(values: Sequence) -> bool:
+    return all(isinstance(value, (int, float)) for value in values)
+
+
+_registry: Dict[str, Benchmark] = {}
+
+
+def benchmark(name: str, **params: Sequence):
+    """
+    Register the decorated setup function as a benchmark.
+
+    :param name: Unique name, such as 'matrix.matmul'
+    :param params: Values of each parameter; sizes are numbers, smallest first
+    """
+    def register(setup):
+        if name in _registry:
+            raise ValueError(f'A benchmark named {name!r} is already registered.')
+        _registry[name] = Benchmark(name, setup, params)
+        return setup
+
+    return register
+
+
+def registered_benchmarks() -> List[Benchmark]:
+    return [_registry[name] for name in sorted(_registry)]
+
+
+def case_id(name: str, params: Mapping) -> str:
+    """
+    :return: Identifier of a case, such as 'matrix.matmul[n=64]'
+    """
+    if not params:
+        return name
+    return f"{name}[{','.join(f'{key}={value}' for key, value in params.items())}]"
+
+
+def time_case(function: Callable[[], object], repeat: int = 5) -> Dict:
+    """
+    Time a callable, looping fast ones so every measurement takes at least
+    ``MIN_MEASUREMENT_TIME`` seconds.
+
+    :param function: Callable to time
+    :param repeat: Number of measurements
+    :return: Seconds per call: the minimum, median and mean over the
+        measurements, with the number of calls per measurement
+    """
+    timer = timeit.Timer(function, timer=time.perf_counter)
+    number = 1
+    while True:
+        elapsed = timer.timeit(number)
+        if elapsed >= MIN_MEASUREMENT_TIME:
+            break
+        number *= 10 if elapsed < MIN_MEASUREMENT_TIME / 10 else 2
+    times = [elapsed / number] + [t / number for t in timer.repeat(repeat - 1, number)]
+    return {
+        'number': number,
+        'repeat': repeat,
+        'min': min(times),
+        'median': statistics.median(times),
+        'mean': statistics.mean(times),
+    }
+
+
+def run(patterns: Optional[Sequence[str]] = None, repeat: int = 5, quick: bool = False,
+        report: Optional[Callable[[Dict], None]] = None) -> List[Dict]:
+    """
+    Run the registered benchmarks.
+
+    :param patterns: Shell-style patterns matched against benchmark names;
+        all benchmarks by default
+    :param repeat: Number of measurements per case
+    :param quick: Only run the smallest value of every size parameter
+    :param report: Called with every result as soon as it is measured
+    :return: One result per case, with its name, parameters and timings
+    """
+    if repeat <= 0:
+        raise ValueError('repeat must be positive.')
+
+    results = []
+    for bench in registered_benchmarks():
+        if patterns and not any(fnmatch.fnmatchcase(bench.name, pattern) for pattern in patterns):
+            continue
+        for params in bench.cases(quick):
+            result = {'id': case_id(bench.name, params), 'name': bench.name, 'params': params}
+            result.update(time_case(bench.setup(**params), repeat))
+            if report is not None:
+                report(result)
+            results.append(result)
+    return results
+
+
+def environment() -> Dict:
+    """
+    :return: Description of the machine and interpreter the results come from
+    """
+    from autograd.matrix import get_backend
+
+    return {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'backend': get_backend().name,
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+    }
+
+
+def save_results(results: List[Dict], path: str):
+    with open(path, 'w') as file:
+        json.dump({'environment': environment(), 'results': results}, file, indent=2)
+        file.write('\n')
+
+
+def load_results(path: str) -> List[Dict]:
+    with open(path) as file:
+        return json.load(file)['results']
+
+
+def compare(results: List[Dict], baseline: List[Dict], threshold: float = DEFAULT_THRESHOLD) -> List[Dict]:
+    """
+    Compare median times against a baseline.
+
+    :param results: Results of ``run``
+    :param baseline: Earlier results, as returned by ``load_results``
+    :param threshold: Relative change of the median beyond which a case is
+        a regression or an improvement
+    :return: One row per case in ``results`` with its baseline and current
+        median, their ratio and a status: 'regression', 'improvement',
+        'unchanged', or 'new' when the case is not in the baseline
+    """
+    previous = {result['id']: result for result in baseline}
+    rows = []
+    for result in results:
+        row = {'id': result['id'], 'median': result['median'], 'baseline': None, 'ratio': None, 'status': 'new'}
+        if result['id'] in previous:
+            row['baseline'] = previous[result['id']]['median']
+            row['ratio'] = result['median'] / row['baseline']
+            if row['ratio'] > 1 + threshold:
+                row['status'] = 'regression'
+            elif row['ratio'] < 1 / (1 + threshold):
+                row['status'] = 'improvement'
+            else:
+                row['status'] = 'unchanged'
+        rows.append(row)
+    return rows
+
+
+def format_time(seconds: float) -> str:
+    for unit, scale in (('s', 1), ('ms', 1e-3), ('us', 1e-6)):
+        if seconds >= scale:
+            return f'{seconds / scale:.3g} {unit}'
+    return f'{seconds / 1e-9:.3g} ns'
+
+
+def print_result(result: Dict, file=None):
+    print(f"{result['id']:<48} {format_time(result['median']):>10}  (min {format_time(result['min'])})", file=file)
+
+
+def print_comparison(rows: List[Dict], file=None):
+    for row in rows:
+        if row['baseline'] is None:
+            change = 'new'
+        else:
+            change = f"{row['ratio']:.2f}x  {row['status']}"
+        print(f"{row['id']:<48} {format_time(row['median']):>10}  {change}", file=file)
@@ -1,7 +1,10 @@
+import gc
 import unittest
+import weakref
 
-from autograd import AutogradMatrix
+from autograd import AutogradMatrix, matrix_jacobian, matrix_vjp
 
+from autograd.matrix import Matrix
 from autograd.matrix import autograd_functions as F
 
 
@@ -66,7 +69,7 @@ class TestOperations(unittest.TestCase):
     def test_addition_against_numerical_gradient(self):
         z = self.x + self.y
         z._grad = AutogradMatrix.ones(*z.shape)
-        self.x.backward()
+        z.backward()
         x2, y2 = AutogradMatrix(self.x.data), AutogradMatrix(self.y.data)
         numerical_grad = eval_numerical_gradient_array_for_x(x2, y2, F.Addition.apply)
         self.matrices_almost_equal(numerical_grad, self.x.grad)
@@ -74,7 +77,7 @@ class TestOperations(unittest.TestCase):
     def test_mul_against_numerical_gradient(self):
         z = self.x * self.y
         z._grad = AutogradMatrix.ones(*z.shape)
-        self.x.backward()
+        z.backward()
         x2, y2 = AutogradMatrix(self.x.data), AutogradMatrix(self.y.data)
         numerical_grad = eval_numerical_gradient_array_for_x(x2, y2, F.Multiplication.apply)
         self.matrices_almost_equal(numerical_grad, self.x.grad)
@@ -82,8 +85,7 @@ class TestOperations(unittest.TestCase):
     def test_matmul_against_numerical_gradient(self):
         z = self.x @ self.y
         z._grad = AutogradMatrix.ones(*z.shape)
-        self.x.backward()
-        self.y.backward()
+        z.backward()
 
         x2, y2 = AutogradMatrix(self.x.data), AutogradMatrix(self.y.data)
         numerical_grad = eval_numerical_gradient_array_for_x(x2, y2, F.MatrixMultiply.apply)
@@ -96,7 +98,7 @@ class TestOperations(unittest.TestCase):
     def test_power_against_numerical_gradient(self):
         z = self.x ** 2
         z._grad = AutogradMatrix.ones(*z.shape)
-        self.x.backward()
+        z.backward()
         x2 = AutogradMatrix(self.x.data)
         numerical_grad = eval_numerical_gradient_array_for_x(x2, 2, F.Power.apply)
         self.matrices_almost_equal(numerical_grad, self.x.grad)
@@ -104,19 +106,190 @@ class TestOperations(unittest.TestCase):
     def test_div_against_numerical_gradient(self):
         z = self.x / 3
         z._grad = AutogradMatrix.ones(*z.shape)
-        self.x.backward()
+        z.backward()
         x2 = AutogradMatrix(self.x.data)
         numerical_grad = eval_numerical_gradient_array_for_x(x2, 3, F.Division.apply)
         self.matrices_almost_equal(numerical_grad, self.x.grad)
 
+    def test_scalar_mul_against_numerical_gradient(self):
+        z = self.x * 3
+        z._grad = AutogradMatrix.ones(*z.shape)
+        z.backward()
+        x2 = AutogradMatrix(self.x.data)
+        numerical_grad = eval_numerical_gradient_array_for_x(x2, 3, F.Multiplication.apply)
+        self.matrices_almost_equal(numerical_grad, self.x.grad)
+
     def test_exp_against_numerical_gradient(self):
         z = self.x.exp()
         z._grad = AutogradMatrix.ones(*z.shape)
-        self.x.backward()
+        z.backward()
         x2 = AutogradMatrix(self.x.data)
         numerical_grad = eval_numerical_gradient_array_for_x(x2, None, F.Exp.apply)
         self.matrices_almost_equal(numerical_grad, self.x.grad)
 
+    def test_broadcast_gradients_against_numerical_gradient(self):
+        row = AutogradMatrix([[0.5, -2]])
+        column = AutogradMatrix([[3], [-1.5]])
+        for function in (F.Addition, F.Multiplication, F.Division):
+            for y in (row, column):
+                x, y = AutogradMatrix(self.x.data), AutogradMatrix(y.data)
+                z = function.apply(x, y)
+                self.assertEqual(z.shape, (2, 2))
+                z.start_backpropagation()
+                self.assertEqual(y.grad.shape, y.shape)
+
+                x2, y2 = AutogradMatrix(self.x.data), AutogradMatrix(y.data)
+                self.matrices_almost_equal(eval_numerical_gradient_array_for_x(x2, y2, function.apply), x.grad)
+                self.matrices_almost_equal(eval_numerical_gradient_array_for_y(x2, y2, function.apply), y.grad)
+
+                # The broadcast operand on the left hand side.
+                y.reset_grad()
+                function.apply(y, x).start_backpropagation()
+                self.matrices_almost_equal(eval_numerical_gradient_array_for_x(y2, x2, function.apply), y.grad)
+
+    def test_dense_layer_with_bias(self):
+        bias = AutogradMatrix([[1, -1]])
+        (self.x @ self.y + bias).relu().start_backpropagation()
+        self.assertEqual(bias.grad.data, [[2, 2]])
+        self.assertEqual(self.x.grad.data, (AutogradMatrix.ones(2, 2) @ self.y.T).data)
+
+    def test_reductions_against_numerical_gradient(self):
+        x = AutogradMatrix([
+            [1, -2, 0.5],
+            [3, 0.25, -1],
+        ])
+        for function in (F.Sum, F.Mean, F.Max, F.LogSumExp):
+            for axis in (None, 0, 1):
+                x.reset_grad()
+                weights = AutogradMatrix([[2, -1, 0.5]]) if axis == 0 else AutogradMatrix([[2], [-1]])
+
+                def f(x, axis):
+                    return function.apply(x, axis) * weights
+
+                f(x, axis).start_backpropagation()
+                numerical_grad = eval_numerical_gradient_array_for_x(AutogradMatrix(x.data), axis, f)
+                self.matrices_almost_equal(numerical_grad, x.grad)
+
+    def test_reduction_shapes(self):
+        x = AutogradMatrix([
+            [1, -2, 0.5],
+            [3, 0.25, -1],
+        ])
+        self.assertEqual(x.sum().shape, (1, 1))
+        self.assertEqual(x.mean(axis=0).shape, (1, 3))
+        self.assertEqual(x.max(axis=1).data, [[1], [3]])
+        self.assertAlmostEqual(float(x.logsumexp()), 3.2672766, places=6)
+        with self.assertRaises(ValueError):
+            x.sum(axis=2)
+
+    def test_max_splits_gradient_between_ties(self):
+        x = AutogradMatrix([[2, 1, 2]])
+        x.max().start_backpropagation()
+        self.assertEqual(x.grad.data, [[0.5, 0, 0.5]])
+
+    def test_loss_reduced_in_graph(self):
+        logits = self.x @ self.y
+        loss = (logits.logsumexp(axis=1) - logits.max(axis=1)).mean()
+        loss.start_backpropagation()
+
+        x2 = AutogradMatrix(self.x.data)
+        numerical_grad = eval_numerical_gradient_array_for_x(
+            x2, self.y, lambda x, y: ((x @ y).logsumexp(axis=1) - (x @ y).max(axis=1)).mean())
+        self.matrices_almost_equal(numerical_grad, self.x.grad)
+
+    def test_float32_gradients(self):
+        x = AutogradMatrix(self.x.data, dtype='float32')
+        y = AutogradMatrix(self.y.data, dtype='float32')
+        bias = AutogradMatrix([[0.5, -0.5]], dtype='float32')
+        loss = F.cross_entropy((x @ y + bias).tanh(), AutogradMatrix([[1, 0], [0, 1]], dtype='float32'))
+        self.assertEqual(loss.dtype, 'float32')
+        loss.start_backpropagation()
+
+        x64, y64, bias64 = AutogradMatrix(self.x.data), AutogradMatrix(self.y.data), AutogradMatrix([[0.5, -0.5]])
+        F.cross_entropy((x64 @ y64 + bias64).tanh(), AutogradMatrix([[1, 0], [0, 1]])).start_backpropagation()
+
+        for leaf, reference in ((x, x64), (y, y64), (bias, bias64)):
+            self.assertEqual(leaf.grad.dtype, 'float32')
+            for a, b in zip(leaf.grad.buffer, reference.grad.buffer):
+                self.assertAlmostEqual(a, b, places=5)
+
+    def check_unary_function(self, function, x):
+        z = function.apply(x)
+        z._grad = AutogradMatrix.ones(*z.shape)
+        z.backward()
+        numerical_grad = eval_numerical_gradient_array_for_x(AutogradMatrix(x.data), None, function.apply)
+        self.matrices_almost_equal(numerical_grad, x.grad)
+
+    def test_activations_against_numerical_gradient(self):
+        x = AutogradMatrix([
+            [-1.5, 0.5],
+            [2, -0.25],
+        ])
+        for function in (F.Sigmoid, F.Tanh, F.Relu):
+            x.reset_grad()
+            self.check_unary_function(function, x)
+
+    def test_softmax_against_numerical_gradient(self):
+        weights = AutogradMatrix([
+            [1, -2],
+            [0.5, 3],
+        ])
+
+        def f(x, y):
+            return F.softmax(x) * weights
+
+        f(self.x, None).start_backpropagation()
+        numerical_grad = eval_numerical_gradient_array_for_x(AutogradMatrix(self.x.data), None, f)
+        self.matrices_almost_equal(numerical_grad, self.x.grad)
+
+        for row in F.softmax(self.x).data:
+            self.assertAlmostEqual(sum(row), 1)
+
+    def test_affine_against_numerical_gradient(self):
+        z = F.affine(self.x, 3, -2)
+        self.assertEqual(z.data, [[1, 4], [7, 10]])
+        z._grad = AutogradMatrix.ones(*z.shape)
+        z.backward()
+        numerical_grad = eval_numerical_gradient_array_for_x(AutogradMatrix(self.x.data), (3, -2), F.Affine.apply)
+        self.matrices_almost_equal(numerical_grad, self.x.grad)
+
+    def test_mse_loss_against_numerical_gradient(self):
+        loss = F.mse_loss(self.x, self.y)
+        self.assertEqual(loss.shape, (1, 1))
+        self.assertAlmostEqual(loss[0, 0], 16)
+
+        loss.start_backpropagation()
+        x2, y2 = AutogradMatrix(self.x.data), AutogradMatrix(self.y.data)
+        numerical_grad = eval_numerical_gradient_array_for_x(x2, y2, F.MeanSquaredError.apply)
+        self.matrices_almost_equal(numerical_grad, self.x.grad)
+        numerical_grad = eval_numerical_gradient_array_for_y(x2, y2, F.MeanSquaredError.apply)
+        self.matrices_almost_equal(numerical_grad, self.y.grad)
+
+    def test_cross_entropy_against_numerical_gradient(self):
+        target = AutogradMatrix([
+            [0, 1],
+            [0.25, 0.75],
+        ])
+        loss = F.cross_entropy(self.x, target)
+        loss.start_backpropagation()
+        x2, y2 = AutogradMatrix(self.x.data), AutogradMatrix(target.data)
+        numerical_grad = eval_numerical_gradient_array_for_x(x2, y2, F.CrossEntropy.apply)
+        self.matrices_almost_equal(numerical_grad, self.x.grad)
+        numerical_grad = eval_numerical_gradient_array_for_y(x2, y2, F.CrossEntropy.apply)
+        self.matrices_almost_equal(numerical_grad, target.grad)
+
+    def test_cross_entropy_is_stable_for_large_logits(self):
+        logits = AutogradMatrix([[1000, 0]])
+        target = AutogradMatrix([[0, 1]])
+        loss = F.cross_entropy(logits, target)
+        self.assertAlmostEqual(loss[0, 0], 1000)
+        loss.start_backpropagation()
+        self.assertEqual(logits.grad.data, [[1, -1]])
+
+    def test_loss_target_must_match_input_shape(self):
+        with self.assertRaises(ValueError):
+            F.mse_loss(self.x, AutogradMatrix([[1, 2]]))
+
 
 class TestBackprop(unittest.TestCase):
 
@@ -204,6 +377,133 @@ class TestBackprop(unittest.TestCase):
         numerical_grad = eval_numerical_gradient_array_for_x(x_copy, b2_copy, f)
         self.matrices_almost_equal(numerical_grad, self.x.grad)
 
+    def test_fan_out_gradients_are_accumulated(self):
+        z = self.x @ self.w1 + self.x @ self.w1
+        z.start_backpropagation()
+
+        expected = (AutogradMatrix.ones(*z.shape) @ self.w1.T) * 2
+        self.matrices_almost_equal(expected, self.x.grad)
+
+    def test_backpropagation_without_retaining_graph(self):
+        hidden = self.x @ self.w1 + self.b1
+        hidden_ref = weakref.ref(hidden)
+        z = hidden @ self.w2 + self.b2
+        del hidden
+
+        z.start_backpropagation(retain_graph=False)
+        gc.collect()
+
+        self.assertIsNone(hidden_ref())
+        self.assertEqual(z._previous_nodes, set())
+        self.assertIsNone(z._function)
+
+        x_copy, w1_copy, b1_copy, w2_copy, b2_copy = AutogradMatrix(self.x.data), AutogradMatrix(self.w1.data), \
+                                                     AutogradMatrix(self.b1.data), AutogradMatrix(self.w2.data), \
+                                                     AutogradMatrix(self.b2.data)
+        z_copy = (x_copy @ w1_copy + b1_copy) @ w2_copy + b2_copy
+        z_copy.start_backpropagation()
+        self.matrices_almost_equal(w1_copy.grad, self.w1.grad)
+        self.matrices_almost_equal(x_copy.grad, self.x.grad)
+
+    def test_gradient_buffers_are_allocated_on_first_use(self):
+        """
+        Test that no gradient buffer exists before a gradient reaches a
+        node, and that the first one is copied rather than shared.
+        """
+        a, b = AutogradMatrix([[1, 2]]), AutogradMatrix([[3, 4]])
+        z = a + b
+        self.assertIsNone(a._grad)
+        self.assertIsNone(z._grad)
+
+        z.start_backpropagation()
+        self.assertEqual(a.grad.data, [[1, 1]])
+        self.assertIsNot(a.grad.buffer, z.grad.buffer)
+        self.assertIsNot(a.grad.buffer, b.grad.buffer)
+
+        a.grad.add_(1)
+        self.assertEqual(b.grad.data, [[1, 1]])
+        self.assertEqual(AutogradMatrix([[1, 2]]).grad.data, [[0, 0]])
+
+    def test_gradients_are_accumulated_in_place(self):
+        grad_buffer = self.w1.grad.buffer
+        (self.x @ self.w1).start_backpropagation()
+        (self.x @ self.w1).start_backpropagation()
+
+        self.assertIs(self.w1.grad.buffer, grad_buffer)
+        self.assertAlmostEqual(self.w1.grad[3][0], 8.0)
+
+        self.w1.reset_grad()
+        self.assertIs(self.w1.grad.buffer, grad_buffer)
+        self.assertEqual(self.w1.grad.sum(), 0.0)
+
+    def test_augmented_assignment_builds_graph(self):
+        z = self.x @ self.w1
+        buffer = z.buffer
+        z += self.b1
+        self.assertIsNot(z.buffer, buffer)
+        self.assertIn(self.b1, z._previous_nodes)
+
+    def test_cached_topological_order(self):
+        z = self.x @ self.w1 + self.b1
+        z.start_backpropagation(cache_order=True)
+        order = z._topo_cache
+        self.assertIs(order[-1], z)
+        self.assertEqual(len(order), 5)
+
+        z.start_backpropagation()
+        self.assertIs(z._topo_cache, order)
+
+        z.clear_order_cache()
+        self.assertIsNone(z._topo_cache)
+
+
+    def test_seed_gradient(self):
+        """
+        Test that the gradient passed to start_backpropagation is propagated
+        instead of ones.
+        """
+        seed = Matrix([[1.0, -2.0, 0.5]])
+        (self.x @ self.w1).start_backpropagation(grad=seed)
+        self.matrices_almost_equal(self.x.T @ seed, self.w1.grad)
+
+        with self.assertRaises(ValueError):
+            (self.x @ self.w1).start_backpropagation(grad=Matrix([[1.0]]))
+
+    def test_matrix_vjp_reuses_one_graph(self):
+        """
+        Test that every cotangent gives the gradients of a separate graph
+        seeded with it, and that the inputs passed in are left untouched.
+        """
+        def f(x, w1, b1):
+            return (x @ w1 + b1).tanh()
+
+        cotangents = [Matrix([[1.0, 0.0, 0.0]]), Matrix([[0.5, -1.0, 2.0]])]
+        output, products = matrix_vjp(f, [self.x, self.w1, self.b1], cotangents, batched=True)
+        self.assertEqual(output.shape, (1, 3))
+        self.assertIsNone(self.w1._grad)
+
+        for cotangent, gradients in zip(cotangents, products):
+            inputs = [AutogradMatrix(m.data) for m in (self.x, self.w1, self.b1)]
+            f(*inputs).start_backpropagation(grad=cotangent)
+            for expected, actual in zip(inputs, gradients):
+                self.matrices_almost_equal(expected.grad, actual)
+
+        _, single = matrix_vjp(f, [self.x, self.w1, self.b1], cotangents[1])
+        self.matrices_almost_equal(products[1][1], single[1])
+
+    def test_matrix_jacobian(self):
+        """
+        Test the Jacobian of an element-wise function, which is diagonal.
+        """
+        x = Matrix([[1.0, 2.0], [3.0, 4.0]])
+        jacobian = matrix_jacobian(lambda t: t * t, x)
+        self.assertEqual(jacobian.shape, (4, 4))
+        self.assertEqual(jacobian.data, [[2.0 * x.buffer[i] if i == j else 0.0 for j in range(4)] for i in range(4)])
+
+        jacobians = matrix_jacobian(lambda x, w1: x @ w1, [self.x, self.w1])
+        self.assertEqual([j.shape for j in jacobians], [(3, 4), (3, 12)])
+        self.matrices_almost_equal(self.w1.T, jacobians[0])
+
 
 if __name__ == '__main__':
     unittest.main()
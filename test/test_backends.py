@@ -0,0 +1,211 @@
+import threading
+import unittest
+
+from autograd import AutogradMatrix
+from autograd.matrix import (
+    Matrix,
+    PythonBackend,
+    available_backends,
+    get_backend,
+    register_backend,
+    set_backend,
+    use_backend,
+)
+from autograd.matrix import backends
+from autograd.matrix import autograd_functions as F
+
+
+class CountingBackend(PythonBackend):
+
+    name = 'counting'
+
+    def __init__(self):
+        self.calls = 0
+
+    def add(self, x, y):
+        self.calls += 1
+        return super().add(x, y)
+
+
+class TestBackendRegistry(unittest.TestCase):
+
+    def setUp(self):
+        self.x = Matrix([
+            [1, 2],
+            [3, 4],
+        ])
+        self.y = Matrix([
+            [5, 6],
+            [7, 8],
+        ])
+
+    def tearDown(self):
+        set_backend('python')
+
+    def test_python_backend_is_the_default(self):
+        """
+        Test that the pure-Python reference backend is active by default.
+        """
+        self.assertEqual(get_backend().name, 'python')
+        self.assertIn('python', available_backends())
+
+    def test_unknown_backend_raises(self):
+        """
+        Test that selecting an unregistered backend raises a ValueError.
+        """
+        with self.assertRaises(ValueError):
+            set_backend('does-not-exist')
+
+        with self.assertRaises(TypeError):
+            register_backend(object())
+
+    def test_matrix_dispatches_through_active_backend(self):
+        """
+        Test that Matrix operations go through the selected backend and that
+        use_backend restores the previous one on exit.
+        """
+        counting = CountingBackend()
+        register_backend(counting)
+
+        with use_backend('counting'):
+            self.assertIs(get_backend(), counting)
+            result = self.x + self.y
+
+        self.assertEqual(counting.calls, 1)
+        self.assertEqual(result.data, [[6.0, 8.0], [10.0, 12.0]])
+        self.assertEqual(get_backend().name, 'python')
+
+        self.x + self.y
+        self.assertEqual(counting.calls, 1)
+
+    def test_use_backend_is_per_thread(self):
+        """
+        Test that use_backend in one thread leaves other threads on the
+        default backend, and that set_backend changes it for every thread.
+        """
+        counting = CountingBackend()
+        register_backend(counting)
+        entered, release = threading.Event(), threading.Event()
+        seen = []
+
+        def with_counting_backend():
+            with use_backend('counting'):
+                entered.set()
+                release.wait(5)
+                seen.append(get_backend())
+
+        thread = threading.Thread(target=with_counting_backend)
+        thread.start()
+        try:
+            self.assertTrue(entered.wait(5))
+            self.assertEqual(get_backend().name, 'python')
+        finally:
+            release.set()
+            thread.join()
+        self.assertEqual(seen, [counting])
+
+        set_backend('counting')
+        thread = threading.Thread(target=lambda: seen.append(get_backend()))
+        thread.start()
+        thread.join()
+        self.assertIs(seen[-1], counting)
+
+
+@unittest.skipIf(backends.numpy is None, 'NumPy is not installed.')
+class TestNumpyBackend(unittest.TestCase):
+
+    def setUp(self):
+        self.x = Matrix([
+            [1, 2, 3],
+            [4, 5, 6],
+        ])
+        self.y = Matrix([
+            [0.5, -1, 2],
+            [3, 0.25, -2],
+        ])
+
+    def assert_same_on_both_backends(self, f):
+        expected = f()
+        with use_backend('numpy'):
+            actual = f()
+        for e, a in zip(expected.buffer, actual.buffer):
+            self.assertAlmostEqual(e, a)
+        self.assertEqual(expected.shape, actual.shape)
+
+    def test_kernels_match_reference_backend(self):
+        """
+        Test that the NumPy backend gives the same results as the reference one.
+        """
+        self.assert_same_on_both_backends(lambda: self.x + self.y)
+        self.assert_same_on_both_backends(lambda: self.x - self.y)
+        self.assert_same_on_both_backends(lambda: self.x * self.y)
+        self.assert_same_on_both_backends(lambda: self.x * 3)
+        self.assert_same_on_both_backends(lambda: self.x ** 2)
+        self.assert_same_on_both_backends(lambda: self.x.exp())
+        self.assert_same_on_both_backends(lambda: self.x.T)
+        self.assert_same_on_both_backends(lambda: self.x @ self.y.T)
+        self.assert_same_on_both_backends(lambda: self.x + Matrix([[1, 2, 3]]))
+        self.assert_same_on_both_backends(lambda: Matrix([[2], [4]]) / self.x)
+        for axis in (None, 0, 1):
+            self.assert_same_on_both_backends(lambda: AutogradMatrix(self.y.data).sum(axis=axis))
+            self.assert_same_on_both_backends(lambda: AutogradMatrix(self.y.data).max(axis=axis))
+            self.assert_same_on_both_backends(lambda: AutogradMatrix(self.y.data).logsumexp(axis=axis))
+
+    def test_fused_kernels_match_reference_backend(self):
+        """
+        Test that the NumPy activation and loss kernels give the same results
+        as the reference ones.
+        """
+        self.assert_same_on_both_backends(lambda: self.y.sigmoid())
+        self.assert_same_on_both_backends(lambda: self.y.tanh())
+        self.assert_same_on_both_backends(lambda: self.y.relu())
+        self.assert_same_on_both_backends(lambda: self.x.softmax())
+        self.assert_same_on_both_backends(lambda: F.affine(AutogradMatrix(self.x.data), 2, 1))
+        self.assert_same_on_both_backends(lambda: F.mse_loss(AutogradMatrix(self.x.data), self.y))
+        self.assert_same_on_both_backends(lambda: F.cross_entropy(AutogradMatrix(self.x.data), self.x.softmax()))
+
+        def grad_of_cross_entropy():
+            logits = AutogradMatrix(self.y.data)
+            F.cross_entropy(logits, self.x.softmax()).start_backpropagation()
+            return logits.grad
+
+        self.assert_same_on_both_backends(grad_of_cross_entropy)
+
+        def grad_of_max():
+            x = AutogradMatrix([[2, 1, 2], [0, 3, 3]])
+            x.max(axis=1).start_backpropagation()
+            return x.grad
+
+        self.assert_same_on_both_backends(grad_of_max)
+
+    def test_float32_kernels(self):
+        """
+        Test that the NumPy backend keeps float32 results in float32 buffers.
+        """
+        x, y = self.x.astype('float32'), self.y.astype('float32')
+        self.assert_same_on_both_backends(lambda: x * y + 1)
+        self.assert_same_on_both_backends(lambda: x @ y.T)
+        self.assert_same_on_both_backends(lambda: (x - Matrix([[1, 2, 3]], dtype='float32')).sigmoid())
+        with use_backend('numpy'):
+            self.assertEqual((x @ y.T).dtype, 'float32')
+            self.assertEqual((x.softmax() * 2).dtype, 'float32')
+            self.assertEqual((x + self.y).dtype, 'float64')
+            self.assertEqual(Matrix.ones(2, 2, dtype='float32').dtype, 'float32')
+
+    def test_inplace_kernels(self):
+        """
+        Test that the NumPy in-place kernels write into the matrix buffer.
+        """
+        with use_backend('numpy'):
+            buffer = self.x.buffer
+            self.x += self.y
+            self.x *= 2
+            self.assertIs(self.x.buffer, buffer)
+            self.assertEqual(self.x.data, [[3.0, 2.0, 10.0], [14.0, 10.5, 8.0]])
+
+            self.x.zero_()
+            self.assertEqual(self.x.sum(), 0.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
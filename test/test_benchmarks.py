@@ -0,0 +1,72 @@
+import contextlib
+import io
+import json
+import os
+import tempfile
+import unittest
+
+from benchmarks import harness
+from benchmarks.__main__ import main
+from benchmarks.harness import Benchmark, case_id, compare
+
+
+class TestHarness(unittest.TestCase):
+
+    def setUp(self):
+        self.min_time = harness.MIN_MEASUREMENT_TIME
+        harness.MIN_MEASUREMENT_TIME = 0.001
+
+    def tearDown(self):
+        harness.MIN_MEASUREMENT_TIME = self.min_time
+
+    def test_cases_cover_every_combination(self):
+        """
+        Test that a benchmark has one case per combination of its
+        parameters, or per non-size parameter when quick.
+        """
+        bench = Benchmark('example', lambda op, n: None, {'op': ['add', 'exp'], 'n': [8, 16]})
+        self.assertEqual(len(list(bench.cases())), 4)
+        self.assertEqual(list(bench.cases(quick=True)), [{'op': 'add', 'n': 8}, {'op': 'exp', 'n': 8}])
+        self.assertEqual(case_id('example', {'op': 'add', 'n': 8}), 'example[op=add,n=8]')
+
+    def test_compare_with_baseline(self):
+        """
+        Test the status given to each case by comparing medians.
+        """
+        baseline = [{'id': 'a', 'median': 1.0}, {'id': 'b', 'median': 1.0}, {'id': 'c', 'median': 1.0}]
+        results = [{'id': 'a', 'median': 1.5}, {'id': 'b', 'median': 0.5},
+                   {'id': 'c', 'median': 1.05}, {'id': 'd', 'median': 1.0}]
+        rows = compare(results, baseline, threshold=0.1)
+        self.assertEqual([row['status'] for row in rows], ['regression', 'improvement', 'unchanged', 'new'])
+        self.assertAlmostEqual(rows[0]['ratio'], 1.5)
+
+    def test_command_line_writes_and_compares_results(self):
+        """
+        Test that a quick run writes JSON results that a later run compares against.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'results.json')
+            with contextlib.redirect_stdout(io.StringIO()):
+                self.assertEqual(main(['autograd_matrix.*', '--quick', '--repeat', '1', '--output', path]), 0)
+            with open(path) as file:
+                saved = json.load(file)
+            self.assertEqual(saved['environment']['backend'], 'python')
+            self.assertEqual([result['id'] for result in saved['results']], ['autograd_matrix.apply[n=4]'])
+            self.assertGreater(saved['results'][0]['median'], 0)
+
+            output = io.StringIO()
+            with contextlib.redirect_stdout(output):
+                main(['autograd_matrix.*', '--quick', '--repeat', '1', '--baseline', path, '--threshold', '100'])
+            self.assertIn('unchanged', output.getvalue())
+
+    def test_unknown_backend_is_a_usage_error(self):
+        """
+        Test that an unknown backend is rejected by the argument parser.
+        """
+        with contextlib.redirect_stderr(io.StringIO()) as error, self.assertRaises(SystemExit):
+            main(['--backend', 'missing'])
+        self.assertIn('invalid choice', error.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main()
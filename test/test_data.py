@@ -0,0 +1,152 @@
+import os
+import tempfile
+import threading
+import unittest
+
+from array import array
+
+from autograd import AutogradMatrix
+from autograd import data
+from autograd.data import (
+    DataLoader,
+    batch_rows,
+    prefetch,
+    read_binary,
+    read_csv,
+)
+
+
+class TestReaders(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.rows = [[float(3 * i + j) for j in range(3)] for i in range(10)]
+
+        self.csv_path = os.path.join(self.directory.name, 'rows.csv')
+        with open(self.csv_path, 'w') as file:
+            file.write('a,b,c\n')
+            for row in self.rows:
+                file.write(','.join(str(v) for v in row) + '\n')
+
+        self.binary_path = os.path.join(self.directory.name, 'rows.bin')
+        values = array('d', [v for row in self.rows for v in row])
+        with open(self.binary_path, 'wb') as file:
+            file.write(values.tobytes())
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_read_csv(self):
+        """
+        Test that CSV rows are streamed as arrays of floats.
+        """
+        rows = [list(row) for row in read_csv(self.csv_path, skip_header=True)]
+        self.assertEqual(rows, self.rows)
+
+        rows = [list(row) for row in read_csv(self.csv_path, columns=[2, 0], skip_header=True)]
+        self.assertEqual(rows[1], [5.0, 3.0])
+
+        with self.assertRaises(ValueError):
+            list(read_csv(self.csv_path))
+
+    def test_read_binary_in_chunks(self):
+        """
+        Test that binary rows are read in chunks and split into rows.
+        """
+        chunk_rows = data.BINARY_CHUNK_ROWS
+        data.BINARY_CHUNK_ROWS = 4
+        try:
+            rows = [list(row) for row in read_binary(self.binary_path, 3)]
+        finally:
+            data.BINARY_CHUNK_ROWS = chunk_rows
+        self.assertEqual(rows, self.rows)
+
+        with self.assertRaises(ValueError):
+            list(read_binary(self.binary_path, 4))
+
+    def test_loader_epochs(self):
+        """
+        Test that every iteration over a DataLoader reads the source again.
+        """
+        loader = DataLoader.from_binary(self.binary_path, 3, batch_size=4, target_columns=1)
+        for _ in range(2):
+            batches = list(loader)
+            self.assertEqual([x.shape for x, _ in batches], [(4, 2), (4, 2), (2, 2)])
+            self.assertEqual(batches[2][0].data, [row[:2] for row in self.rows[8:]])
+            self.assertEqual(batches[2][1].data, [row[2:] for row in self.rows[8:]])
+
+        loader = DataLoader.from_csv(self.csv_path, batch_size=4, skip_header=True, drop_last=True, prefetch=0)
+        self.assertEqual(len(list(loader)), 2)
+
+        loader = DataLoader.from_binary(self.binary_path, 3, batch_size=4, dtype='float32')
+        batches = list(loader)
+        self.assertEqual(batches[0].dtype, 'float32')
+        self.assertEqual(batches[0].data, self.rows[:4])
+
+
+class TestBatching(unittest.TestCase):
+
+    def test_batches_are_autograd_matrices(self):
+        """
+        Test that batches are AutogradMatrix instances built from the rows,
+        which do not require gradients.
+        """
+        batches = list(batch_rows([[1, 2], [3, 4], [5, 6]], 2))
+        self.assertIsInstance(batches[0], AutogradMatrix)
+        self.assertFalse(batches[0].requires_grad)
+        x, y = next(batch_rows([[1, 2, 3]], 1, target_columns=1))
+        self.assertFalse(x.requires_grad or y.requires_grad)
+        self.assertEqual(batches[0].data, [[1, 2], [3, 4]])
+        self.assertEqual(batches[1].data, [[5, 6]])
+        self.assertEqual(len(list(batch_rows([[1, 2], [3, 4], [5, 6]], 2, drop_last=True))), 1)
+
+    def test_rows_of_different_lengths_are_rejected(self):
+        with self.assertRaises(ValueError):
+            list(batch_rows([[1, 2], [3]], 2))
+        with self.assertRaises(ValueError):
+            list(batch_rows([[1, 2]], 2, target_columns=2))
+
+
+class TestPrefetch(unittest.TestCase):
+
+    def test_items_are_produced_in_order(self):
+        self.assertEqual(list(prefetch(range(100), depth=3)), list(range(100)))
+
+    def test_producer_runs_ahead_on_another_thread(self):
+        """
+        Test that the next item is produced while the current one is used.
+        """
+        produced = threading.Event()
+        threads = []
+
+        def items():
+            threads.append(threading.current_thread())
+            yield 1
+            produced.set()
+            yield 2
+
+        iterator = prefetch(items())
+        self.assertEqual(next(iterator), 1)
+        self.assertTrue(produced.wait(timeout=5))
+        self.assertIsNot(threads[0], threading.current_thread())
+        self.assertEqual(list(iterator), [2])
+
+    def test_errors_are_raised_in_the_consumer(self):
+        def items():
+            yield 1
+            raise RuntimeError('broken source')
+
+        iterator = prefetch(items())
+        self.assertEqual(next(iterator), 1)
+        with self.assertRaises(RuntimeError):
+            next(iterator)
+
+    def test_closing_stops_the_producer(self):
+        iterator = prefetch(iter(range(10 ** 9)))
+        next(iterator)
+        iterator.close()
+        self.assertFalse(any(thread.name == 'autograd-prefetch' for thread in threading.enumerate()))
+
+
+if __name__ == '__main__':
+    unittest.main()
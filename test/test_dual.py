@@ -0,0 +1,206 @@
+import unittest
+
+from autograd import Dual, Value, jacobian, jvp, vjp
+from autograd.functions import relu, sigmoid, tanh
+
+
+def model(x, y):
+    z = sigmoid(x * y + 1) * y
+    return tanh(z) + relu(x) / y - z ** 2
+
+
+class TestDual(unittest.TestCase):
+
+    def test_operators_propagate_tangents(self):
+        """
+        Test the primal and tangent parts of basic operators.
+        """
+        x = Dual(3.0, 1.0)
+        out = x * x + 2 * x - 1
+
+        self.assertEqual(out.primal, 14.0)
+        self.assertEqual(out.tangent, 8.0)
+
+        out = 1 / x
+        self.assertAlmostEqual(out.primal, 1 / 3)
+        self.assertAlmostEqual(out.tangent, -1 / 9)
+
+    def test_forward_mode_matches_reverse_mode(self):
+        """
+        Test that directional derivatives equal the reverse-mode gradient
+        projected on the direction.
+        """
+        x, y = Value(0.7), Value(-1.3)
+        out = model(x, y)
+        out.run_backpropagation()
+
+        value, tangent = jvp(model, [0.7, -1.3], [1.0, 0.0])
+        self.assertAlmostEqual(value, out.data)
+        self.assertAlmostEqual(tangent, x.gradient)
+
+        _, tangent = jvp(model, [0.7, -1.3], [2.0, 3.0])
+        self.assertAlmostEqual(tangent, 2 * x.gradient + 3 * y.gradient)
+
+    def test_jvp_with_several_outputs(self):
+        """
+        Test jvp on a function of one input returning several outputs.
+        """
+        values, tangents = jvp(lambda t: [t ** 3, sigmoid(t), 5], 2.0, 1.0)
+
+        self.assertEqual(values[0], 8.0)
+        self.assertAlmostEqual(tangents[0], 12.0)
+        self.assertAlmostEqual(tangents[1], sigmoid(Value(2.0)).data * (1 - sigmoid(Value(2.0)).data))
+        self.assertEqual(tangents[2], 0)
+
+    def test_batched_duals(self):
+        """
+        Test forward mode on batched data.
+        """
+        value, tangent = jvp(lambda t: (t * t).sum(), [[1.0, 2.0, 3.0]], [[1.0, 1.0, 1.0]])
+        self.assertEqual(value, 14.0)
+        self.assertEqual(tangent, 12.0)
+
+    def test_power_with_respect_to_the_exponent(self):
+        """
+        Test both modes against central differences for a variable exponent.
+        """
+        def f(x, y):
+            return x ** y
+
+        h = 1e-6
+        for x, y in [(2.0, 3.0), (0.5, -1.5), (3.0, 0.0)]:
+            expected = [(f(x + h, y) - f(x - h, y)) / (2 * h), (f(x, y + h) - f(x, y - h)) / (2 * h)]
+
+            self.assertAlmostEqual(jvp(f, [x, y], [1.0, 0.0])[1], expected[0], places=5)
+            self.assertAlmostEqual(jvp(f, [x, y], [0.0, 1.0])[1], expected[1], places=5)
+
+            inputs = [Value(x), Value(y)]
+            f(*inputs).run_backpropagation()
+            for node, e in zip(inputs, expected):
+                self.assertAlmostEqual(node.gradient, e, places=5)
+
+    def test_mismatched_tangents(self):
+        """
+        Test that inputs and tangents of different lengths raise a ValueError.
+        """
+        with self.assertRaises(ValueError):
+            jvp(model, [1.0, 2.0], [1.0])
+
+
+def outputs(x, y, z):
+    return [tanh(x * y) + z, sigmoid(z) * x, y ** 2]
+
+
+class TestJacobian(unittest.TestCase):
+
+    def setUp(self):
+        self.point = [0.5, -1.5, 2.0]
+        self.expected = []
+        for i in range(3):
+            inputs = [Value(v) for v in self.point]
+            outputs(*inputs)[i].run_backpropagation()
+            self.expected.append([node.gradient for node in inputs])
+
+    def assert_rows_almost_equal(self, expected, actual):
+        self.assertEqual(len(expected), len(actual))
+        for expected_row, actual_row in zip(expected, actual):
+            self.assertEqual(len(expected_row), len(actual_row))
+            for e, a in zip(expected_row, actual_row):
+                self.assertAlmostEqual(e, a)
+
+    def test_jacobian_matches_one_backward_pass_per_output(self):
+        """
+        Test the reverse-mode path against one backward pass per output.
+        """
+        self.assert_rows_almost_equal(self.expected, jacobian(outputs, self.point))
+        self.assert_rows_almost_equal([[2 * self.point[0]]], jacobian(lambda t: t * t, self.point[0]))
+
+    def test_jacobian_with_more_outputs_than_inputs(self):
+        """
+        Test the forward-mode path taken when outputs outnumber inputs.
+        """
+        def wide(x, y):
+            return [tanh(x * y), x * y, y ** 2, sigmoid(x)]
+
+        expected = []
+        for i in range(4):
+            inputs = [Value(v) for v in self.point[:2]]
+            wide(*inputs)[i].run_backpropagation()
+            expected.append([node.gradient for node in inputs])
+        self.assert_rows_almost_equal(expected, jacobian(wide, self.point[:2]))
+
+    def test_functions_summing_a_data_batch(self):
+        """
+        Test seeds propagated through a function that sums a batch of data
+        against a number input.
+        """
+        def f(w):
+            return (w * Value([1.0, 2.0, 3.0])).sum()
+
+        self.assertEqual(vjp(f, 2.0, 1.0), (12.0, 6.0))
+        self.assertEqual(vjp(f, 2.0, [1.0, 3.0], batched=True), (12.0, [6.0, 18.0]))
+        self.assertEqual(jvp(f, 2.0, [1.0, 2.0], batched=True), (12.0, [6.0, 12.0]))
+        self.assertEqual(jacobian(f, [2.0]), [[6.0]])
+        self.assertEqual(jacobian(lambda w: [f(w), w * 3, w + 1], [2.0]), [[6.0], [3.0], [1.0]])
+
+    def test_forward_mode_jacobian_with_value_constants(self):
+        """
+        Test that Values created inside f are constants of the forward-mode
+        path, not inputs that drop the tangent.
+        """
+        self.assertEqual(jacobian(lambda w: [Value(2.0) * w, w * 3, w + 1], [2.0]), [[2.0], [3.0], [1.0]])
+
+    def test_batched_vjp(self):
+        """
+        Test that cotangents propagated together give the same products as
+        one reverse pass each.
+        """
+        cotangents = [[1.0, 0.0, 0.0], [0.0, 2.0, -1.0], [1.0, 1.0, 1.0]]
+        values, products = vjp(outputs, self.point, cotangents, batched=True)
+        self.assertEqual(len(values), 3)
+
+        for cotangent, product in zip(cotangents, products):
+            _, single = vjp(outputs, self.point, cotangent)
+            expected = [sum(c * row[i] for c, row in zip(cotangent, self.expected)) for i in range(3)]
+            for e, s, p in zip(expected, single, product):
+                self.assertAlmostEqual(e, s)
+                self.assertAlmostEqual(e, p)
+
+    def test_batched_jvp(self):
+        """
+        Test that directions propagated together give the same tangents as
+        one forward pass each.
+        """
+        directions = [[1.0, 0.0, 0.0], [0.5, 0.5, -2.0]]
+        _, tangents = jvp(outputs, self.point, directions, batched=True)
+        for direction, tangent in zip(directions, tangents):
+            _, single = jvp(outputs, self.point, direction)
+            for s, t in zip(single, tangent):
+                self.assertAlmostEqual(s, t)
+
+    def test_batched_seeds_with_batch_inputs(self):
+        """
+        Test that seeds are propagated on their own axis, apart from the
+        batch of the inputs.
+        """
+        _, products = vjp(lambda t: t * t, [[1.0, 2.0]], [[1.0, 1.0], [2.0, 0.0]], batched=True)
+        self.assertEqual([list(p[0]) for p in products], [[2.0, 4.0], [4.0, 0.0]])
+
+        _, tangents = jvp(lambda t: t * t, [[1.0, 2.0]], [[[1.0, 1.0]], [[0.0, 3.0]]], batched=True)
+        self.assertEqual([list(t) for t in tangents], [[2.0, 4.0], [0.0, 12.0]])
+
+    def test_invalid_seeds(self):
+        """
+        Test that seeds of the wrong length, and Jacobians at batch inputs,
+        raise a ValueError.
+        """
+        with self.assertRaises(ValueError):
+            vjp(outputs, self.point, [[1.0, 0.0]], batched=True)
+        with self.assertRaises(ValueError):
+            jvp(outputs, self.point, [[1.0, 0.0]], batched=True)
+        with self.assertRaises(ValueError):
+            jacobian(lambda t: t.sum(), [[1.0, 2.0]])
+
+
+if __name__ == '__main__':
+    unittest.main()
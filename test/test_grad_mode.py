@@ -0,0 +1,124 @@
+import threading
+import unittest
+
+from autograd import AutogradMatrix, Value, is_grad_enabled, no_grad
+from autograd.functions import tanh
+from autograd.matrix import Matrix
+from autograd.matrix import autograd_functions as F
+
+
+class TestNoGrad(unittest.TestCase):
+
+    def test_value_operations_record_no_graph(self):
+        """
+        Test that operations inside no_grad only compute their result.
+        """
+        x = Value(0.5)
+        with no_grad():
+            self.assertFalse(is_grad_enabled())
+            y = tanh(x * 2 + 1)
+        self.assertTrue(is_grad_enabled())
+
+        self.assertAlmostEqual(y.data, tanh(Value(0.5) * 2 + 1).data)
+        self.assertFalse(y.requires_grad)
+        self.assertIsNone(y._op)
+        self.assertEqual(y._prev, set())
+        with self.assertRaises(RuntimeError):
+            y.run_backpropagation()
+
+    def test_matrix_functions_record_no_graph(self):
+        """
+        Test that matrix functions inside no_grad record no graph and
+        allocate no gradient buffer.
+        """
+        x = AutogradMatrix([[1, 2], [3, 4]])
+        with no_grad():
+            y = F.relu(x @ x + 1)
+        self.assertEqual(y.data, (x @ x + 1).data)
+        self.assertFalse(y.requires_grad)
+        self.assertIsNone(y.grad)
+        self.assertIsNone(y._function)
+        self.assertEqual(y._previous_nodes, set())
+
+    def test_decorator(self):
+        """
+        Test that no_grad used as a decorator only applies inside the function.
+        """
+        @no_grad()
+        def predict(x):
+            return x * 2
+
+        self.assertFalse(predict(Value(1)).requires_grad)
+        self.assertTrue((Value(1) * 2).requires_grad)
+
+    def test_setting_is_per_thread(self):
+        """
+        Test that no_grad in one thread does not disable recording in another.
+        """
+        entered, release = threading.Event(), threading.Event()
+        results = []
+
+        def without_grad():
+            with no_grad():
+                entered.set()
+                release.wait(5)
+                results.append((Value(1) * 2).requires_grad)
+
+        thread = threading.Thread(target=without_grad)
+        thread.start()
+        try:
+            self.assertTrue(entered.wait(5))
+            self.assertTrue(is_grad_enabled())
+            self.assertTrue((Value(1) * 2).requires_grad)
+        finally:
+            release.set()
+            thread.join()
+        self.assertEqual(results, [False])
+
+
+class TestRequiresGrad(unittest.TestCase):
+
+    def test_values_that_do_not_require_gradients(self):
+        """
+        Test that gradients only reach Values that require them.
+        """
+        x = Value(3)
+        c = Value(2, requires_grad=False)
+        y = x * c + c
+        y.run_backpropagation()
+        self.assertEqual(x.gradient, 2)
+        self.assertEqual(c.gradient, 0)
+        self.assertNotIn(c, y._prev)
+
+        self.assertFalse((c * c).requires_grad)
+
+    def test_matrices_that_do_not_require_gradients(self):
+        """
+        Test that inputs without requires_grad have no gradient buffer and
+        receive no gradient, while the other inputs are unaffected.
+        """
+        x = AutogradMatrix([[1, 2], [3, 4]], requires_grad=False)
+        w = AutogradMatrix([[1], [-1]])
+        self.assertIsNone(x.grad)
+
+        loss = F.mse_loss(x @ w, Matrix([[0], [0]]))
+        loss.start_backpropagation()
+
+        self.assertEqual(w._grad.data, [[-4.0], [-6.0]])
+        self.assertIsNone(x.grad)
+        self.assertFalse((x * 2).requires_grad)
+
+    def test_constant_right_hand_side(self):
+        """
+        Test that a right hand side that does not require gradients is not
+        recorded as a parent and gets no gradient.
+        """
+        w = AutogradMatrix([[1, 2], [3, 4]])
+        x = AutogradMatrix([[1], [1]], requires_grad=False)
+        (w @ x).sum().start_backpropagation()
+        self.assertEqual(w.grad.data, [[1, 1], [1, 1]])
+        self.assertNotIn(x, (w @ x)._previous_nodes)
+
+
+if __name__ == '__main__':
+    unittest.main()
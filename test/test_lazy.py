@@ -0,0 +1,154 @@
+import unittest
+
+from autograd.matrix import (
+    LazyMatrix,
+    Matrix,
+    PythonBackend,
+    lazy,
+    register_backend,
+    use_backend,
+)
+from autograd.matrix import lazy_matrix
+
+
+class RecordingBackend(PythonBackend):
+
+    name = 'recording'
+
+    def __init__(self):
+        self.calls = []
+
+    def __getattribute__(self, name):
+        if not name.startswith('_') and name not in ('calls', 'name'):
+            object.__getattribute__(self, 'calls').append(name)
+        return object.__getattribute__(self, name)
+
+
+class TestLazyMatrix(unittest.TestCase):
+
+    def setUp(self):
+        self.a = Matrix([
+            [1, 2],
+            [3, 4],
+        ])
+        self.b = Matrix([
+            [0.5, -1],
+            [2, 0.25],
+        ])
+
+    def assert_matrices_almost_equal(self, expected, actual):
+        self.assertEqual(expected.shape, actual.shape)
+        for e, a in zip(expected.buffer, actual.buffer):
+            self.assertAlmostEqual(e, a)
+
+    def expression(self, a, b):
+        t = (a * b + 1).tanh()
+        return ((t * t - a / 2) ** 2 + 3 - b.exp()) / (1 + b.sigmoid()) - (-a).relu() + 2 * t
+
+    def test_operators_build_an_expression(self):
+        """
+        Test that element-wise operators on a LazyMatrix are not evaluated
+        until the elements are needed.
+        """
+        x = lazy(self.a) * 2 + self.b
+        self.assertIsInstance(x, LazyMatrix)
+        self.assertFalse(x.evaluated)
+
+        self.assertEqual(x[1, 0], 8)
+        self.assertTrue(x.evaluated)
+        self.assertEqual(x.data, [[2.5, 3.0], [8.0, 8.25]])
+
+    def test_matches_eager_evaluation(self):
+        """
+        Test that a fused expression gives the same result as eager evaluation.
+        """
+        expected = self.expression(self.a, self.b)
+        self.assert_matrices_almost_equal(expected, self.expression(lazy(self.a), self.b))
+        self.assert_matrices_almost_equal(expected, self.expression(lazy(self.a), lazy(self.b)))
+        self.assertAlmostEqual(expected.sum(), self.expression(lazy(self.a), self.b).sum())
+
+    def test_matches_eager_evaluation_on_numpy_backend(self):
+        """
+        Test that the NumPy backend evaluates fused expressions the same way.
+        """
+        expected = self.expression(self.a, self.b)
+        with use_backend('numpy'):
+            self.assert_matrices_almost_equal(expected, self.expression(lazy(self.a), self.b))
+
+    def test_expression_is_evaluated_in_one_kernel_call(self):
+        """
+        Test that a chain of element-wise operations runs as a single fused kernel.
+        """
+        recording = RecordingBackend()
+        register_backend(recording)
+
+        with use_backend('recording'):
+            x = lazy(self.a)
+            t = (x * self.b + 1).exp()
+            (t * t + t / 3).evaluate()
+
+        self.assertEqual(recording.calls, ['fused_elementwise'])
+
+    def test_shared_subexpression_is_computed_once(self):
+        """
+        Test that a node used several times is emitted once as a temporary.
+        """
+        x = lazy(self.a)
+        t = x.exp()
+        y = t * t + t
+        self.assertEqual(lazy_matrix._count_uses(y)[id(t)], 3)
+        self.assert_matrices_almost_equal(self.a.exp() * self.a.exp() + self.a.exp(), y)
+
+    def test_reflected_operators(self):
+        """
+        Test that scalars and plain matrices on the left keep the expression lazy.
+        """
+        x = lazy(self.a)
+        for result in (1 - x, 2 / x, 3 * x, 4 + x, self.b - x):
+            self.assertIsInstance(result, LazyMatrix)
+        self.assertEqual((1 - x).data, [[0, -1], [-2, -3]])
+        self.assertEqual((self.b - x).data, [[-0.5, -3], [-1, -3.75]])
+
+    def test_long_chains_are_split(self):
+        """
+        Test that chains deeper than MAX_FUSED_DEPTH are evaluated in parts.
+        """
+        x = lazy(self.a)
+        y = x
+        for _ in range(lazy_matrix.MAX_FUSED_DEPTH * 3):
+            y = y + 1
+        self.assertLessEqual(y._depth, lazy_matrix.MAX_FUSED_DEPTH)
+        self.assertEqual(y[0, 0], 1 + lazy_matrix.MAX_FUSED_DEPTH * 3)
+
+    def test_float32_expressions(self):
+        x = lazy(self.a.astype('float32'))
+        y = (x * 2).exp() + x
+        self.assertEqual(y.dtype, 'float32')
+        self.assertFalse(y.evaluated)
+        self.assertEqual(y.evaluate().buffer.typecode, 'f')
+        self.assertEqual((x + self.b).dtype, 'float64')
+
+    def test_non_elementwise_operations_evaluate(self):
+        """
+        Test that matrix multiplication and transposition work on pending expressions.
+        """
+        x = lazy(self.a) + 1
+        self.assertEqual((x @ self.b).data, ((self.a + 1) @ self.b).data)
+        self.assertEqual(x.T.data, (self.a + 1).T.data)
+
+    def test_broadcasting_operands(self):
+        """
+        Test that operands of different shapes broadcast like eager matrices.
+        """
+        row = Matrix([[10, 20]])
+        x = (lazy(self.a) + row) * 2
+        self.assertIsInstance(x, LazyMatrix)
+        self.assertEqual(x.data, ((self.a + row) * 2).data)
+        self.assertEqual((row - lazy(self.a)).data, (row - self.a).data)
+
+        with self.assertRaises(ValueError):
+            lazy(self.a) + Matrix([[1, 2, 3]])
+
+
+if __name__ == '__main__':
+    unittest.main()
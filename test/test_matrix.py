@@ -0,0 +1,226 @@
+import unittest
+
+from array import array
+
+from autograd.matrix import Matrix
+from autograd.matrix import functions
+
+
+class TestMatrixStorage(unittest.TestCase):
+
+    def setUp(self):
+        self.x = Matrix([
+            [1, 2, 3],
+            [4, 5, 6],
+        ])
+
+    def test_buffer_is_flat_and_row_major(self):
+        """
+        Test that the elements are stored in one flat row-major buffer.
+        """
+        self.assertIsInstance(self.x.buffer, array)
+        self.assertEqual(self.x.buffer.tolist(), [1.0, 2.0, 3.0, 4.0, 5.0, 6.0])
+        self.assertEqual(self.x.shape, (2, 3))
+        self.assertEqual(self.x.strides, (3, 1))
+
+    def test_data_returns_nested_lists(self):
+        """
+        Test that the data property returns the matrix as a list of rows.
+        """
+        self.assertEqual(self.x.data, [[1.0, 2.0, 3.0], [4.0, 5.0, 6.0]])
+
+    def test_invalid_shapes_are_rejected(self):
+        """
+        Test that empty and ragged inputs raise a ValueError.
+        """
+        with self.assertRaises(ValueError):
+            Matrix([])
+
+        with self.assertRaises(ValueError):
+            Matrix([[1, 2], [3]])
+
+        with self.assertRaises(ValueError):
+            Matrix.from_buffer([1, 2, 3], (2, 2))
+
+    def test_from_buffer(self):
+        """
+        Test that from_buffer builds a matrix from flat row-major data.
+        """
+        m = Matrix.from_buffer([1, 2, 3, 4, 5, 6], (3, 2))
+        self.assertEqual(m.data, [[1.0, 2.0], [3.0, 4.0], [5.0, 6.0]])
+
+    def test_from_buffer_copies_and_trusted_path_does_not(self):
+        """
+        Test that from_buffer copies its input while _from_trusted wraps it as is.
+        """
+        buffer = array('d', [1.0, 2.0])
+        self.assertIsNot(Matrix.from_buffer(buffer, (1, 2)).buffer, buffer)
+        self.assertIs(Matrix._from_trusted(buffer, (1, 2)).buffer, buffer)
+
+    def test_row_view_writes_through(self):
+        """
+        Test that indexing a row and assigning to it updates the matrix.
+        """
+        self.x[1][2] = 10
+        self.assertEqual(self.x[1, 2], 10.0)
+        self.assertEqual(self.x[-1][-1], 10.0)
+
+        self.x[0] = [7, 8, 9]
+        self.assertEqual(self.x.data[0], [7.0, 8.0, 9.0])
+
+        with self.assertRaises(IndexError):
+            self.x[2][0]
+
+    def test_elementwise_operations(self):
+        """
+        Test the element-wise and scalar operators.
+        """
+        y = Matrix([
+            [6, 5, 4],
+            [3, 2, 1],
+        ])
+        self.assertEqual((self.x + y).data, [[7.0, 7.0, 7.0], [7.0, 7.0, 7.0]])
+        self.assertEqual((self.x - y).data, [[-5.0, -3.0, -1.0], [1.0, 3.0, 5.0]])
+        self.assertEqual((self.x * y).data, [[6.0, 10.0, 12.0], [12.0, 10.0, 6.0]])
+        self.assertEqual((self.x * 2).data, [[2.0, 4.0, 6.0], [8.0, 10.0, 12.0]])
+        self.assertEqual((10 - self.x).data, [[9.0, 8.0, 7.0], [6.0, 5.0, 4.0]])
+        self.assertEqual((self.x ** 2).data, [[1.0, 4.0, 9.0], [16.0, 25.0, 36.0]])
+        self.assertEqual(self.x.sum(), 21.0)
+
+    def test_broadcasting(self):
+        """
+        Test that row vectors, column vectors and 1x1 matrices broadcast
+        against a full matrix on either side.
+        """
+        row = Matrix([[10, 20, 30]])
+        column = Matrix([[1], [2]])
+        self.assertEqual((self.x + row).data, [[11.0, 22.0, 33.0], [14.0, 25.0, 36.0]])
+        self.assertEqual((row - self.x).data, [[9.0, 18.0, 27.0], [6.0, 15.0, 24.0]])
+        self.assertEqual((self.x * column).data, [[1.0, 2.0, 3.0], [8.0, 10.0, 12.0]])
+        self.assertEqual((self.x / column).data, [[1.0, 2.0, 3.0], [2.0, 2.5, 3.0]])
+        self.assertEqual((self.x * Matrix([[2]])).data, (self.x * 2).data)
+        self.assertEqual((column + row).data, [[11.0, 21.0, 31.0], [12.0, 22.0, 32.0]])
+
+        with self.assertRaises(ValueError):
+            self.x + Matrix([[1, 2]])
+        with self.assertRaises(ValueError):
+            self.x * self.x.T
+
+    def test_reductions(self):
+        """
+        Test sum, mean, max and logsumexp over everything and along each axis.
+        """
+        self.assertEqual(self.x.sum(axis=0).data, [[5.0, 7.0, 9.0]])
+        self.assertEqual(self.x.sum(axis=1).data, [[6.0], [15.0]])
+        self.assertEqual(self.x.mean(), 3.5)
+        self.assertEqual(self.x.mean(axis=0).data, [[2.5, 3.5, 4.5]])
+        self.assertEqual(self.x.max(), 6.0)
+        self.assertEqual(self.x.max(axis=1).data, [[3.0], [6.0]])
+        self.assertAlmostEqual(self.x.logsumexp(), 6.4561933, places=6)
+        self.assertAlmostEqual(Matrix([[1000, 1000]]).logsumexp(), 1000 + 0.6931472, places=6)
+        self.assertEqual(Matrix([[float('-inf'), float('-inf')]]).logsumexp(), float('-inf'))
+        self.assertEqual(float(self.x.sum(axis=0).sum(axis=1)), 21.0)
+
+        with self.assertRaises(TypeError):
+            float(self.x)
+
+    def test_float32_storage(self):
+        """
+        Test that float32 matrices use 4 bytes per element and that
+        operations keep the element type unless float64 is mixed in.
+        """
+        x = Matrix(self.x.data, dtype='float32')
+        self.assertEqual(x.dtype, 'float32')
+        self.assertEqual(x.buffer.itemsize, 4)
+        self.assertEqual(self.x.dtype, 'float64')
+
+        for result in (x + x, x - 1, x * 2, x / x, x ** 2, x.exp(), x.T, x @ x.T, x.sum(axis=0),
+                       x + Matrix([[1, 2, 3]], dtype='float32'), x.relu(), x.softmax()):
+            self.assertEqual(result.dtype, 'float32')
+        self.assertEqual((x + self.x).dtype, 'float64')
+        self.assertEqual((x @ x.T).data, (self.x @ self.x.T).data)
+
+        x += self.x
+        self.assertEqual(x.dtype, 'float32')
+        x[0] = [0.1, 0.2, 0.3]
+        self.assertAlmostEqual(x[0, 0], 0.1, places=6)
+
+        self.assertEqual(Matrix.zeros(2, 2, dtype='float32').dtype, 'float32')
+        self.assertEqual(Matrix.identity(2, dtype='float32').dtype, 'float32')
+        self.assertEqual(Matrix.from_buffer(self.x.buffer, (3, 2), dtype='float32').dtype, 'float32')
+        self.assertEqual(self.x.astype('float32').astype('float64').data, self.x.data)
+
+        with self.assertRaises(ValueError):
+            Matrix([[1]], dtype='int32')
+
+    def test_inplace_operations_reuse_the_buffer(self):
+        """
+        Test that in-place operators update the existing buffer.
+        """
+        buffer = self.x.buffer
+        y = Matrix([
+            [1, 1, 1],
+            [2, 2, 2],
+        ])
+
+        x = self.x
+        x += y
+        self.assertIs(x, self.x)
+        self.assertEqual(x.data, [[2.0, 3.0, 4.0], [6.0, 7.0, 8.0]])
+
+        x *= 2
+        x -= 1
+        self.assertEqual(x.data, [[3.0, 5.0, 7.0], [11.0, 13.0, 15.0]])
+
+        x.mul_(y).add_(1).sub_(y)
+        self.assertEqual(x.data, [[3.0, 5.0, 7.0], [21.0, 25.0, 29.0]])
+
+        x.zero_()
+        self.assertEqual(x.data, [[0.0, 0.0, 0.0], [0.0, 0.0, 0.0]])
+        self.assertIs(x.buffer, buffer)
+
+        with self.assertRaises(ValueError):
+            x += Matrix([[1, 2]])
+
+    def test_matrix_multiplication_and_transpose(self):
+        """
+        Test matrix multiplication and transposition.
+        """
+        self.assertEqual(self.x.T.data, [[1.0, 4.0], [2.0, 5.0], [3.0, 6.0]])
+        self.assertEqual((self.x @ self.x.T).data, [[14.0, 32.0], [32.0, 77.0]])
+
+        with self.assertRaises(ValueError):
+            self.x @ self.x
+
+    def test_blocked_matrix_multiplication(self):
+        """
+        Test that the blocked kernel agrees with the textbook definition when
+        the output spans several row blocks.
+        """
+        rows, inner, cols = 7, 3, 5
+        x = Matrix.from_buffer([(i * 7) % 11 - 5 for i in range(rows * inner)], (rows, inner))
+        y = Matrix.from_buffer([(i * 3) % 13 - 6 for i in range(inner * cols)], (inner, cols))
+
+        old_block_rows = functions.MATMUL_BLOCK_ROWS
+        functions.MATMUL_BLOCK_ROWS = 2
+        try:
+            result = x @ y
+        finally:
+            functions.MATMUL_BLOCK_ROWS = old_block_rows
+
+        for i in range(rows):
+            for j in range(cols):
+                expected = sum(x[i][k] * y[k][j] for k in range(inner))
+                self.assertAlmostEqual(result[i][j], expected)
+
+    def test_constructors(self):
+        """
+        Test the zeros, ones and identity constructors.
+        """
+        self.assertEqual(Matrix.zeros(2, 1).data, [[0.0], [0.0]])
+        self.assertEqual(Matrix.ones(1, 2).data, [[1.0, 1.0]])
+        self.assertEqual(Matrix.identity(2).data, [[1.0, 0.0], [0.0, 1.0]])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -52,23 +52,28 @@ class TestBaseOperation(unittest.TestCase):
         result = Addition.apply(self.x, 2)
         self.assertTrue(self.x in result._prev)
 
-    def test_apply_method_attaches_calculate_gradient_function_to_previous_nodes(self):
+    def test_apply_method_records_operation_on_resulting_object(self):
         """
-        Test that the apply method attaches the calculate gradient function to
-        the previous nodes.
+        Test that the apply method records the operation and its operands on
+        the resulting Value object, and that backward pushes the vector-Jacobian
+        product into the operands.
         """
-        self.assertEqual(self.x._calculate_gradient(), 1)
-        self.assertEqual(self.y._calculate_gradient(), 1)
-
         result = Multiplication.apply(self.x, self.y)
-        expected_gradient = Multiplication.backward(self.x.data, self.y.data) * result.gradient
-        self.assertEqual(self.x._calculate_gradient(), expected_gradient)
-        expected_gradient = Multiplication.backward(self.y.data, self.x.data) * result.gradient
-        self.assertEqual(self.y._calculate_gradient(), expected_gradient)
+        self.assertIs(result._op, Multiplication)
+        self.assertEqual(result._args, (self.x, self.y))
+
+        result.gradient = 1
+        result.backward()
+        self.assertEqual(self.x.gradient, Multiplication.backward(self.x.data, self.y.data))
+        self.assertEqual(self.y.gradient, Multiplication.backward(self.y.data, self.x.data))
 
         result = Multiplication.apply(self.x, 2)
-        expected_gradient = Multiplication.backward(self.x.data, 2) * result.gradient
-        self.assertEqual(self.x._calculate_gradient(), expected_gradient)
+        self.assertEqual(result._args, (self.x, 2))
+
+        self.x.reset_gradient()
+        result.gradient = 1
+        result.backward()
+        self.assertEqual(self.x.gradient, Multiplication.backward(self.x.data, 2))
 
 
 class TestAddition(unittest.TestCase):
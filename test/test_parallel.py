@@ -0,0 +1,114 @@
+import unittest
+
+import threading
+
+from unittest import mock
+
+from array import array
+from multiprocessing import shared_memory
+
+from autograd.matrix import (
+    Matrix,
+    PythonBackend,
+    register_backend,
+    use_backend,
+    use_parallel_matmul,
+)
+from autograd.matrix import backends, parallel
+
+
+class UnregisteredBackend(PythonBackend):
+
+    name = 'unregistered'
+
+    def __init__(self):
+        self.operands = []
+
+    def multiply(self, x, y, rows, inner, cols):
+        self.operands.append(y)
+        return super().multiply(x, y, rows, inner, cols)
+
+
+class UnpicklableBackend(PythonBackend):
+
+    name = 'unpicklable'
+
+    def __init__(self):
+        self.lock = threading.Lock()
+
+
+class TestParallelMatmul(unittest.TestCase):
+
+    def setUp(self):
+        self.x = Matrix.from_buffer([(i * 7) % 11 - 5 for i in range(9 * 4)], (9, 4))
+        self.y = Matrix.from_buffer([(i * 3) % 13 - 6 for i in range(4 * 3)], (4, 3))
+
+    def test_disabled_by_default(self):
+        """
+        Test that matrix products stay in-process unless parallel mode is enabled.
+        """
+        self.assertFalse(parallel.should_parallelize(1024, 1024, 1024))
+
+    def test_threshold(self):
+        """
+        Test that products below the size threshold are computed serially.
+        """
+        with use_parallel_matmul(workers=2, threshold=100):
+            self.assertTrue(parallel.should_parallelize(10, 10, 10))
+            self.assertFalse(parallel.should_parallelize(10, 9, 1))
+            self.assertFalse(parallel.should_parallelize(1, 1000, 1000))
+
+        self.assertFalse(parallel.should_parallelize(10, 10, 10))
+
+    def test_parallel_result_matches_serial(self):
+        """
+        Test that splitting the product across processes gives the serial result.
+        """
+        expected = self.x @ self.y
+
+        with use_parallel_matmul(workers=2, threshold=1):
+            actual = self.x @ self.y
+
+        self.assertEqual(actual.shape, expected.shape)
+        self.assertEqual(actual.data, expected.data)
+
+    def test_worker_uses_the_backend_it_is_sent(self):
+        """
+        Test that a worker task multiplies with the backend object it
+        receives, reading the right operand from shared memory in place.
+        """
+        backend = UnregisteredBackend()
+        y = self.y.buffer
+        shm = shared_memory.SharedMemory(create=True, size=len(y) * y.itemsize)
+        try:
+            shm.buf[:len(y) * y.itemsize] = memoryview(y).cast('B')
+            block = parallel._multiply_rows(backend, self.x.buffer.tobytes(), 'd', shm.name, 'd', 9, 4, 3)
+        finally:
+            shm.close()
+            shm.unlink()
+
+        result = array('d')
+        result.frombytes(block)
+        self.assertEqual(list(result), list((self.x @ self.y).buffer))
+        self.assertIsInstance(backend.operands[0], memoryview)
+
+    def test_backend_that_cannot_be_sent_to_workers(self):
+        """
+        Test that a backend that cannot be pickled raises a TypeError,
+        checked once rather than on every product.
+        """
+        backend = UnpicklableBackend()
+        register_backend(backend)
+        self.addCleanup(backends._backends.pop, backend.name, None)
+
+        with use_backend('unpicklable'), use_parallel_matmul(workers=2, threshold=1):
+            with self.assertRaises(TypeError):
+                self.x @ self.y
+            self.assertIn(backend, parallel._sendable)
+            with mock.patch('pickle.dumps') as dumps, self.assertRaises(TypeError):
+                self.x @ self.y
+            dumps.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
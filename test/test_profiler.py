@@ -0,0 +1,119 @@
+import json
+import os
+import tempfile
+import unittest
+
+from fractions import Fraction
+
+from autograd import AutogradMatrix, Value, profile
+from autograd.functions import tanh
+from autograd.functions.base import BaseOperation
+from autograd.matrix import Matrix
+from autograd.matrix import autograd_functions as F
+from autograd.matrix.autograd_functions import BaseFunction
+
+
+class TestProfiler(unittest.TestCase):
+
+    def test_value_operations_are_counted(self):
+        """
+        Test that forward and backward calls are recorded per operation class.
+        """
+        x = Value(0.5)
+        with profile() as prof:
+            y = tanh(x * 2 + 1) * x
+            y.run_backpropagation()
+
+        self.assertEqual(prof.stats['Multiplication'].calls, 2)
+        self.assertEqual(prof.stats['Multiplication'].backward_calls, 2)
+        self.assertEqual(prof.stats['Tanh'].calls, 1)
+        self.assertEqual(prof.stats['Addition'].shapes, {(): 1})
+        self.assertGreater(prof.stats['Tanh'].backward_time, 0)
+        self.assertEqual(len(prof.events), 8)
+
+    def test_backward_pass_that_creates_a_graph(self):
+        """
+        Test that profiling leaves create_graph working, recording the
+        operations the backward pass builds.
+        """
+        x = Value(1.5)
+        with profile() as prof:
+            (x ** 3).run_backpropagation(create_graph=True)
+
+        self.assertAlmostEqual(x.gradient.data, 3 * 1.5 ** 2)
+        self.assertEqual(prof.stats['Power'].backward_calls, 1)
+        self.assertGreater(prof.stats['Multiplication'].calls, 0)
+
+    def test_matrix_functions_record_shapes_and_bytes(self):
+        """
+        Test the output shapes and the bytes of data and gradient buffers
+        recorded for matrix functions.
+        """
+        a = AutogradMatrix([[1, 2], [3, 4], [5, 6]])
+        w = AutogradMatrix([[1], [-1]])
+        with profile() as prof:
+            loss = F.mse_loss(a @ w, Matrix([[0], [0], [0]]))
+            loss.start_backpropagation(retain_graph=False)
+
+        stats = prof.stats['MatrixMultiply']
+        self.assertEqual((stats.calls, stats.backward_calls), (1, 1))
+        self.assertEqual(stats.shapes, {(3, 1): 1})
+        self.assertEqual(stats.bytes, 3 * 8)
+        self.assertIn('MeanSquaredError', prof.summary())
+
+    def test_hooks_are_removed_on_exit(self):
+        """
+        Test that nothing is left patched or recorded once the block exits.
+        """
+        apply = BaseOperation.__dict__['apply']
+        matrix_apply = BaseFunction.__dict__['apply']
+        with self.assertRaises(ValueError):
+            with profile() as prof:
+                Value(1) * 2
+                raise ValueError
+        self.assertIs(BaseOperation.__dict__['apply'], apply)
+        self.assertIs(BaseFunction.__dict__['apply'], matrix_apply)
+
+        Value(1) * 2
+        self.assertEqual(prof.stats['Multiplication'].calls, 1)
+
+    def test_values_without_a_buffer(self):
+        """
+        Test that numbers other than int and float are profiled as scalars
+        of unknown size.
+        """
+        with profile() as prof:
+            y = Value(Fraction(1, 2)) * 2
+        self.assertEqual(y.data, 1)
+        self.assertEqual(prof.stats['Multiplication'].shapes, {(): 1})
+        self.assertEqual(prof.stats['Multiplication'].bytes, 0)
+
+    def test_only_one_profiler_at_a_time(self):
+        """
+        Test that starting a profiler while another is active raises a RuntimeError.
+        """
+        with profile():
+            with self.assertRaises(RuntimeError):
+                with profile():
+                    pass
+
+    def test_chrome_trace_export(self):
+        """
+        Test that the exported trace has one complete event per call, in order.
+        """
+        with profile() as prof:
+            (Value(1) * 2).run_backpropagation()
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'trace.json')
+            prof.export_chrome_trace(path)
+            with open(path) as file:
+                events = json.load(file)['traceEvents']
+
+        self.assertEqual([(e['name'], e['cat'], e['ph']) for e in events],
+                         [('Multiplication', 'forward', 'X'), ('Multiplication', 'backward', 'X')])
+        self.assertGreaterEqual(events[1]['ts'], events[0]['ts'] + events[0]['dur'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,128 @@
+import os
+import tempfile
+import unittest
+
+from autograd import AutogradMatrix
+from autograd.matrix import (
+    Matrix,
+    load_matrix,
+    load_parameters,
+    save_matrix,
+    save_parameters,
+    use_backend,
+)
+
+
+class TestSerialization(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'matrix.bin')
+        self.x = Matrix([
+            [1, 2, 3],
+            [4, 5, 6],
+        ])
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_round_trip(self):
+        """
+        Test that a saved matrix loads back with the same shape and elements.
+        """
+        save_matrix(self.x, self.path)
+        self.assertEqual(os.path.getsize(self.path), 24 + 6 * 8)
+
+        loaded = load_matrix(self.path)
+        self.assertEqual(loaded.shape, (2, 3))
+        self.assertEqual(loaded.data, self.x.data)
+
+        loaded = load_matrix(self.path, matrix_type=AutogradMatrix)
+        self.assertIsInstance(loaded, AutogradMatrix)
+        self.assertEqual(loaded.grad.shape, (2, 3))
+
+    def test_memory_mapped_views(self):
+        """
+        Test that memory-mapped matrices are views of the file that support
+        the usual operations.
+        """
+        save_matrix(self.x, self.path)
+
+        view = load_matrix(self.path, mmap_mode='r')
+        self.assertEqual(view.data, self.x.data)
+        self.assertEqual((view @ view.T).data, (self.x @ self.x.T).data)
+        self.assertEqual((view + 1).sum(), 27.0)
+        with use_backend('numpy'):
+            self.assertEqual((view * view).data, (self.x * self.x).data)
+        with self.assertRaises(TypeError):
+            view[0, 0] = 10
+
+        copy_on_write = load_matrix(self.path, mmap_mode='c')
+        copy_on_write += 1
+        self.assertEqual(copy_on_write[0, 0], 2.0)
+        self.assertEqual(load_matrix(self.path)[0, 0], 1.0)
+
+        write_through = load_matrix(self.path, mmap_mode='r+')
+        write_through[1] = [7, 8, 9]
+        del write_through
+        self.assertEqual(load_matrix(self.path).data, [[1, 2, 3], [7, 8, 9]])
+
+        with self.assertRaises(ValueError):
+            load_matrix(self.path, mmap_mode='w')
+
+    def test_parameters_round_trip(self):
+        """
+        Test that named matrices are saved to and loaded from a single file.
+        """
+        parameters = {
+            'w1': AutogradMatrix([[1, 2], [3, 4]]),
+            'bias': AutogradMatrix([[0.5, -0.5]]),
+            'wéights': AutogradMatrix([[7]]),
+        }
+        save_parameters(parameters, self.path)
+
+        for mmap_mode in (None, 'r'):
+            loaded = load_parameters(self.path, mmap_mode=mmap_mode, matrix_type=AutogradMatrix)
+            self.assertEqual(list(loaded), list(parameters))
+            for name, matrix in parameters.items():
+                self.assertIsInstance(loaded[name], AutogradMatrix)
+                self.assertEqual(loaded[name].data, matrix.data)
+
+    def test_float32_round_trip(self):
+        """
+        Test that float32 matrices keep their element type and that blocks
+        of an odd number of float32 elements stay aligned.
+        """
+        parameters = {
+            'odd': AutogradMatrix([[1, 2, 3]], dtype='float32'),
+            'next': AutogradMatrix([[4, 5]], dtype='float32'),
+            'double': AutogradMatrix([[6]]),
+        }
+        save_parameters(parameters, self.path)
+        for mmap_mode in (None, 'r'):
+            loaded = load_parameters(self.path, mmap_mode=mmap_mode)
+            self.assertEqual([m.dtype for m in loaded.values()], ['float32', 'float32', 'float64'])
+            self.assertEqual([m.data for m in loaded.values()], [m.data for m in parameters.values()])
+
+    def test_invalid_files_are_rejected(self):
+        with open(self.path, 'wb') as file:
+            file.write(b'not a matrix file at all')
+        with self.assertRaises(ValueError):
+            load_matrix(self.path)
+
+        save_matrix(self.x, self.path)
+        with self.assertRaises(ValueError):
+            load_parameters(self.path)
+
+        with open(self.path, 'rb') as file:
+            data = file.read()
+        with open(self.path, 'wb') as file:
+            file.write(data[:-8])
+        with self.assertRaises(ValueError):
+            load_matrix(self.path)
+        with self.assertRaises(ValueError):
+            load_matrix(self.path, mmap_mode='r')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,124 @@
+import math
+import threading
+import unittest
+
+from autograd import trace
+from autograd.functions import sigmoid, tanh
+from autograd.value import Value
+
+
+def model(x, y):
+    z = sigmoid(x * 2 + y) * y
+    return tanh(z) + z ** 2
+
+
+class TestTrace(unittest.TestCase):
+
+    def test_replay_matches_eager_forward(self):
+        """
+        Test that replaying a trace on new inputs gives the eager result.
+        """
+        traced = trace(model, 0.1, 0.2)
+
+        for x, y in [(0.1, 0.2), (-1.5, 0.7), (3.0, -2.0)]:
+            expected = model(Value(x), Value(y)).data
+            self.assertAlmostEqual(traced(x, y), expected)
+
+    def test_replay_backward_against_numerical_gradient(self):
+        """
+        Test the gradients of a replay against numerical differentiation.
+        """
+        traced = trace(model, 0.0, 0.0)
+        h = 1e-6
+        x, y = 0.3, -0.4
+
+        traced.forward(x, y)
+        grad_x, grad_y = traced.backward()
+
+        expected_x = (traced(x + h, y) - traced(x - h, y)) / (2 * h)
+        expected_y = (traced(x, y + h) - traced(x, y - h)) / (2 * h)
+        self.assertAlmostEqual(grad_x, expected_x, places=5)
+        self.assertAlmostEqual(grad_y, expected_y, places=5)
+
+    def test_fan_out_gradients_are_accumulated(self):
+        """
+        Test that an input used by several operations receives all contributions.
+        """
+        traced = trace(lambda a, b, c: a * b + a * c, 1.0, 1.0, 1.0)
+        traced.forward(2.0, 3.0, 5.0)
+        self.assertEqual(traced.backward(), [8.0, 2.0, 2.0])
+
+    def test_multiple_outputs_and_captured_values(self):
+        """
+        Test traces returning several Values and using Values created outside.
+        """
+        scale = Value(3.0)
+        traced = trace(lambda a: [a * scale, a ** 2], 1.0)
+
+        self.assertEqual(traced.forward(2.0), [6.0, 4.0])
+        self.assertEqual(traced.backward(1.0, 0.5), [3.0 + 2.0])
+
+    def test_dead_operations_are_pruned(self):
+        """
+        Test that operations not contributing to the output are not recorded.
+        """
+        def f(a):
+            a * 100
+            return a + 1
+
+        traced = trace(f, 1.0)
+        self.assertEqual(len(traced), 1)
+        self.assertEqual(traced(math.pi), math.pi + 1)
+
+    def test_replay_on_batches(self):
+        """
+        Test that a trace recorded on scalars can be replayed on batches.
+        """
+        traced = trace(model, 0.0, 0.0)
+        xs, ys = [0.1, -0.5], [0.2, 1.5]
+
+        outputs = traced(xs, ys)
+        grad_x, _ = traced.backward()
+
+        for i in range(2):
+            x, y = Value(xs[i]), Value(ys[i])
+            out = model(x, y)
+            out.run_backpropagation()
+            self.assertAlmostEqual(outputs[i], out.data)
+            self.assertAlmostEqual(grad_x[i], x.gradient)
+
+    def test_other_threads_are_not_recorded(self):
+        """
+        Test that a Value computed by another thread while tracing is a
+        captured constant, not an operation of the trace.
+        """
+        computed = []
+        thread = threading.Thread(target=lambda: computed.append(Value(3.0) * 2))
+
+        def f(x):
+            thread.start()
+            thread.join()
+            return x * computed[0]
+
+        traced = trace(f, 2.0)
+        self.assertEqual(len(traced), 1)
+        self.assertEqual(traced(4.0), 24.0)
+
+    def test_errors(self):
+        """
+        Test the errors raised for invalid usage.
+        """
+        traced = trace(lambda a: a * 2, 1.0)
+
+        with self.assertRaises(RuntimeError):
+            traced.backward()
+
+        with self.assertRaises(ValueError):
+            traced.forward(1.0, 2.0)
+
+        with self.assertRaises(TypeError):
+            trace(lambda a: a.data, 1.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
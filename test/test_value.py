@@ -1,5 +1,10 @@
+import math
 import unittest
 
+from array import array
+
+from autograd import hessian, hvp
+from autograd.functions import Tanh, relu, sigmoid, tanh
 from autograd.value import Value
 
 
@@ -31,12 +36,12 @@ class TestValueClass(unittest.TestCase):
         self.assertEqual(self.x._prev, set())
         self.assertEqual(self.y._prev, set())
 
-    def test_initial_calculate_gradient_attribute(self):
+    def test_initial_operation_attributes(self):
         """
-        Test that the _calculate_gradient attribute returns the correct value.
+        Test that a leaf Value records no operation and no operands.
         """
-        self.assertEqual(self.x._calculate_gradient(), 1)
-        self.assertEqual(self.y._calculate_gradient(), 1)
+        self.assertIsNone(self.x._op)
+        self.assertEqual(self.x._args, ())
 
     def test_add_prev_method(self):
         """
@@ -51,11 +56,12 @@ class TestValueClass(unittest.TestCase):
         Test that the backward method returns the correct value.
         """
         a = Value(2)
-        a._calculate_gradient = lambda: 23
-        a.backward()
+        b = a * 23
+        b.gradient = 1
+        b.backward()
         self.assertEqual(a.gradient, 23)
 
-        a.backward()
+        b.backward()
         self.assertEqual(a.gradient, 46)    # gradient should be accumulated
 
     def test_reset_gradient_method(self):
@@ -63,8 +69,9 @@ class TestValueClass(unittest.TestCase):
         Test that the reset_gradient method returns the correct value.
         """
         a = Value(2)
-        a._calculate_gradient = lambda: 23
-        a.backward()
+        b = a * 23
+        b.gradient = 1
+        b.backward()
         self.assertEqual(a.gradient, 23)
         a.reset_gradient()
         self.assertEqual(a.gradient, 0)
@@ -142,6 +149,242 @@ class TestValueClass(unittest.TestCase):
         expected_gradient = (res4.data - res.data) / self.h
         self.assertAlmostEqual(a4.gradient, expected_gradient, places=3)
 
+    def test_fan_out_gradients_are_accumulated(self):
+        """
+        Test that a Value used by several operations receives every contribution.
+        """
+        a, b, c = Value(2), Value(3), Value(5)
+        out = a * b + a * c
+        out.run_backpropagation()
+
+        self.assertEqual(a.gradient, 8)
+        self.assertEqual(b.gradient, 2)
+        self.assertEqual(c.gradient, 2)
+
+        d = Value(3)
+        out = d * d
+        out.run_backpropagation()
+        self.assertEqual(d.gradient, 6)
+
+    def test_backpropagation_without_retaining_graph(self):
+        """
+        Test that the graph is released while backpropagating when it is not retained.
+        """
+        a = Value(0.5)
+        b = a * 3
+        c = b ** 2
+        c.run_backpropagation(retain_graph=False)
+
+        self.assertAlmostEqual(a.gradient, 9.0)
+        self.assertEqual(c._prev, set())
+        self.assertEqual(b._prev, set())
+        self.assertIsNone(b._op)
+
+    def test_backpropagation_through_deep_graph(self):
+        """
+        Test that graphs deeper than the recursion limit can be backpropagated.
+        """
+        a = Value(1.0)
+        out = a
+        for _ in range(5000):
+            out = out * 1.0001
+
+        out.run_backpropagation()
+        self.assertAlmostEqual(a.gradient, 1.0001 ** 5000)
+
+    def test_cached_topological_order(self):
+        """
+        Test that the topological order is reused when caching is requested.
+        """
+        a = Value(0.5)
+        b = a * 3 + 1
+        c = b ** 2
+
+        c.run_backpropagation(cache_order=True)
+        self.assertAlmostEqual(a.gradient, 3 * 2 * 2.5)
+
+        order = c._topo_cache
+        self.assertEqual(order[-1], c)
+        self.assertEqual(order[0], a)
+
+        c.run_backpropagation()
+        self.assertIs(c._topo_cache, order)
+
+        c.clear_order_cache()
+        self.assertIsNone(c._topo_cache)
+
+
+class TestBatchedValue(unittest.TestCase):
+
+    def setUp(self):
+        self.xs = [-1.5, 0.25, 2.0]
+        self.ws = [0.5, -2.0, 3.0]
+
+    def expression(self, x, w):
+        return sigmoid(x * w + 1) + tanh(x) * relu(w) + x ** 2 / 2
+
+    def test_batch_data_is_array_backed(self):
+        """
+        Test that lists are stored as array-backed batches.
+        """
+        x = Value(self.xs)
+        self.assertIsInstance(x.data, array)
+        self.assertEqual(list((x * 2).data), [-3.0, 0.5, 4.0])
+
+    def test_batched_forward_matches_scalar_graphs(self):
+        """
+        Test that one batched graph gives the same outputs as one graph per sample.
+        """
+        out = self.expression(Value(self.xs), Value(self.ws))
+
+        for i, (x, w) in enumerate(zip(self.xs, self.ws)):
+            self.assertAlmostEqual(out.data[i], self.expression(Value(x), Value(w)).data)
+
+    def test_batched_backward_matches_scalar_graphs(self):
+        """
+        Test that gradients of a batched graph are the per-sample gradients.
+        """
+        x, w = Value(self.xs), Value(self.ws)
+        self.expression(x, w).run_backpropagation()
+
+        for i in range(len(self.xs)):
+            xi, wi = Value(self.xs[i]), Value(self.ws[i])
+            self.expression(xi, wi).run_backpropagation()
+            self.assertAlmostEqual(x.gradient[i], xi.gradient)
+            self.assertAlmostEqual(w.gradient[i], wi.gradient)
+
+    def test_batch_sum(self):
+        """
+        Test that summing a batch gives a scalar whose gradient is broadcast back.
+        """
+        x = Value(self.xs)
+        loss = (x * 3).sum()
+        loss.run_backpropagation()
+
+        self.assertAlmostEqual(loss.data, 3 * sum(self.xs))
+        self.assertEqual(list(x.gradient), [3.0, 3.0, 3.0])
+
+    def test_shared_scalar_parameter(self):
+        """
+        Test that a number used with a batch gets the sum of the per-sample gradients.
+        """
+        x = Value(self.xs)
+        w, b = Value(2.0), Value(0.5)
+        ((x * w + b) ** 2).sum().run_backpropagation()
+
+        self.assertIsInstance(w.gradient, float)
+        self.assertAlmostEqual(w.gradient, sum(2 * (xi * 2.0 + 0.5) * xi for xi in self.xs))
+        self.assertAlmostEqual(b.gradient, sum(2 * (xi * 2.0 + 0.5) for xi in self.xs))
+
+        w = Value(2.0)
+        (Value([1.0, 2.0, 3.0]) * w).sum().run_backpropagation(create_graph=True)
+        self.assertAlmostEqual(w.gradient.data, 6.0)
+
+    def test_mismatched_batch_sizes(self):
+        """
+        Test that combining batches of different sizes raises a ValueError.
+        """
+        with self.assertRaises(ValueError):
+            Value([1, 2]) + Value([1, 2, 3])
+
+
+def model(x, y):
+    return tanh(x * y) * x + sigmoid(x) ** 2 + relu(y) * x * x / y
+
+
+def numerical_hessian(f, point, h=1e-5):
+    """
+    Gradient of f by reverse mode at points around ``point``, differentiated
+    again by central differences.
+    """
+    def gradient(at):
+        inputs = [Value(v) for v in at]
+        f(*inputs).run_backpropagation()
+        return [node.gradient for node in inputs]
+
+    rows = []
+    for i in range(len(point)):
+        plus = list(point)
+        minus = list(point)
+        plus[i] += h
+        minus[i] -= h
+        rows.append([(p - m) / (2 * h) for p, m in zip(gradient(plus), gradient(minus))])
+    return rows
+
+
+class TestHigherOrder(unittest.TestCase):
+
+    def test_create_graph_gives_differentiable_gradients(self):
+        """
+        Test that gradients built with create_graph are Values with the
+        first-order values, and can be backpropagated again.
+        """
+        x = Value(1.5)
+        out = x ** 3
+        out.run_backpropagation(create_graph=True)
+        self.assertIsInstance(x.gradient, Value)
+        self.assertAlmostEqual(x.gradient.data, 3 * 1.5 ** 2)
+
+        first = x.gradient
+        x.reset_gradient()
+        first.run_backpropagation()
+        self.assertAlmostEqual(x.gradient, 6 * 1.5)
+
+        with self.assertRaises(ValueError):
+            (x * x).run_backpropagation(create_graph=True, retain_graph=False)
+
+    def test_hessian_against_numerical_differentiation(self):
+        expected = numerical_hessian(model, [0.7, 0.4])
+        actual = hessian(model, [0.7, 0.4])
+        for expected_row, actual_row in zip(expected, actual):
+            for e, a in zip(expected_row, actual_row):
+                self.assertAlmostEqual(e, a, places=5)
+        self.assertAlmostEqual(hessian(lambda x: x ** 3, 2.0), 12.0)
+        self.assertEqual(hessian(lambda x, y: x + y * 2, [1.0, 2.0]), [[0, 0], [0, 0]])
+
+    def test_hessian_with_variable_exponent(self):
+        """
+        Test second derivatives of x ** y, including those through the exponent.
+        """
+        expected = numerical_hessian(lambda x, y: x ** y, [2.0, 3.0])
+        actual = hessian(lambda x, y: x ** y, [2.0, 3.0])
+        for expected_row, actual_row in zip(expected, actual):
+            for e, a in zip(expected_row, actual_row):
+                self.assertAlmostEqual(e, a, places=5)
+        self.assertAlmostEqual(actual[1][1], 8 * math.log(2) ** 2)
+
+    def test_saturated_tanh(self):
+        """
+        Test that create_graph gives the clamped derivative of Tanh.backward,
+        whose own derivative is zero where it is clamped.
+        """
+        x = Value([0.5, 30.0])
+        tanh(x).sum().run_backpropagation(create_graph=True)
+        self.assertEqual(list(x.gradient.data), [Tanh.backward(0.5, None), 1e-10])
+
+        gradient = x.gradient.sum()
+        x.reset_gradient()
+        gradient.run_backpropagation()
+        self.assertAlmostEqual(x.gradient[0], -2 * math.tanh(0.5) * (1 - math.tanh(0.5) ** 2))
+        self.assertEqual(x.gradient[1], 0)
+
+    def test_hessian_vector_product(self):
+        """
+        Test that hvp equals the Hessian applied to the direction.
+        """
+        point, direction = [0.7, 0.4], [1.0, -2.0]
+        output, product = hvp(model, point, direction)
+        full = hessian(model, point)
+
+        self.assertAlmostEqual(output, model(Value(0.7), Value(0.4)).data)
+        for row, p in zip(full, product):
+            self.assertAlmostEqual(p, sum(h * d for h, d in zip(row, direction)))
+
+    def test_batched_inputs(self):
+        x = Value([1.0, 2.0])
+        (x ** 3).sum().run_backpropagation(create_graph=True)
+        self.assertEqual(list(x.gradient.data), [3.0, 12.0])
+
 
 if __name__ == '__main__':
     unittest.main()